@@ -21,6 +21,7 @@ const {
 const { exit } = require("process");
 
 const { REPL } = require("./repl");
+const { startTranspileServer } = require("./server");
 
 const {
   bugs: packageInfoBugs,
@@ -53,6 +54,30 @@ const argDefinitions = [
     type: Boolean,
     name: "--main-func",
   },
+  {
+    description:
+      "generate chained (comma) expressions as plain tuples, instead of using the jschain polyfill function",
+    type: Boolean,
+    name: "--inline-chains",
+  },
+  {
+    description:
+      "generate expressions and variables which are inferred to only ever be numbers as unboxed Python floats, rather than JS number objects (option available in non REPL mode only)",
+    type: Boolean,
+    name: "--unboxed-numbers",
+  },
+  {
+    description:
+      "run as a long-lived transpile server, reading newline-delimited JSON requests from the STDIN and writing the responses to the STDOUT",
+    type: Boolean,
+    name: "--transpile-server",
+  },
+  {
+    description:
+      "amount of parsed scripts cached by the transpile server, keyed by their source (default: 0, disabled)",
+    type: Number,
+    name: "--ast-cache-size",
+  },
   {
     description: "show the version of your installed js2py version",
     type: Boolean,
@@ -150,6 +175,8 @@ function transpileAndExit(input) {
     topLevelComment: !!args["--tl-comment"],
     includeImports: !!args["--include-import"],
     scopedScript: !!args["--main-func"],
+    inlineChains: !!args["--inline-chains"],
+    unboxedNumbers: !!args["--unboxed-numbers"],
   });
   const filePath = args["--output"];
   if (filePath) {
@@ -160,8 +187,13 @@ function transpileAndExit(input) {
   exit(0);
 }
 
+// CLI can be used as a server, transpiling any amount of scripts
+if (args["--transpile-server"]) {
+  startTranspileServer({ astCacheSize: args["--ast-cache-size"] || 0 });
+}
+
 // CLI can be used by passing in code directly as a string
-if (args._.length > 0) {
+if (args._.length > 0 && !args["--transpile-server"]) {
   transpileAndExit(args._);
 }
 
@@ -270,6 +302,9 @@ function startREPL() {
 // also possible in case the STDIN is a pipe,
 // can also be used to transpile a file
 fs.fstat(0, function (err, stats) {
+  if (args["--transpile-server"]) {
+    return; // STDIN is used by the transpile server
+  }
   if (err) {
     console.log(err);
     exit(1);
@@ -284,6 +319,7 @@ fs.fstat(0, function (err, stats) {
   // transpile on the fly and exit when finished
   const gen = new PyCodeGen({
     topLevelComment: !!args["--tl-comment"],
+    inlineChains: !!args["--inline-chains"],
   });
   let input = "";
   var rl = readline.createInterface({
@@ -332,6 +368,7 @@ fs.fstat(0, function (err, stats) {
       throw e;
     }
 
+    gen.analyze(tree);
     const rep = reduce(gen, tree);
     const ts = new TokenStream();
     rep.emit(ts);
@@ -341,6 +378,7 @@ fs.fstat(0, function (err, stats) {
   // parse remaining text
   if (input) {
     const tree = parseScript(input);
+    gen.analyze(tree);
     const rep = reduce(gen, tree);
     const ts = new TokenStream();
     rep.emit(ts);
@@ -91,12 +91,14 @@ class REPL {
       return;
     }
 
+    this._generator.analyze(tree);
     const rep = reduce(this._generator, tree);
     const ts = new js2py.TokenStream();
     rep.emit(ts);
 
     if (this._evalPython) {
-      this._PythonClient.emit("eval", { cmd: ts.result }, (evalOutput) => {
+      this._PythonClient.emit("eval", { cmd: ts.result }, (evalResult) => {
+        const evalOutput = this._formatEvalResult(evalResult);
         if (!evalOutput) {
           callback(null, ts.result);
           return;
@@ -105,7 +107,7 @@ class REPL {
           null,
           `${ts.result}# Outputs:${os.EOL}${evalOutput
             .trim()
-            .split("\r\n")
+            .split(/\r?\n/)
             .map((v) => `# ${v}`)
             .join(os.EOL)}`
         );
@@ -115,6 +117,18 @@ class REPL {
     }
   }
 
+  // combine the structured result of a Python evaluation into a single output,
+  // as it would be printed by an interactive Python REPL
+  _formatEvalResult(result) {
+    if (!result) {
+      return "";
+    }
+    return [result.stdout, result.stderr, result.value, result.exception]
+      .map((output) => (output || "").trimEnd())
+      .filter((output) => output)
+      .join(os.EOL);
+  }
+
   _canJSErrorBeRecovered(error) {
     return error.description === "Unexpected end of input";
   }
@@ -0,0 +1,91 @@
+const readline = require("readline");
+
+const { parseScript } = require("shift-parser");
+
+// TODO: define pkg decently so it is linked to the actual library,
+// while still being able to use the local sibling files while developing
+const { transpile } = require("../../shift-codegen-py/src");
+
+// LRU cache of parsed scripts, keyed by their source
+class ASTCache {
+  constructor(size) {
+    this.size = size;
+    this.trees = new Map();
+  }
+
+  parse(source) {
+    if (this.size <= 0) {
+      return parseScript(source);
+    }
+    let tree = this.trees.get(source);
+    if (tree !== undefined) {
+      // move to the back, marking it as most recently used
+      this.trees.delete(source);
+      this.trees.set(source, tree);
+      return tree;
+    }
+    tree = parseScript(source);
+    this.trees.set(source, tree);
+    if (this.trees.size > this.size) {
+      // maps iterate in insertion order, the first key is the least recently used
+      this.trees.delete(this.trees.keys().next().value);
+    }
+    return tree;
+  }
+}
+
+// Long-lived transpile server, such that the node runtime and parser
+// only have to be loaded once for any amount of scripts to be transpiled.
+//
+// Requests are read as newline-delimited JSON objects:
+//
+//    {"id": 1, "sources": ["let x = 1", "x + 2"], "options": {"includeImports": true}}
+//
+// and for each request a response is written, in the same order,
+// with a result for each source, either its output or an error:
+//
+//    {"id": 1, "results": [{"output": "..."}, {"error": "..."}]}
+//
+// Clients can therefore write requests without waiting for the responses.
+function startTranspileServer({
+  input = process.stdin,
+  output = process.stdout,
+  astCacheSize = 0,
+} = {}) {
+  const cache = new ASTCache(astCacheSize);
+  const write = (response) => output.write(JSON.stringify(response) + "\n");
+
+  const rl = readline.createInterface({
+    input,
+    terminal: false,
+    crlfDelay: Infinity,
+  });
+
+  rl.on("line", (line) => {
+    if (!line.trim()) {
+      return;
+    }
+    let request;
+    try {
+      request = JSON.parse(line);
+    } catch (e) {
+      write({ id: null, error: `invalid request: ${e.message}` });
+      return;
+    }
+    const options = request.options || {};
+    const results = (request.sources || []).map((source) => {
+      try {
+        return { output: transpile(cache.parse(source), options) };
+      } catch (e) {
+        return { error: e.message || String(e) };
+      }
+    });
+    write({ id: request.id, results });
+  });
+
+  return rl;
+}
+
+module.exports = {
+  startTranspileServer,
+};
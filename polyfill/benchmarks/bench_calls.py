@@ -0,0 +1,44 @@
+"""
+Measures the overhead of calling a (small) JSFunction.
+
+Usage (with shift_codegen_py installed, e.g. using `pip install -e .`):
+    python benchmarks/bench_calls.py [--count N]
+"""
+
+import argparse
+import timeit
+
+from shift_codegen_py.polyfill import scope, JSFunction, JSNumber
+from shift_codegen_py.polyfill.runtime import FunctionScope
+
+
+def add(fn_scope):
+    return fn_scope["a"] + fn_scope["b"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=1000000,
+                        help='amount of calls per measurement')
+    args = parser.parse_args()
+
+    fn = JSFunction(add, parameters=["a", "b"], ref="add")
+    a, b = JSNumber(1), JSNumber(2)
+
+    measurements = [
+        ("python function (baseline)",
+         lambda: add({"a": a, "b": b})),
+        ("function scope, layout per call",
+         lambda: add(FunctionScope(scope, ("a", "b"), (a, b)))),
+        ("JSFunction call (shared layout)",
+         lambda: fn(scope, a, b)),
+        ("JSFunction call, missing argument",
+         lambda: fn(scope, a)),
+    ]
+    for name, call in measurements:
+        seconds = timeit.timeit(call, number=args.count)
+        print(f"{name:<40} {seconds / args.count * 1e9:8.1f} ns/call")
+
+
+if __name__ == "__main__":
+    main()
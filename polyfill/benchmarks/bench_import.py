@@ -0,0 +1,48 @@
+"""
+Measures the time it takes to import the polyfill in a fresh interpreter.
+
+Each measurement starts a new Python process, the time of starting
+an interpreter without importing anything is subtracted from it.
+
+Usage (with shift_codegen_py installed, e.g. using `pip install -e .`):
+    python benchmarks/bench_import.py [--count N]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+STATEMENTS = [
+    ("interpreter (baseline)", "pass"),
+    ("import shift_codegen_py.polyfill", "import shift_codegen_py.polyfill"),
+    ("import and first use of Math",
+     "from shift_codegen_py.polyfill import scope; scope['Math']"),
+]
+
+
+def run_time(statement):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", statement], check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=20,
+                        help='amount of processes started per measurement')
+    args = parser.parse_args()
+
+    baseline = None
+    for name, statement in STATEMENTS:
+        seconds = statistics.median(run_time(statement) for _ in range(args.count))
+        if baseline is None:
+            baseline = seconds
+            print(f"{name:<40} {seconds * 1e3:8.1f} ms")
+        else:
+            print(f"{name:<40} {(seconds - baseline) * 1e3:8.1f} ms (+ baseline)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Measures the memory used per JS value by the polyfill runtime.
+
+The current (slot-based) object layout is compared against the layout
+JSObject used before, where every value eagerly owned two property dicts.
+Objects with properties (records) are compared against the same dict layout,
+where each record owns its own property dict rather than sharing its shape.
+Numeric arrays are compared against a list of (boxed) numbers.
+
+Usage (with shift_codegen_py installed, e.g. using `pip install -e .`):
+    python benchmarks/bench_memory.py [--count N]
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from shift_codegen_py.polyfill import JSObject, JSNumber, JSString, JSArray
+
+
+class DictLayoutValue(object):
+    """
+    Replica of the previous JSObject layout: an instance __dict__
+    holding two (empty) property dicts, a reference and the wrapped value.
+    """
+
+    def __init__(self, value):
+        self._properties = {}
+        self._magic_properties = {}
+        self._ref = 'undefined'
+        self._value = value
+
+
+RECORD_FIELDS = ("id", "name", "x", "y")
+
+
+def dict_layout_record(i):
+    record = DictLayoutValue(None)
+    for field in RECORD_FIELDS:
+        record._properties[field] = JSNumber(i)
+    return record
+
+
+def shaped_record(i):
+    record = JSObject()
+    for field in RECORD_FIELDS:
+        record.assign(field, JSNumber(i))
+    return record
+
+
+def bytes_per_value(factory, count):
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    values = [factory(i) for i in range(count)]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del values
+    return (end - start) / count
+
+
+def bytes_per_element(factory, count):
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    numbers = [JSNumber(float(i) + 0.5) for i in range(count)]
+    values = factory(numbers)
+    # the numbers themselves are only kept alive by boxed arrays
+    del numbers
+    gc.collect()
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del values
+    return (end - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=1000000,
+                        help='amount of values to allocate per measurement')
+    args = parser.parse_args()
+
+    # spread values out so small-value caching does not skew the results
+    measurements = [
+        ("number (dict layout, before)",
+         lambda i: DictLayoutValue(float(i) + 0.5)),
+        ("number (slot layout, after)",
+         lambda i: JSNumber(float(i) + 0.5)),
+        ("string (dict layout, before)",
+         lambda i: DictLayoutValue(str(i))),
+        ("string (slot layout, after)",
+         lambda i: JSString(str(i))),
+        ("single-element array (slot layout)",
+         lambda i: JSArray([i])),
+        # record fields use small (cached) numbers, such that only
+        # the records themselves are measured
+        ("4-field record (dict layout, before)",
+         lambda i: dict_layout_record(i % 100)),
+        ("4-field record (shapes, after)",
+         lambda i: shaped_record(i % 100)),
+    ]
+    for name, factory in measurements:
+        print(f"{name:<40} {bytes_per_value(factory, args.count):8.1f} bytes/value")
+
+    measurements = [
+        ("number array (boxed list, before)", list),
+        ("number array (packed, after)", JSArray),
+    ]
+    for name, factory in measurements:
+        print(f"{name:<40} {bytes_per_element(factory, args.count):8.1f} bytes/element")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Measures the overhead of the JS binary operators, by type of operands.
+
+Usage (with shift_codegen_py installed, e.g. using `pip install -e .`):
+    python benchmarks/bench_operators.py [--count N]
+"""
+
+import argparse
+import timeit
+
+from shift_codegen_py.polyfill import JSNumber, JSString, JSArray, JS_TRUE
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=1000000,
+                        help='amount of operations per measurement')
+    args = parser.parse_args()
+
+    operands = {
+        "x": JSNumber(1.5),
+        "y": JSNumber(2.25),
+        "i": JSNumber(3),
+        "j": JSNumber(4),
+        "s": JSString("a"),
+        "t": JS_TRUE,
+        "a": JSArray([JSNumber(1), JSNumber(2)]),
+    }
+    expressions = [
+        "x + y",
+        "i + j",
+        "x * y",
+        "x / y",
+        "x % y",
+        "i | j",
+        "x < y",
+        "x == y",
+        "x + s",
+        "s + s",
+        "x + t",
+        "x + a",
+        "1 + x",
+    ]
+    for expression in expressions:
+        seconds = timeit.timeit(expression, globals=operands, number=args.count)
+        print(f"{expression:<10} {seconds / args.count * 1e9:8.1f} ns/op")
+
+
+if __name__ == "__main__":
+    main()
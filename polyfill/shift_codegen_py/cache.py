@@ -0,0 +1,236 @@
+"""
+Persistent (on-disk) cache of transpiled scripts,
+storing both the generated Python source and its compiled code.
+"""
+
+import hashlib
+import importlib.util
+import json
+import marshal
+import os
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # e.g. on Windows, where the cache is not locked between processes
+
+from . import __version__
+from .script import compile_script
+
+_ENTRY_SUFFIX = ".entry"
+
+# sources of the code generator, when used from a checkout of the repository
+_CODEGEN_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "shift-codegen-py", "src")
+
+# once the cache exceeds its maximum size, it is reduced to this ratio of it,
+# such that eviction does not need to happen again for the next entries
+_EVICTION_RATIO = 0.9
+
+
+class ScriptCache(object):
+    """
+    A content-addressed cache of transpiled scripts, safe to be shared
+    by several processes.
+
+    Entries are keyed on the JS source, the transpiler options, the version of
+    the transpiler, the version of this package and that of the Python bytecode.
+    The transpiler version defaults to a digest of the sources of the
+    (sibling) shift-codegen-py checkout, such that entries generated by a
+    previous version of the code generator are never served; pass it explicitly
+    when transpiling using another (e.g. an installed) transpiler. Each entry is a single file
+    written atomically, holding the generated Python source and its
+    (marshalled) code object, as run by a `Script`. Once the total size of the
+    entries exceeds the maximum size, the least recently used entries are evicted.
+    """
+
+    def __init__(self, directory=None, max_size=256 * 1024 * 1024,
+                 transpiler_version=None):
+        self._directory = directory or _default_directory()
+        self._max_size = max_size
+        if transpiler_version is None:
+            transpiler_version = codegen_version()
+        self._transpiler_version = transpiler_version
+        os.makedirs(self._directory, exist_ok=True)
+        self._lock_path = os.path.join(self._directory, ".lock")
+        self._size_path = os.path.join(self._directory, ".size")
+
+    def key(self, js_source, options=None):
+        """
+        Return the key of the JS source transpiled using the given options.
+        """
+        digest = hashlib.sha256()
+        for part in (
+                __version__,
+                self._transpiler_version,
+                importlib.util.MAGIC_NUMBER.hex(),
+                json.dumps(options or {}, sort_keys=True),
+                js_source):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, js_source, options=None):
+        """
+        Return the (python_source, code) pair cached for the
+        JS source and options, None if not cached.
+        """
+        path = self._path(self.key(js_source, options))
+        try:
+            with open(path, "rb") as file:
+                entry = marshal.load(file)
+            # mark the entry as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (EOFError, ValueError, TypeError):
+            _remove(path)  # corrupt entry, e.g. written by another Python version
+            return None
+        return entry
+
+    def put(self, js_source, python_source, options=None, filename="<script>"):
+        """
+        Compile the transpiled Python source and cache it for the
+        JS source and options, returning the compiled code.
+        """
+        code = compile_script(python_source, filename=filename)
+        path = self._path(self.key(js_source, options))
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        try:
+            previous_size = os.path.getsize(path)
+        except OSError:
+            previous_size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                marshal.dump((python_source, code), file)
+                size = file.tell()
+            os.replace(tmp_path, path)
+        except BaseException:
+            _remove(tmp_path)
+            raise
+        self._grow(size - previous_size)
+        return code
+
+    def load(self, js_source, transpile, options=None, filename="<script>"):
+        """
+        Return the (python_source, code) pair for the JS source and options,
+        transpiling it using `transpile(js_source, options)` in case it isn't cached.
+        """
+        entry = self.get(js_source, options)
+        if entry is not None:
+            return entry
+        python_source = transpile(js_source, options or {})
+        code = self.put(js_source, python_source, options=options, filename=filename)
+        return python_source, code
+
+    def clear(self):
+        """
+        Remove all entries from the cache.
+        """
+        with self._locked():
+            for path, _, _ in self._entries():
+                _remove(path)
+            self._write_size(0)
+
+    def _path(self, key):
+        return os.path.join(self._directory, key[:2], key + _ENTRY_SUFFIX)
+
+    def _grow(self, delta):
+        with self._locked():
+            size = self._read_size()
+            size = self._evict() if size is None else size + delta
+            if size > self._max_size:
+                size = self._evict()
+            self._write_size(size)
+
+    def _evict(self):
+        """
+        Remove the least recently used entries until the cache is within
+        its bounds again, returning its (actual) size.
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        size = sum(entry_size for _, _, entry_size in entries)
+        if size <= self._max_size:
+            return size
+        target = self._max_size * _EVICTION_RATIO
+        for path, _, entry_size in entries:
+            if size <= target:
+                break
+            _remove(path)
+            size -= entry_size
+        return size
+
+    def _entries(self):
+        """
+        Yield the (path, mtime, size) of all entries.
+        """
+        for sub in os.scandir(self._directory):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if not entry.name.endswith(_ENTRY_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield entry.path, stat.st_mtime, stat.st_size
+
+    def _read_size(self):
+        try:
+            with open(self._size_path) as file:
+                return int(file.read())
+        except (OSError, ValueError):
+            return None
+
+    def _write_size(self, size):
+        with open(self._size_path, "w") as file:
+            file.write(str(max(int(size), 0)))
+
+    @contextmanager
+    def _locked(self):
+        with open(self._lock_path, "a") as file:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def codegen_version(directory=_CODEGEN_DIRECTORY):
+    """
+    Return a digest of the sources of the code generator (shift-codegen-py),
+    an empty string if they cannot be found (e.g. once installed on its own).
+    """
+    digest = hashlib.sha256()
+    paths = []
+    for root, _, names in os.walk(directory):
+        paths.extend(os.path.join(root, name) for name in names if name.endswith(".js"))
+    if not paths:
+        return ""
+    for path in sorted(paths):
+        digest.update(os.path.relpath(path, directory).encode("utf-8"))
+        digest.update(b"\0")
+        with open(path, "rb") as file:
+            digest.update(file.read())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _default_directory():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "shift_codegen_py")
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
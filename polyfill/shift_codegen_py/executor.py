@@ -0,0 +1,109 @@
+"""
+Executes a transpiled (Python) script over many inputs
+in parallel, using a pool of worker processes.
+"""
+
+import marshal
+import multiprocessing
+import os
+from itertools import islice
+
+from .script import Script
+
+# imported by the fork server, such that all workers start with it imported
+_PRELOAD_MODULES = ["shift_codegen_py.polyfill"]
+
+# the script of a worker process, see `_init_worker`
+_worker_script = None
+
+
+class ScriptExecutor(object):
+    """
+    Runs a transpiled script over many input bindings in parallel,
+    using a pool of worker processes (one per core by default).
+
+    The script is compiled once, its code object being shipped (marshalled)
+    to each worker only once, when the worker starts. Workers are started
+    from a fork server which has the polyfill already imported.
+    Input bindings are dispatched to the workers in batches.
+
+    Input bindings and results are pickled, any JS value can be used
+    except for functions. Each run is isolated as described in `Script`.
+    """
+
+    def __init__(self, source, max_workers=None, filename="<script>", batch_size=256):
+        if batch_size < 1:
+            raise ValueError("batch_size has to be at least 1")
+        code = Script(source, filename=filename).code
+        self._batch_size = batch_size
+        self._pool = _context().Pool(
+            processes=max_workers or os.cpu_count(),
+            initializer=_init_worker,
+            initargs=(marshal.dumps(code),))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def map(self, bindings):
+        """
+        Run the script once for each of the given bindings,
+        yielding the results in the same order.
+        """
+        batches = _batched(enumerate(bindings), self._batch_size)
+        for results in self._pool.imap(_run_batch, batches):
+            for _, result in results:
+                yield result
+
+    def map_unordered(self, bindings):
+        """
+        Run the script once for each of the given bindings,
+        yielding (index, result) pairs as batches complete,
+        the index being the position of the bindings in the given iterable.
+        """
+        batches = _batched(enumerate(bindings), self._batch_size)
+        for results in self._pool.imap_unordered(_run_batch, batches):
+            yield from results
+
+    def close(self):
+        """
+        Stop the workers, waiting for them to finish their work.
+        """
+        self._pool.close()
+        self._pool.join()
+
+    def terminate(self):
+        """
+        Stop the workers immediately.
+        """
+        self._pool.terminate()
+        self._pool.join()
+
+
+def _context():
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")  # e.g. on Windows
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(_PRELOAD_MODULES)
+    return context
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _init_worker(marshalled_code):
+    global _worker_script
+    _worker_script = Script.from_code(marshal.loads(marshalled_code))
+
+
+def _run_batch(batch):
+    run = _worker_script.run
+    return [(index, run(bindings)) for index, bindings in batch]
@@ -10,3 +10,8 @@ from .std import *
 
 # Global Scope Object
 from .globals import scope  # declares the scope global var
+
+from . import errors, runtime, std, globals
+
+# only the polyfill itself, not its modules
+__all__ = errors.__all__ + runtime.__all__ + std.__all__ + globals.__all__
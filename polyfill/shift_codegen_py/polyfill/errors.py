@@ -2,6 +2,8 @@
 Polyfills exception types as thrown in the Javascript Runtime.
 """
 
+__all__ = ['SyntaxError', 'TypeError', 'RangeError']
+
 
 class SyntaxError(Exception):
     """
@@ -13,3 +15,9 @@ class TypeError(Exception):
     """
     an Uncaught JS-style TypeError
     """
+
+
+class RangeError(Exception):
+    """
+    an Uncaught JS-style RangeError
+    """
@@ -2,25 +2,29 @@
 Polyfills to be able to simulate the global scope.
 """
 
-from .runtime import Scope, JSUndefined, JSInfinity, JSNaN, JSNull, JSString, JSNumber, JSObject, jsfunc
+from .runtime import Scope, JSInfinity, JSString, JSNumber, JSObject, jsfunc
+from .runtime import JS_UNDEFINED, JS_NULL, JS_NAN, JS_TRUE, JS_FALSE
 from .std import JSConsole, JSMath
 
+__all__ = ['scope']
+
 scope = Scope()
 
 # define protected builtins
-scope._declare_reserved("null", JSNull())
+scope._declare_reserved("null", JS_NULL)
 
 # define magic constant values
-scope._declare_magic("undefined", JSUndefined())
+scope._declare_magic("undefined", JS_UNDEFINED)
 scope._declare_magic("Infinity", JSInfinity())
-scope._declare_magic("NaN", JSNaN())
+scope._declare_magic("NaN", JS_NAN)
 
 # browser-like std objects
 # TODO
 
-# define global objects which are not protected by reference
-scope.declare_var('console', JSConsole())
-scope.declare_var('Math', JSMath())
+# define global objects which are not protected by reference,
+# only created once used
+scope._declare_lazy_var('console', JSConsole)
+scope._declare_lazy_var('Math', JSMath)
 
 ########
 # declare global functions
@@ -32,13 +36,13 @@ def fn(scope):
     # support:
     #   - dates are also NaN as long as they are actual DateInstances
     x = scope["x"]
-    if isinstance(x, JSNumber) or isinstance(x, JSNull):
-        return False
+    if isinstance(x, JSNumber) or x is JS_NULL:
+        return JS_FALSE
     if isinstance(x, JSString):
         if x.is_empty():
-            return False
-        return not isinstance(x.to_number(), JSNumber)
-    return True  # NaN in all other cases
+            return JS_FALSE
+        return JS_FALSE if isinstance(x.to_number(), JSNumber) else JS_TRUE
+    return JS_TRUE  # NaN in all other cases
 
 
 @jsfunc(scope, "eval", parameters=["script"])
@@ -8,8 +8,32 @@ including the hoisting concept, of Javascript
 within the Python runtime.
 """
 
-import inspect
+import sys
+from array import array as array_type
 from collections.abc import Sequence
+from functools import lru_cache
+from math import ceil, copysign, floor, fmod, pow as float_pow
+
+from .errors import RangeError
+
+__all__ = [
+    # errors
+    'ObjectIsNaNError',
+    # objects
+    'Shape', 'PropertyCache',
+    'JSValue', 'JSObject', 'JSUndefined', 'JSNull', 'JSBool', 'JSNumber', 'JSNaN',
+    'JSInfinity', 'JSString', 'JSArray', 'JSFunction',
+    # interned primitive values
+    'JS_UNDEFINED', 'JS_NULL', 'JS_NAN', 'JS_TRUE', 'JS_FALSE', 'JS_ZERO',
+    'JS_NEGATIVE_ZERO',
+    # utilities
+    'jschain', 'jsrange',
+    # scopes
+    'ScopeLayout', 'Scope', 'ScopeSnapshot', 'GlobalLookupCache', 'FunctionScope',
+    'BlockScope',
+    # decorators
+    'jsfunc',
+]
 
 ###############################################
 # Runtime Errors
@@ -22,1084 +46,1108 @@ class ObjectIsNaNError(Exception):
     """
 
 ###############################################
-# OBJECTS
+# Operators
 ###############################################
 
-# TODO:
-# - support unary operations
-# - support binary operations
-# - add unit tests
-# - support automated linting
-
-# TODO:
-# - validate that all operators work correctly
-# - check if our JSNaN and JSInfinity can rely more on JSNumber for operators
-# - check JSInfinity handles its sign correctly in its operators
-
-
-class JSObject(object):
-    _static_properties = {}
-
-    @classmethod
-    def jsstaticmethod(cls, name, fn):
-        # TODO: validate if this is really what we want,
-        # the class being the owner...
-        fn = JSFunction(fn, parameters=parameters, owner=cls)
-        cls.jsstaticprop_set(name, fn)
-        return fn
-
-    @staticmethod
-    def jsstaticprop_set(name, fn):
-        JSObject._static_properties[name] = fn
-
-    @staticmethod
-    def jsstaticprop_del(name):
-        del JSObject._static_properties[name]
-
-    @staticmethod
-    def jsstaticprop_get(name):
-        return JSObject._static_properties[name]
-
-    def __init__(self, ref=None):
-        self._properties = {}
-        self._magic_properties = {}
-        self.set_reference(ref)
-
-    def set_reference(self, ref=None):
-        self._ref = ref or 'undefined'
-
-    def assign(self, name, value):
-        if not isinstance(value, JSObject):
-            raise RuntimeError("only objects can be set as properties")
-        self._properties[name] = value
-        return value
-
-    # __setitem__ has no purpose, given it is not an expression
-
-    def __getitem__(self, name):
-        try:
-            return self._magic_properties[name]
-        except KeyError:
-            try:
-                return self._properties[name]
-            except KeyError:
-                return JSUndefined()
+# JS operators are implemented by the functions below, rather than by the
+# (Python) operator methods of each type, such that all coercion rules live in one place.
+# Binary operators check the number-number case first, any other pair of operand
+# types is dispatched using the table of the operator, see `_DispatchTable`.
 
-    def __delitem__(self, name):
-        try:
-            del self._properties[name]
-            return True
-        except KeyError:
-            return False
-
-    # function call
-
-    def __call__(self, *args):
-        raise TypeError(f"{self._ref} is not a function")
-
-    # ++ / -- support
 
-    def inc(self):
-        raise SyntaxError(
-            "Invalid left-hand side expression in prefix operation")
-
-    def pinc(self):
-        raise SyntaxError(
-            "Invalid left-hand side expression in postfix operation")
-
-    def dec(self):
-        raise SyntaxError(
-            "Invalid left-hand side expression in prefix operation")
-
-    def pdec(self):
-        raise SyntaxError(
-            "Invalid left-hand side expression in postfix operation")
+class _DispatchTable(dict):
+    """
+    Implementations of a binary operator, keyed by the types of its operands
+    (`(type(left), type(right))`). The generic implementation of the operator,
+    applying the coercion rules, is used (and cached) for all other type pairs.
+    """
 
-    # Str representation,
-    # important when for example adding with a string
+    __slots__ = ('_generic',)
 
-    def __repr__(self):
-        return self.__str__()
+    def __init__(self, generic, specialized=()):
+        super().__init__(specialized)
+        self._generic = generic
 
-    def __str__(self):
-        return "[object Object]"
+    def __missing__(self, types):
+        generic = self[types] = self._generic
+        return generic
 
-    def to_string(self):
-        return JSString(str(self), ref=self._ref)
-
-    # Bool representation
-
-    def __bool__(self):
-        return True
 
-    def to_bool(self):
-        return JSBool(bool(self), ref=self._ref)
-
-    # Number representation
+def _to_primitive(value):
+    """
+    ToPrimitive: objects (arrays and functions included) as their string,
+    primitives (and plain Python values) as they are.
+    """
+    if isinstance(value, JSObject) and not isinstance(value, _PRIMITIVE_TYPES):
+        return JSString(str(value))
+    return value
 
-    def __float__(self):
-        raise ObjectIsNaNError()
 
-    def to_number(self):
+def _to_number(value):
+    """
+    ToNumber: return the float value of any JS value,
+    or of a plain Python number, bool or str.
+    """
+    t = type(value)
+    if t is JSNumber:
+        return value._value
+    convert = _TO_NUMBER.get(t)
+    if convert is not None:
+        return convert(value)
+    if isinstance(value, JSNumber):
+        return value._value
+    if isinstance(value, JSObject):
+        return _string_to_number(str(value))
+    raise TypeError(f"cannot convert {t.__name__} to a JS number")
+
+
+def _string_to_number(s):
+    """
+    Return the number value of a JS string, NaN if it is not a valid number.
+    """
+    s = s.strip()
+    if not s:
+        return 0.0
+    if s[0] in "+-":
+        sign, digits = s[0], s[1:]
+    else:
+        sign, digits = "", s
+    if digits == "Infinity":
+        return float(sign + "inf")
+    if not sign and len(s) > 2 and s[0] == "0" and s[1] in "xXoObB":
         try:
-            return JSNumber(float(self), ref=self._ref)
-        except ObjectIsNaNError:
-            return JSNaN()
-
-    # Unary Operators
-
-    def __neg__(self):
-        return JSNaN()
-
-    def __pos__(self):
-        return JSNaN()
-
-    def __invert__(self):
-        return JSNumber(-1)
-
-    # Absolute value, in JSLand triggered via Math.abs
-
-    def __abs__(self):
-        return JSNaN()
-
-    # Binary Operators
+            return float(int(s, 0))
+        except ValueError:
+            return _NAN
+    # float() accepts more than JS does (e.g. "inf", "nan" and "1_0")
+    if not digits or not _NUMBER_CHARS.issuperset(digits):
+        return _NAN
+    try:
+        return float(s)
+    except ValueError:
+        return _NAN
 
-    def __add__(self, other):
-        if isinstance(self, JSString) or isinstance(other, JSString):
-            return JSString(str(self) + str(other))
-        return JSNumber(float(self) + float(other))
 
-    def __radd__(self, other):
-        return self + other
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
 
-    def __iadd__(self, other):
-        return self + other
 
-    def __sub__(self, other):
-        return JSNaN()
+def _number_to_string(value):
+    """
+    Number::toString: return the str value of a finite JS number (float),
+    using the shortest digits that round-trip, as Python's repr does.
+    """
+    if not value:
+        return "0"  # both 0 and -0
+    sign = "-" if value < 0 else ""
+    mantissa, _, exponent = repr(abs(value)).partition("e")
+    integer, _, fraction = mantissa.partition(".")
+    if fraction == "0":
+        fraction = ""  # e.g. repr 1.0
+    all_digits = integer + fraction
+    digits = all_digits.lstrip("0")
+    # the value is 0.digits * 10 ** n
+    n = int(exponent or 0) + len(integer) - (len(all_digits) - len(digits))
+    digits = digits.rstrip("0")
+    k = len(digits)
+    if k <= n <= 21:
+        return sign + digits + "0" * (n - k)
+    if 0 < n <= 21:
+        return sign + digits[:n] + "." + digits[n:]
+    if -6 < n <= 0:
+        return sign + "0." + "0" * -n + digits
+    e = f"e{'+' if n > 0 else '-'}{abs(n - 1)}"
+    if k == 1:
+        return sign + digits + e
+    return sign + digits[0] + "." + digits[1:] + e
+
+
+def _to_string(value):
+    """
+    ToString: return the str value of any JS value,
+    or of a plain Python value.
+    """
+    if isinstance(value, JSValue):
+        return str(value)
+    if value is True or value is False:
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(_box_number(float(value)))
+    return str(value)
 
-    def __rsub__(self, other):
-        return self - other
 
-    def __isub__(self, other):
-        return self - other
+def _is_string(value):
+    t = type(value)
+    return t is JSString or t is str
 
-    def __mul__(self, other):
-        return JSNaN()
 
-    def __rmul__(self, other):
-        return self * other
+def _int32(number):
+    """
+    ToInt32 of a float.
+    """
+    if number != number or number in _INFINITIES:
+        return 0
+    number = int(number) & 0xFFFFFFFF
+    return number - 0x100000000 if number & 0x80000000 else number
 
-    def __imul__(self, other):
-        return self * other
 
-    def __truediv__(self, other):
-        return JSNaN()
+def _to_int32(value):
+    if type(value) is JSNumber:
+        return _int32(value._value)
+    return _int32(_to_number(value))
 
-    def __rtruediv__(self, other):
-        return self / other
 
-    def __itruediv__(self, other):
-        return self / other
+# arithmetic, on floats, as defined by JS rather than Python (e.g. no ZeroDivisionError)
 
-    # Javascript has no floor div
+def _number_div(left, right):
+    try:
+        return left / right
+    except ZeroDivisionError:
+        if left == 0 or left != left:
+            return _NAN
+        return copysign(_INFINITIES[0], left) * copysign(1.0, right)
 
-    def __mod__(self, other):
-        return JSNaN()
 
-    def __rmod__(self, other):
-        return self % other
+def _number_mod(left, right):
+    try:
+        # the result has the sign of the dividend, as it does in JS
+        return fmod(left, right)
+    except ValueError:
+        return _NAN  # division by zero or infinite dividend
 
-    def __imod__(self, other):
-        return self % other
 
-    def __pow__(self, other):
-        return JSNaN()
+def _number_pow(base, exponent):
+    if exponent != exponent or (abs(base) == 1.0 and exponent in _INFINITIES):
+        return _NAN
+    try:
+        return float_pow(base, exponent)
+    except OverflowError:
+        pass
+    except ValueError:
+        if base != 0:
+            return _NAN  # negative base and fractional exponent
+    # infinite result, negative only for a negative base and odd exponent
+    if copysign(1.0, base) < 0 and exponent.is_integer() and exponent % 2 == 1:
+        return _INFINITIES[1]
+    return _INFINITIES[0]
 
-    def __rpow__(self, other):
-        return self % other
 
-    def __ipow__(self, other):
-        return self % other
+# binary operators
 
-    # Binary bitwise operators
+def _add(left, right):
+    if type(left) is JSNumber and type(right) is JSNumber:
+        return _box_number(left._value + right._value)
+    return _ADD[type(left), type(right)](left, right)
 
-    def __and__(self, other):
-        return JSNumber(0)
 
-    def __rand__(self, other):
-        return self & other
+def _add_generic(left, right):
+    left, right = _to_primitive(left), _to_primitive(right)
+    if _is_string(left) or _is_string(right):
+        return JSString(_to_string(left) + _to_string(right))
+    return _box_number(_to_number(left) + _to_number(right))
 
-    def __iand__(self, other):
-        return self & other
 
-    def __or__(self, other):
-        return JSNumber(0) | other
+def _sub(left, right):
+    if type(left) is JSNumber and type(right) is JSNumber:
+        return _box_number(left._value - right._value)
+    return _SUB[type(left), type(right)](left, right)
 
-    def __ror__(self, other):
-        return self | other
 
-    def __ior__(self, other):
-        return self | other
+def _mul(left, right):
+    if type(left) is JSNumber and type(right) is JSNumber:
+        return _box_number(left._value * right._value)
+    return _MUL[type(left), type(right)](left, right)
 
-    def __xor__(self, other):
-        return JSNumber(0) ^ other
 
-    def __rxor__(self, other):
-        return self ^ other
+def _div(left, right):
+    if type(left) is JSNumber and type(right) is JSNumber:
+        return _box_number(_number_div(left._value, right._value))
+    return _DIV[type(left), type(right)](left, right)
 
-    def __ixor__(self, other):
-        return self ^ other
 
-    def __lshift__(self, other):
-        return JSNumber(0) << other
+def _mod(left, right):
+    if type(left) is JSNumber and type(right) is JSNumber:
+        return _box_number(_number_mod(left._value, right._value))
+    return _MOD[type(left), type(right)](left, right)
 
-    def __rlshift__(self, other):
-        return self << other
 
-    def __ilshift__(self, other):
-        return self << other
+def _pow(left, right):
+    if type(left) is JSNumber and type(right) is JSNumber:
+        return _box_number(_number_pow(left._value, right._value))
+    return _POW[type(left), type(right)](left, right)
 
-    def __rshift__(self, other):
-        return JSNumber(0) >> other
 
-    def __rrshift__(self, other):
-        return self >> other
+def _and(left, right):
+    if type(left) is JSNumber and type(right) is JSNumber:
+        return JSNumber(_int32(left._value) & _int32(right._value))
+    return _AND[type(left), type(right)](left, right)
 
-    def __irshift__(self, other):
-        return self >> other
 
-    # Binary logic operators
+def _or(left, right):
+    if type(left) is JSNumber and type(right) is JSNumber:
+        return JSNumber(_int32(left._value) | _int32(right._value))
+    return _OR[type(left), type(right)](left, right)
 
-    def __eq__(self, other):
-        return id(self) == id(other)
 
-    def __neq__(self, other):
-        return id(self) != id(other)
+def _xor(left, right):
+    if type(left) is JSNumber and type(right) is JSNumber:
+        return JSNumber(_int32(left._value) ^ _int32(right._value))
+    return _XOR[type(left), type(right)](left, right)
 
-    def __gt__(self, other):
-        return JSBool(False)
 
-    def __lt__(self, other):
-        return JSBool(False)
+def _lshift(left, right):
+    if type(left) is JSNumber and type(right) is JSNumber:
+        return JSNumber(_int32(_int32(left._value) << (_int32(right._value) & 31)))
+    return _LSHIFT[type(left), type(right)](left, right)
 
-    def __ge__(self, other):
-        return self == other
 
-    def __le__(self, other):
-        return self == other
+def _rshift(left, right):
+    if type(left) is JSNumber and type(right) is JSNumber:
+        return JSNumber(_int32(left._value) >> (_int32(right._value) & 31))
+    return _RSHIFT[type(left), type(right)](left, right)
 
 
-class JSUndefined(JSObject):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+def _arithmetic_operator(number_op):
+    """
+    Create the generic implementation of an arithmetic operator (other than +),
+    applying the given float operation to both operands as numbers.
+    """
+    def generic(left, right):
+        return _box_number(number_op(_to_number(left), _to_number(right)))
+    return generic
 
-    def assign(self, name, value):
-        raise TypeError("Cannot set property '{name}' of undefined")
 
-    def __getitem__(self, name):
-        raise TypeError("Cannot read property '{name}' of undefined")
+def _bitwise_operator(int_op):
+    """
+    Create the generic implementation of a bitwise operator,
+    applying the given int operation to both operands as int32.
+    """
+    def generic(left, right):
+        return JSNumber(_int32(int_op(_to_int32(left), _to_int32(right))))
+    return generic
 
-    def __str__(self):
-        return "undefined"
 
-    def __bool__(self):
-        return False
+# comparison operators
 
-    def __float__(self):
-        return 0.0
+def _lt(left, right):
+    if type(left) is JSNumber and type(right) is JSNumber:
+        return JS_TRUE if left._value < right._value else JS_FALSE
+    return _LT[type(left), type(right)](left, right)
 
 
-class JSNull(JSObject):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+def _gt(left, right):
+    if type(left) is JSNumber and type(right) is JSNumber:
+        return JS_TRUE if left._value > right._value else JS_FALSE
+    return _GT[type(left), type(right)](left, right)
 
-    def assign(self, name, value):
-        raise TypeError("Cannot set property '{name}' of undefined")
 
-    def __getitem__(self, name):
-        raise TypeError("Cannot read property '{name}' of undefined")
+def _le(left, right):
+    if type(left) is JSNumber and type(right) is JSNumber:
+        return JS_TRUE if left._value <= right._value else JS_FALSE
+    return _LE[type(left), type(right)](left, right)
 
-    def __str__(self):
-        return "null"
 
-    def __bool__(self):
-        return False
+def _ge(left, right):
+    if type(left) is JSNumber and type(right) is JSNumber:
+        return JS_TRUE if left._value >= right._value else JS_FALSE
+    return _GE[type(left), type(right)](left, right)
 
-    def __float__(self):
-        return 0.0
 
+def _relational_operator(compare):
+    """
+    Create the generic implementation of a relational operator:
+    comparing both operands as strings if both are strings, as numbers otherwise.
+    NaN compares false to anything, as it does for floats.
+    """
+    def generic(left, right):
+        left, right = _to_primitive(left), _to_primitive(right)
+        if _is_string(left) and _is_string(right):
+            result = compare(str(left), str(right))
+        else:
+            result = compare(_to_number(left), _to_number(right))
+        return JS_TRUE if result else JS_FALSE
+    return generic
 
-class JSBool(JSObject):
-    def __init__(self, value, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # TODO do we need value casting here?
-        self._value = value
 
-    def __str__(self):
-        return "true" if self._value else "false"
+def _eq(left, right):
+    if type(left) is JSNumber and type(right) is JSNumber:
+        return JS_TRUE if left._value == right._value else JS_FALSE
+    return _EQ[type(left), type(right)](left, right)
 
-    def __repr__(self):
-        return self.__str__()
 
-    def __str__(self):
-        return "[object Object]"
+def _ne(left, right):
+    if type(left) is JSNumber and type(right) is JSNumber:
+        return JS_TRUE if left._value != right._value else JS_FALSE
+    return JS_FALSE if _EQ[type(left), type(right)](left, right) else JS_TRUE
 
-    # Bool representation
 
-    def __bool__(self):
-        return self._value
+def _eq_generic(left, right):
+    return JS_TRUE if _loosely_equal(left, right) else JS_FALSE
 
-    def __float__(self):
-        return 1.0 if self._value else 0.0
 
-    # Unary Operators
+def _loosely_equal(left, right):
+    """
+    IsLooselyEqual (==), returned as a Python bool.
+    """
+    left_nullish = left is JS_UNDEFINED or left is JS_NULL or left is None
+    right_nullish = right is JS_UNDEFINED or right is JS_NULL or right is None
+    if left_nullish or right_nullish:
+        return left_nullish and right_nullish
+    left_primitive, right_primitive = _to_primitive(left), _to_primitive(right)
+    if left_primitive is not left and right_primitive is not right:
+        return left is right  # both objects, equal by identity only
+    if type(left) is JSBool and type(right) is JSBool:
+        return left is right
+    if _is_string(left_primitive) and _is_string(right_primitive):
+        return str(left_primitive) == str(right_primitive)
+    return _to_number(left_primitive) == _to_number(right_primitive)
 
-    def __neg__(self):
-        return JSNaN()
 
-    def __pos__(self):
-        return JSNaN()
+# reflected operators, used for plain Python values on the left side (e.g. `1 + x`)
 
-    def __invert__(self):
-        return JSNumber(-1)
+def _radd(right, left):
+    return _add(left, right)
 
-    # Absolute value, in JSLand triggered via Math.abs
 
-    def __abs__(self):
-        return JSNaN()
+def _rsub(right, left):
+    return _sub(left, right)
 
-    # Binary Operators
 
-    def __add__(self, other):
-        return JSNumber(int(self._value)) + other
+def _rmul(right, left):
+    return _mul(left, right)
 
-    def __radd__(self, other):
-        return self + other
 
-    def __iadd__(self, other):
-        return self + other
+def _rdiv(right, left):
+    return _div(left, right)
 
-    def __sub__(self, other):
-        return JSNumber(int(self._value)) - other
 
-    def __rsub__(self, other):
-        return self - other
+def _rmod(right, left):
+    return _mod(left, right)
 
-    def __isub__(self, other):
-        return self - other
 
-    def __mul__(self, other):
-        return JSNumber(int(self._value)) * other
+def _rpow(right, left):
+    return _pow(left, right)
 
-    def __rmul__(self, other):
-        return self * other
 
-    def __imul__(self, other):
-        return self * other
+def _rand(right, left):
+    return _and(left, right)
 
-    def __truediv__(self, other):
-        return JSNumber(int(self._value)) / other
 
-    def __rtruediv__(self, other):
-        return self / other
+def _ror(right, left):
+    return _or(left, right)
 
-    def __itruediv__(self, other):
-        return self / other
 
-    # Javascript has no floor div
+def _rxor(right, left):
+    return _xor(left, right)
 
-    def __mod__(self, other):
-        return JSNumber(int(self._value)) % other
 
-    def __rmod__(self, other):
-        return self % other
+def _rlshift(right, left):
+    return _lshift(left, right)
 
-    def __imod__(self, other):
-        return self % other
 
-    def __pow__(self, other):
-        return JSNumber(int(self._value)) ** other
+def _rrshift(right, left):
+    return _rshift(left, right)
 
-    def __rpow__(self, other):
-        return self % other
 
-    def __ipow__(self, other):
-        return self % other
+###############################################
+# OBJECTS
+###############################################
 
-    # Binary bitwise operators
+# TODO:
+# - support unary operations
+# - support binary operations
+# - add unit tests
+# - support automated linting
 
-    def __and__(self, other):
-        return JSNumber(int(self._value)) & other
+# TODO:
+# - validate that all operators work correctly
 
-    def __rand__(self, other):
-        return self & other
 
-    def __iand__(self, other):
-        return self & other
+class Shape(object):
+    """
+    The hidden class of an object, mapping each property name to the index
+    of its value in the (flat) storage of the object.
 
-    def __or__(self, other):
-        return JSNumber(int(self._value)) | other
+    Objects which got the same properties assigned in the same order share
+    the same shape, adding a property transitions an object to the next shape,
+    which is cached on the previous one.
 
-    def __ror__(self, other):
-        return self | other
+    Objects which delete properties, which grow too many of them,
+    or which add a property to a shape that already transitions to too many
+    others, switch to a dictionary shape of their own, where the storage is
+    a dict and the name of a property is also its key.
+    """
 
-    def __ior__(self, other):
-        return self | other
+    __slots__ = ('_slots', '_magic', '_transitions', '_dictionary')
 
-    def __xor__(self, other):
-        return JSNumber(int(self._value)) ^ other
+    def __init__(self, slots=None, magic=frozenset(), dictionary=False):
+        self._slots = {} if slots is None else slots
+        # names of the (read-only) properties of builtin objects
+        self._magic = magic
+        self._transitions = None if dictionary else {}
+        self._dictionary = dictionary
 
-    def __rxor__(self, other):
-        return self ^ other
+    def __len__(self):
+        return len(self._slots)
 
-    def __ixor__(self, other):
-        return self ^ other
+    def slot(self, name):
+        """
+        Return the storage key of the given name, None if not part of this shape.
+        """
+        return self._slots.get(name)
 
-    def __lshift__(self, other):
-        return JSNumber(int(self._value)) << other
+    def transition(self, name, magic=False):
+        """
+        Return the (shared) shape of an object of this shape,
+        once the given property is added to it,
+        None if this shape has no room left for another transition.
+        """
+        key = (name, magic)
+        shape = self._transitions.get(key)
+        if shape is None:
+            if len(self._transitions) >= _SHAPE_MAX_TRANSITIONS:
+                return None
+            slots = dict(self._slots)
+            slots[name] = len(slots)
+            shape = Shape(slots, self._magic | {name} if magic else self._magic)
+            self._transitions[key] = shape
+        return shape
+
+    def to_dictionary(self):
+        """
+        Return a new (unshared) dictionary shape with the same properties.
+        """
+        return Shape({name: name for name in self._slots},
+                     set(self._magic), dictionary=True)
 
-    def __rlshift__(self, other):
-        return self << other
+    def __reduce__(self):
+        # pickled as the properties it is made of, such that an unpickled
+        # shape is shared again with objects of the same properties
+        if self._dictionary:
+            return (Shape, (self._slots, self._magic, True))
+        return (_shape_of, (tuple(sorted(self._slots, key=self._slots.get)), self._magic))
 
-    def __ilshift__(self, other):
-        return self << other
 
-    def __rshift__(self, other):
-        return JSNumber(int(self._value)) >> other
+def _shape_of(names, magic):
+    """
+    Return the shape of an object with the given properties, added in that order.
+    """
+    shape = _ROOT_SHAPE
+    for name in names:
+        shape = shape.transition(name, name in magic)
+        if shape is None:
+            # not shared, as the shape tree has no room left for it
+            return Shape({name: slot for slot, name in enumerate(names)}, magic)
+    return shape
 
-    def __rrshift__(self, other):
-        return self >> other
 
-    def __irshift__(self, other):
-        return self >> other
+# objects with more properties than this switch to a dictionary shape
+_SHAPE_MAX_PROPERTIES = 64
 
-    # Binary logic operators
+# shapes transition to at most this many other shapes,
+# objects adding any other property switch to a dictionary shape,
+# such that objects with many distinct keys do not grow the shape tree
+_SHAPE_MAX_TRANSITIONS = 64
 
-    def __eq__(self, other):
-        return self._value == bool(other)
+# the shape of any object without properties
+_ROOT_SHAPE = Shape()
 
-    def __neq__(self, other):
-        return self._value != bool(other)
 
-    def __gt__(self, other):
-        return JSNumber(int(self._value)) > other
+class PropertyCache(object):
+    """
+    Inline cache for reading a named property (e.g. `point.x`)
+    from a single access site, to be created once per access site.
+
+    The cache remembers the slot a property resolved to for the type and
+    shape of the objects it is read from, or the fact that those objects do
+    not have the property. While all objects are of the same type and shape
+    (monomorphic) a read is two identity checks and a list index. Up to
+    `_PROPERTY_CACHE_MAX_ENTRIES` type and shape pairs are remembered
+    (polymorphic), after which further ones are looked up the regular way.
+
+    Objects in dictionary mode, or of a type with its own property lookup
+    (e.g. arrays), are never cached.
+    """
 
-    def __lt__(self, other):
-        return JSNumber(int(self._value)) < other
+    __slots__ = ('_name', '_type', '_shape', '_slot', '_entries')
 
-    def __ge__(self, other):
-        return JSNumber(int(self._value)) >= other
+    def __init__(self, name):
+        self._name = name
+        self._type = None
+        self._shape = None
+        self._slot = None
+        self._entries = None
 
-    def __le__(self, other):
-        return JSNumber(int(self._value)) <= other
+    def load(self, obj):
+        """
+        Return the value of the property of the given object.
+        """
+        if type(obj) is self._type and obj._shape is self._shape:
+            slot = self._slot
+            if slot is None:
+                return JS_UNDEFINED
+            return obj._storage[slot]
+        return self._miss(obj)
+
+    def _miss(self, obj):
+        cls = type(obj)
+        if getattr(cls, '__getitem__', None) is not JSObject.__getitem__:
+            # including the values without a shape of their own (e.g. NaN)
+            return obj[self._name]
+        shape = obj._shape
+        if shape._dictionary:
+            return obj[self._name]
+        key = (cls, shape)
+        entries = self._entries
+        if entries is None:
+            slot = shape._slots.get(self._name)
+            if self._type is None:
+                self._type, self._shape, self._slot = cls, shape, slot
+            else:
+                self._entries = {(self._type, self._shape): self._slot, key: slot}
+        else:
+            slot = entries.get(key, _MISSING)
+            if slot is _MISSING:
+                slot = shape._slots.get(self._name)
+                if len(entries) < _PROPERTY_CACHE_MAX_ENTRIES:
+                    entries[key] = slot
+        if slot is None:
+            return JS_UNDEFINED
+        return obj._storage[slot]
 
 
-class JSNumber(JSObject):
-    def __init__(self, value, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # no casting is required here,
-        # other functions / transpiler should ensure value is valid here
-        self._value = float(value)
+# access sites seeing more type and shape pairs than this are not cached any further
+_PROPERTY_CACHE_MAX_ENTRIES = 4
 
-    def __str__(self):
-        s = str(self._value)
-        if '.' in s:
-            s = s.rstrip("0").rstrip(".")
-        return s
+# marks the absence of an entry where None is a valid one
+_MISSING = object()
 
-    def __float__(self):
-        return self._value
 
-    # Bool representation
+class JSValue(object):
+    """
+    Base of all JS values, implementing the JS operators, see `_add` and co.
+    Subclasses only define their conversions (`__bool__`, `__float__` and `__str__`).
+    """
 
-    def __bool__(self):
-        return self._value != ""
+    __slots__ = ()
 
     # Unary Operators
 
     def __neg__(self):
-        return JSNumber(-1)
+        return _box_number(-_to_number(self))
 
     def __pos__(self):
-        if bool(self):
-            return JSNaN()
-        return JSNumber(0)
+        return _box_number(_to_number(self))
 
     def __invert__(self):
-        if bool(self):
-            return JSNaN()
-        return JSNumber(-0)
-
-    # ++ / -- support
-
-    def inc(self):
-        self._value += 1
-        return self
-
-    def pinc(self):
-        value = self._value
-        self._value += 1
-        return JSNumber(value)
-
-    def dec(self):
-        self._value -= 1
-        return self
-
-    def pdec(self):
-        value = self._value
-        self._value -= 1
-        return JSNumber(value)
+        return JSNumber(~_to_int32(self))
 
     # Absolute value, in JSLand triggered via Math.abs
 
     def __abs__(self):
-        return JSNaN()
-
-    # Binary Operators
-
-    def __add__(self, other):
-        if isinstance(other, JSString):
-            return str(self) + str(other)
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return JSNaN()
-        return JSNumber(self._value + f)
-
-    def __radd__(self, other):
-        return self + other
-
-    def __iadd__(self, other):
-        if isinstance(other, JSString):
-            return str(self) + str(other)
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return JSNaN()
-        self._value += f
-        return self
-
-    def __sub__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return JSNaN()
-        return JSNumber(self._value - f)
-
-    def __rsub__(self, other):
-        return self - other
-
-    def __isub__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return JSNaN()
-        self._value -= f
-        return self
-
-    def __mul__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return JSNaN()
-        return JSNumber(self._value * f)
-
-    def __rmul__(self, other):
-        return self * other
-
-    def __imul__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return JSNaN()
-        self._value *= f
-        return self
-
-    def __truediv__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return JSNaN()
-        return JSNumber(self._value / f)
-
-    def __rtruediv__(self, other):
-        return self / other
-
-    def __itruediv__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return JSNaN()
-        self._value /= f
-        return self
-
+        return _box_number(abs(_to_number(self)))
+
+    # Binary Operators,
+    # in-place variants are the same as values are immutable (or shared by reference)
+
+    __add__ = __iadd__ = _add
+    __radd__ = _radd
+    __sub__ = __isub__ = _sub
+    __rsub__ = _rsub
+    __mul__ = __imul__ = _mul
+    __rmul__ = _rmul
+    __truediv__ = __itruediv__ = _div
+    __rtruediv__ = _rdiv
     # Javascript has no floor div
+    __mod__ = __imod__ = _mod
+    __rmod__ = _rmod
+    __pow__ = __ipow__ = _pow
+    __rpow__ = _rpow
 
-    def __mod__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return JSNaN()
-        return JSNumber(self._value % f)
-
-    def __rmod__(self, other):
-        return self % other
-
-    def __imod__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return JSNaN()
-        self._value %= f
-        return self
+    # Binary bitwise operators
 
-    def __pow__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return JSNaN()
-        return JSNumber(self._value ** f)
+    __and__ = __iand__ = _and
+    __rand__ = _rand
+    __or__ = __ior__ = _or
+    __ror__ = _ror
+    __xor__ = __ixor__ = _xor
+    __rxor__ = _rxor
+    __lshift__ = __ilshift__ = _lshift
+    __rlshift__ = _rlshift
+    __rshift__ = __irshift__ = _rshift
+    __rrshift__ = _rrshift
+
+    # Binary logic operators,
+    # Python reflects these itself (e.g. `1 < x` as `x > 1`)
+
+    __eq__ = _eq
+    __ne__ = _ne
+    __lt__ = _lt
+    __gt__ = _gt
+    __le__ = _le
+    __ge__ = _ge
+
+    # values are compared by (loose) equality, they cannot be hashed
+    __hash__ = None
+
+
+class JSObject(JSValue):
+    # Objects use a compact slot-based layout,
+    # property storage is only created once a property is assigned,
+    # as most values (e.g. numbers and strings) never get any.
+    # The names of the properties are stored in the (shared) shape of the object.
+    __slots__ = ('_shape', '_storage', '_ref')
 
-    def __rpow__(self, other):
-        return self % other
+    _static_properties = {}
 
-    def __ipow__(self, other):
-        return self % other
+    @classmethod
+    def jsstaticmethod(cls, name, fn):
+        # TODO: validate if this is really what we want,
+        # the class being the owner...
+        fn = JSFunction(fn, parameters=parameters, owner=cls)
+        cls.jsstaticprop_set(name, fn)
+        return fn
 
-    # Binary bitwise operators
+    @staticmethod
+    def jsstaticprop_set(name, fn):
+        JSObject._static_properties[name] = fn
 
-    def __and__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return JSNaN()
-        return JSNumber(self._value & f)
+    @staticmethod
+    def jsstaticprop_del(name):
+        del JSObject._static_properties[name]
 
-    def __rand__(self, other):
-        return self & other
+    @staticmethod
+    def jsstaticprop_get(name):
+        return JSObject._static_properties[name]
 
-    def __iand__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return JSNaN()
-        self._value &= f
-        return self
+    def __init__(self, ref=None):
+        self._shape = _ROOT_SHAPE
+        self._storage = None
+        self.set_reference(ref)
 
-    def __or__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return JSNaN()
-        return JSNumber(self._value | f)
+    def set_reference(self, ref=None):
+        self._ref = ref or 'undefined'
 
-    def __ror__(self, other):
-        return self | other
+    def _declare_magic(self, name, value):
+        """
+        used internally (in builtin objects) only
+        """
+        slot = self._shape.slot(name)
+        if slot is None:
+            self._add_property(name, value, magic=True)
+        else:
+            self._storage[slot] = value
+
+    def _add_property(self, name, value, magic=False):
+        shape = self._shape
+        if not shape._dictionary:
+            next_shape = None
+            if len(shape) < _SHAPE_MAX_PROPERTIES:
+                next_shape = shape.transition(name, magic)
+            if next_shape is None:
+                self._to_dictionary()
+                shape = self._shape
+        if shape._dictionary:
+            shape._slots[name] = name
+            if magic:
+                shape._magic.add(name)
+            self._storage[name] = value
+            return
+        self._shape = next_shape
+        if self._storage is None:
+            self._storage = [value]
+        else:
+            self._storage.append(value)
 
-    def __ior__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return JSNaN()
-        self._value |= f
-        return self
+    def _to_dictionary(self):
+        shape = self._shape
+        storage = self._storage or ()
+        self._storage = {name: storage[slot]
+                         for name, slot in shape._slots.items()}
+        self._shape = shape.to_dictionary()
 
-    def __xor__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return JSNaN()
-        return JSNumber(self._value ^ f)
+    def assign(self, name, value):
+        if not isinstance(value, JSValue):
+            raise RuntimeError("only objects can be set as properties")
+        shape = self._shape
+        slot = shape._slots.get(name)
+        if slot is None:
+            self._add_property(name, value)
+        elif name not in shape._magic:
+            self._storage[slot] = value
+        return value
 
-    def __rxor__(self, other):
-        return self ^ other
+    # __setitem__ has no purpose, given it is not an expression
 
-    def __ixor__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return JSNaN()
-        self._value ^= f
-        return self
+    def __getitem__(self, name):
+        slot = self._shape._slots.get(name)
+        if slot is None:
+            return JS_UNDEFINED
+        return self._storage[slot]
 
-    def __lshift__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return self
-        return JSNumber(self._value << f)
+    def __delitem__(self, name):
+        shape = self._shape
+        if name not in shape._slots or name in shape._magic:
+            return False
+        if not shape._dictionary:
+            self._to_dictionary()
+            shape = self._shape
+        del shape._slots[name]
+        del self._storage[name]
+        return True
 
-    def __rlshift__(self, other):
-        return self << other
+    # function call
 
-    def __ilshift__(self, other):
-        f = float(other)
-        if not isinstance(f, JSNaN):
-            self._value <<= f
-        return self
+    def __call__(self, *args):
+        raise TypeError(f"{self._ref} is not a function")
 
-    def __rshift__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return self
-        return JSNumber(self._value >> f)
+    # ++ / -- support
 
-    def __rrshift__(self, other):
-        return self >> other
+    def inc(self):
+        raise SyntaxError(
+            "Invalid left-hand side expression in prefix operation")
 
-    def __irshift__(self, other):
-        f = float(other)
-        if not isinstance(f, JSNaN):
-            self._value >>= f
-        return self
+    def pinc(self):
+        raise SyntaxError(
+            "Invalid left-hand side expression in postfix operation")
 
-    # Binary logic operators
+    def dec(self):
+        raise SyntaxError(
+            "Invalid left-hand side expression in prefix operation")
 
-    def __eq__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return False
-        return self._value == f
+    def pdec(self):
+        raise SyntaxError(
+            "Invalid left-hand side expression in postfix operation")
 
-    def __neq__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return True
-        return self._value != f
+    # ++ / -- of a property (e.g. `obj.x++` or `a[i]--`),
+    # values are immutable, and thus the updated value is assigned to the property
 
-    def __gt__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return False
-        return self._value > f
+    def inc_item(self, name):
+        """
+        Prefix increment (`++obj[name]`), returning the updated value.
+        """
+        return self.assign(name, self[name].inc())
 
-    def __lt__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return False
-        return self._value < f
+    def pinc_item(self, name):
+        """
+        Postfix increment (`obj[name]++`), returning the original value.
+        """
+        value = self[name]
+        self.assign(name, value.inc())
+        return value
 
-    def __ge__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return False
-        return self._value >= f
+    def dec_item(self, name):
+        """
+        Prefix decrement (`--obj[name]`), returning the updated value.
+        """
+        return self.assign(name, self[name].dec())
 
-    def __le__(self, other):
-        f = float(other)
-        if isinstance(f, JSNaN):
-            return False
-        return self._value <= f
+    def pdec_item(self, name):
+        """
+        Postfix decrement (`obj[name]--`), returning the original value.
+        """
+        value = self[name]
+        self.assign(name, value.dec())
+        return value
 
+    # Str representation,
+    # important when for example adding with a string
 
-class JSNaN():
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    def __repr__(self):
+        return self.__str__()
 
     def __str__(self):
-        return "NaN"
+        return "[object Object]"
 
-    def __float__(self):
-        return self
+    def to_string(self):
+        return JSString(str(self), ref=self._ref)
 
     # Bool representation
 
     def __bool__(self):
-        return False
-
-    # Unary Operators
-
-    def __neg__(self):
-        return self
+        return True
 
-    def __pos__(self):
-        return self
+    def to_bool(self):
+        return JS_TRUE if self else JS_FALSE
 
-    def __invert__(self):
-        return JSNumber(-1)
+    # Number representation
 
-    # Absolute value, in JSLand triggered via Math.abs
+    def __float__(self):
+        return _to_number(self)
 
-    def __abs__(self):
-        return JSNaN()
+    def to_number(self):
+        return _box_number(_to_number(self))
 
-    # Binary Operators
 
-    def __add__(self, other):
-        if isinstance(other, JSString):
-            return str(self) + str(other)
-        return self
+class JSUndefined(JSObject):
+    """
+    undefined is interned: JSUndefined() always returns
+    the same immutable instance, also available as JS_UNDEFINED.
+    """
 
-    def __radd__(self, other):
-        return self + other
+    __slots__ = ()
 
-    def __iadd__(self, other):
-        if isinstance(other, JSString):
-            return str(self) + str(other)
-        return self
+    __instance = None
 
-    def __sub__(self, other):
-        return self
+    def __new__(cls, *args, **kwargs):
+        if cls.__instance is None:
+            cls.__instance = super().__new__(cls)
+            JSObject.__init__(cls.__instance, ref='undefined')
+        return cls.__instance
 
-    def __rsub__(self, other):
-        return self - other
+    def __reduce__(self):
+        # pickled by reference, preserving the identity of the interned instance
+        return 'JS_UNDEFINED'
 
-    def __isub__(self, other):
-        return self
+    def __init__(self, *args, **kwargs):
+        pass  # initialised only once, see __new__
 
-    def __mul__(self, other):
-        return self
+    def assign(self, name, value):
+        raise TypeError("Cannot set property '{name}' of undefined")
 
-    def __rmul__(self, other):
-        return self * other
+    def __getitem__(self, name):
+        raise TypeError("Cannot read property '{name}' of undefined")
 
-    def __imul__(self, other):
-        return self
+    def __str__(self):
+        return "undefined"
 
-    def __truediv__(self, other):
-        return self
+    def __bool__(self):
+        return False
 
-    def __rtruediv__(self, other):
-        return self / other
+    def __float__(self):
+        return _NAN
 
-    def __itruediv__(self, other):
-        return self
 
-    # Javascript has no floor div
+class JSNull(JSObject):
+    """
+    null is interned: JSNull() always returns
+    the same immutable instance, also available as JS_NULL.
+    """
 
-    def __mod__(self, other):
-        return self
+    __slots__ = ()
 
-    def __rmod__(self, other):
-        return self % other
+    __instance = None
 
-    def __imod__(self, other):
-        return self
+    def __new__(cls, *args, **kwargs):
+        if cls.__instance is None:
+            cls.__instance = super().__new__(cls)
+            JSObject.__init__(cls.__instance, ref='null')
+        return cls.__instance
 
-    def __pow__(self, other):
-        return self
+    def __reduce__(self):
+        # pickled by reference, preserving the identity of the interned instance
+        return 'JS_NULL'
 
-    def __rpow__(self, other):
-        return self % other
+    def __init__(self, *args, **kwargs):
+        pass  # initialised only once, see __new__
 
-    def __ipow__(self, other):
-        return self % other
+    def assign(self, name, value):
+        raise TypeError("Cannot set property '{name}' of undefined")
 
-    # Binary bitwise operators
+    def __getitem__(self, name):
+        raise TypeError("Cannot read property '{name}' of undefined")
 
-    def __and__(self, other):
-        return JSNumber(0) & other
+    def __str__(self):
+        return "null"
 
-    def __rand__(self, other):
-        return self & other
+    def __bool__(self):
+        return False
 
-    def __iand__(self, other):
-        return self & other
+    def __float__(self):
+        return 0.0
 
-    def __or__(self, other):
-        return JSNumber(0) | other
 
-    def __ror__(self, other):
-        return self | other
+class JSBool(JSObject):
+    """
+    Booleans are interned: JSBool(x) always returns one of
+    two immutable instances, also available as JS_TRUE and JS_FALSE.
+    """
 
-    def __ior__(self, other):
-        return self | other
+    __slots__ = ('_value',)
 
-    def __xor__(self, other):
-        return JSNumber(0) ^ other
+    __instances = {}
 
-    def __rxor__(self, other):
-        return self ^ other
+    def __new__(cls, value, *args, **kwargs):
+        value = bool(value)
+        try:
+            return cls.__instances[value]
+        except KeyError:
+            instance = super().__new__(cls)
+            JSObject.__init__(instance, ref="true" if value else "false")
+            instance._value = value
+            cls.__instances[value] = instance
+            return instance
 
-    def __ixor__(self, other):
-        return self ^ other
+    def __reduce__(self):
+        # pickled by reference, preserving the identity of the interned instances
+        return 'JS_TRUE' if self._value else 'JS_FALSE'
 
-    def __lshift__(self, other):
-        return JSNumber(0) << other
+    def __init__(self, *args, **kwargs):
+        pass  # initialised only once, see __new__
 
-    def __rlshift__(self, other):
-        return self << other
+    def assign(self, name, value):
+        # primitives silently ignore property assignments
+        return value
 
-    def __ilshift__(self, other):
-        return self << other
+    def __str__(self):
+        return "true" if self._value else "false"
 
-    def __rshift__(self, other):
-        return JSNumber(0) >> other
+    def __repr__(self):
+        return self.__str__()
 
-    def __rrshift__(self, other):
-        return self >> other
+    # Bool representation
 
-    def __irshift__(self, other):
-        return self >> other
+    def __bool__(self):
+        return self._value
 
-    # Binary logic operators
+    def __float__(self):
+        return 1.0 if self._value else 0.0
 
-    def __eq__(self, other):
-        return False
 
-    def __neq__(self, other):
-        return True
+class JSNumber(JSObject):
+    """
+    Numbers are immutable, operations always return a (new or interned) number,
+    such that a number can be safely shared between references.
 
-    def __gt__(self, other):
-        return False
+    Small integers (and -0) are preallocated, JSNumber(x) returns
+    the interned instance for those values.
+    """
 
-    def __lt__(self, other):
-        return False
+    __slots__ = ('_value',)
 
-    def __ge__(self, other):
-        return self == other or self > other
+    def __new__(cls, value, *args, **kwargs):
+        # no casting is required here,
+        # other functions / transpiler should ensure value is valid here
+        value = float(value)
+        if cls is JSNumber and not args and not kwargs:
+            return _box_number(value)
+        return cls._new(value, *args, **kwargs)
 
-    def __le__(self, other):
-        return self == other or self < other
+    @classmethod
+    def _new(cls, value, *args, **kwargs):
+        """
+        create a new number, bypassing the interned numbers,
+        value is expected to be a float already
+        """
+        number = object.__new__(cls)
+        if args or kwargs:
+            JSObject.__init__(number, *args, **kwargs)
+        else:
+            # inlined JSObject.__init__, numbers are created for most operations
+            number._shape = _ROOT_SHAPE
+            number._storage = None
+            number._ref = 'undefined'
+        number._value = value
+        return number
 
+    def __reduce__(self):
+        # unpickled as interned number where possible (Infinity included)
+        return (_box_number, (self._value,))
 
-class JSInfinity(JSNumber):
     def __init__(self, *args, **kwargs):
-        super().__init__(float('+Inf'), *args, **kwargs)
+        pass  # initialised in __new__, numbers are immutable
 
     def __str__(self):
-        return "Infinity" if self._value == float("+Inf") else "-Infinity"
+        return _number_to_string(self._value)
 
     def __float__(self):
-        return self
+        return self._value
 
     # Bool representation
 
     def __bool__(self):
-        return False
+        # both 0 and -0 are falsy, NaN is its own type
+        return self._value != 0
 
-    # Unary Operators
+    # Unary Operators, binary operators are inherited from JSValue
 
     def __neg__(self):
-        r = JSInfinity()
-        r._value = -self._value
-        return r
+        return _box_number(-self._value)
 
     def __pos__(self):
         return self
 
     def __invert__(self):
-        return JSNumber(-1)
-
-    # Absolute value, in JSLand triggered via Math.abs
-
-    def __abs__(self):
-        return self
+        return JSNumber(~_int32(self._value))
 
-    # Binary Operators
-
-    def __add__(self, other):
-        if isinstance(other, JSString):
-            return str(self) + str(other)
-        return self
+    # ++ / -- support,
+    # returning the updated number, which is to be (re)assigned to
+    # its reference (e.g. via `Scope.inc`), as numbers are immutable
 
-    def __radd__(self, other):
-        return self + other
-
-    def __iadd__(self, other):
-        if isinstance(other, JSString):
-            return str(self) + str(other)
-        return self
-
-    def __sub__(self, other):
-        return JSNaN()
-
-    def __rsub__(self, other):
-        return self - other
-
-    def __isub__(self, other):
-        return JSNaN()
-
-    def __mul__(self, other):
-        return self
-
-    def __rmul__(self, other):
-        return self * other
-
-    def __imul__(self, other):
-        return self
-
-    def __truediv__(self, other):
-        return self
-
-    def __rtruediv__(self, other):
-        return self / other
-
-    def __itruediv__(self, other):
-        return self
-
-    # Javascript has no floor div
-
-    def __mod__(self, other):
-        return self
-
-    def __rmod__(self, other):
-        return self % other
-
-    def __imod__(self, other):
-        return self
-
-    def __pow__(self, other):
-        return self
-
-    def __rpow__(self, other):
-        return self % other
+    def inc(self):
+        return _box_number(self._value + 1)
 
-    def __ipow__(self, other):
-        return self % other
+    def dec(self):
+        return _box_number(self._value - 1)
 
-    # Binary bitwise operators
+    # Absolute value, in JSLand triggered via Math.abs
 
-    def __and__(self, other):
-        return JSNumber(0) & other
+    def __abs__(self):
+        return _box_number(abs(self._value))
 
-    def __rand__(self, other):
-        return self & other
 
-    def __iand__(self, other):
-        return self & other
+class JSNaN(JSValue):
+    """
+    NaN is interned: JSNaN() always returns
+    the same immutable instance, also available as JS_NAN.
+    """
 
-    def __or__(self, other):
-        return JSNumber(0) | other
+    __slots__ = ()
 
-    def __ror__(self, other):
-        return self | other
+    __instance = None
 
-    def __ior__(self, other):
-        return self | other
+    def __new__(cls, *args, **kwargs):
+        if cls.__instance is None:
+            cls.__instance = super().__new__(cls)
+        return cls.__instance
 
-    def __xor__(self, other):
-        return JSNumber(0) ^ other
+    def __reduce__(self):
+        # pickled by reference, preserving the identity of the interned instance
+        return 'JS_NAN'
 
-    def __rxor__(self, other):
-        return self ^ other
+    def __str__(self):
+        return "NaN"
 
-    def __ixor__(self, other):
-        return self ^ other
+    def __repr__(self):
+        return self.__str__()
 
-    def __lshift__(self, other):
-        return JSNumber(0) << other
+    def __float__(self):
+        return _NAN
 
-    def __rlshift__(self, other):
-        return self << other
+    # ++ / --, NaN remains NaN
 
-    def __ilshift__(self, other):
-        return self << other
+    def inc(self):
+        return self
 
-    def __rshift__(self, other):
-        return JSNumber(0) >> other
+    def dec(self):
+        return self
 
-    def __rrshift__(self, other):
-        return self >> other
+    # property access, NaN has no properties of its own (as any other number)
 
-    def __irshift__(self, other):
-        return self >> other
+    def __getitem__(self, name):
+        return JS_UNDEFINED
 
-    # Binary logic operators
+    # Bool representation
 
-    def __eq__(self, other):
+    def __bool__(self):
         return False
 
-    def __neq__(self, other):
-        return True
 
-    def __gt__(self, other):
-        return False
+class JSInfinity(JSNumber):
+    __slots__ = ()
 
-    def __lt__(self, other):
-        return False
+    def __new__(cls, *args, **kwargs):
+        return cls._new(float('+Inf'), *args, **kwargs)
 
-    def __ge__(self, other):
-        return self == other or self > other
+    def __str__(self):
+        return "Infinity" if self._value == float("+Inf") else "-Infinity"
 
-    def __le__(self, other):
-        return self == other or self < other
+    def __float__(self):
+        return self._value
 
 
 class JSString(JSObject):
+    __slots__ = ('_value',)
+
     def __init__(self, value, *args, **kwargs):
         super().__init__(*args, **kwargs)
         # TODO do we need value casting here?
@@ -1112,59 +1160,508 @@ class JSString(JSObject):
         return self._value != ""
 
     def __float__(self):
-        try:
-            # TODO: validate this gives the exact same results as JS
-            return float(self._value)
-        except Exception:
-            raise ObjectIsNaNError()
+        return _string_to_number(self._value)
 
     def is_empty(self):
         return not self._value.strip()
 
 
 class JSArray(JSObject):
+    """
+    A Javascript array, storing its elements in one of three modes:
+
+    - numbers: a dense (packed) `array('d')`, used while all elements are numbers;
+    - objects: a dense list, used for any other elements;
+    - sparse: a dict mapping indices to elements, used for arrays with holes;
+
+    Arrays transition between these modes automatically as elements are set,
+    added or removed. Elements of a numbers array are boxed once read.
+    """
+
+    __slots__ = ('_mode', '_values', '_length', '_bound_methods')
+
+    _MODE_NUMBERS = 0
+    _MODE_OBJECTS = 1
+    _MODE_SPARSE = 2
+
+    # native methods, available as properties of any array,
+    # called with the array as owner (`this`)
+    _methods = {}
+
     def __init__(self, values, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if not isinstance(values, Sequence):
             raise RuntimeError(
                 f"BUG: unexpected values object {values}; expected an Sequence object")
-        self._values = values
+        numbers = array_type('d')
+        for value in values:
+            number = _number_value(value)
+            if number is None:
+                self._mode = self._MODE_OBJECTS
+                self._values = list(values)
+                break
+            numbers.append(number)
+        else:
+            self._mode = self._MODE_NUMBERS
+            self._values = numbers
+        self._length = 0  # only used in sparse mode
+        # native methods bound to this array, created once first accessed
+        self._bound_methods = None
 
-    def __iter__(self):
-        return self._values.__iter__()
+    @classmethod
+    def _from_numbers(cls, numbers):
+        """
+        Create a numbers array directly from an `array('d')`.
+        """
+        obj = cls(())
+        obj._values = numbers
+        return obj
+
+    # element access
 
-    def __next__(self):
-        return self._values.__next__()
+    @property
+    def length(self):
+        if self._mode == self._MODE_SPARSE:
+            return self._length
+        return len(self._values)
 
-    def __getitem__(self, index):
+    def get(self, index):
+        """
+        Return the element at the given (int) index, undefined if there is none.
+        """
+        mode = self._mode
+        if mode == self._MODE_SPARSE:
+            return self._values.get(index, JS_UNDEFINED)
+        if index < 0:
+            return JS_UNDEFINED
         try:
-            self._values.__getitem__(index)
+            value = self._values[index]
         except IndexError:
-            return JSUndefined()
+            return JS_UNDEFINED
+        if mode == self._MODE_NUMBERS:
+            return _box_number(value)
+        return value
+
+    def set(self, index, value):
+        """
+        Set the element at the given (int) index.
+        """
+        if not isinstance(value, JSValue):
+            raise RuntimeError("only objects can be set as elements")
+        mode = self._mode
+        if mode == self._MODE_SPARSE:
+            values = self._values
+            values[index] = value
+            if index >= self._length:
+                self._length = index + 1
+            if len(values) == self._length:
+                self._to_dense()
+            return value
+        length = len(self._values)
+        if index > length:
+            self._to_sparse()
+            return self.set(index, value)
+        if mode == self._MODE_NUMBERS:
+            number = _number_value(value)
+            if number is None:
+                self._to_objects()
+            elif index == length:
+                self._values.append(number)
+                return value
+            else:
+                self._values[index] = number
+                return value
+        if index == length:
+            self._values.append(value)
+        else:
+            self._values[index] = value
+        return value
+
+    def delete(self, index):
+        """
+        Delete the element at the given (int) index, leaving a hole.
+        """
+        if index >= self.length:
+            return True
+        if self._mode != self._MODE_SPARSE:
+            self._to_sparse()
+        self._values.pop(index, None)
+        return True
+
+    def set_length(self, length):
+        """
+        Truncate the array, or grow it with holes.
+        """
+        current = self.length
+        if length < current:
+            if self._mode == self._MODE_SPARSE:
+                self._values = {index: value for index, value in self._values.items()
+                                if index < length}
+                self._length = length
+                if len(self._values) == length:
+                    self._to_dense()
+            else:
+                del self._values[length:]
+        elif length > current:
+            if self._mode != self._MODE_SPARSE:
+                self._to_sparse()
+            self._length = length
+
+    def push(self, *values):
+        """
+        Add the values at the end of the array, returning its new length.
+        """
+        for value in values:
+            self.set(self.length, value)
+        return self.length
+
+    def pop(self):
+        """
+        Remove the last element of the array, returning it.
+        """
+        length = self.length
+        if not length:
+            return JS_UNDEFINED
+        value = self.get(length - 1)
+        if self._mode == self._MODE_SPARSE:
+            self._values.pop(length - 1, None)
+            self._length = length - 1
+            if len(self._values) == self._length:
+                self._to_dense()
+        else:
+            self._values.pop()
+        return value
+
+    # mode transitions
+
+    def _to_objects(self):
+        self._values = [_box_number(value) for value in self._values]
+        self._mode = self._MODE_OBJECTS
+
+    def _to_sparse(self):
+        length = self.length
+        self._values = dict(enumerate(self))
+        self._length = length
+        self._mode = self._MODE_SPARSE
+
+    def _to_dense(self):
+        values = [self._values[index] for index in range(self._length)]
+        numbers = array_type('d')
+        for value in values:
+            number = _number_value(value)
+            if number is None:
+                self._mode = self._MODE_OBJECTS
+                self._values = values
+                return
+            numbers.append(number)
+        self._mode = self._MODE_NUMBERS
+        self._values = numbers
+
+    # properties
+
+    def assign(self, name, value):
+        index = _array_index(name)
+        if index is not None:
+            return self.set(index, value)
+        if name == "length":
+            length = _array_index(value)
+            if length is None:
+                raise RangeError("Invalid array length")
+            self.set_length(length)
+            return value
+        return super().assign(name, value)
+
+    def __getitem__(self, name):
+        index = _array_index(name)
+        if index is not None:
+            return self.get(index)
+        if name == "length":
+            return JSNumber(self.length)
+        value = super().__getitem__(name)
+        if value is JS_UNDEFINED:
+            name = str(name)
+            bound_methods = self._bound_methods
+            if bound_methods is not None and name in bound_methods:
+                return bound_methods[name]
+            method = self._methods.get(name)
+            if method is not None:
+                function = JSFunction(method, owner=self, ref=name)
+                if bound_methods is None:
+                    bound_methods = self._bound_methods = {}
+                bound_methods[name] = function
+                return function
+        return value
+
+    def __delitem__(self, name):
+        index = _array_index(name)
+        if index is not None:
+            return self.delete(index)
+        return super().__delitem__(name)
+
+    # Python sequence protocol
+
+    def __iter__(self):
+        mode = self._mode
+        if mode == self._MODE_NUMBERS:
+            return map(_box_number, self._values)
+        if mode == self._MODE_SPARSE:
+            values = self._values
+            return (values.get(index, JS_UNDEFINED) for index in range(self._length))
+        return iter(self._values)
 
     def __len__(self):
-        return self._values.__len__()
+        return self.length
 
     def __contains__(self, value):
-        return self._values.__contains__(value)
+        return any(element is value or element == value for element in self)
 
     def __reversed__(self):
-        yield from self._values.__reversed__()
+        for index in range(self.length - 1, -1, -1):
+            yield self.get(index)
+
+    def __setitem__(self, name, value):
+        self.assign(name, value)
 
-    def __setitem__(self, index, value):
-        self._values.__setitem__(index, value)
+    def __str__(self):
+        return ",".join(
+            "" if value is JS_UNDEFINED or value is JS_NULL else str(value)
+            for value in self)
 
-    def __delitem__(self, index):
-        self._values.__delitem__(index)
 
-    def __iadd__(self, value):
-        return self._values.__iadd__(value)
+def _array_push(scope):
+    return JSNumber(scope.this.push(*scope.arguments))
 
-    def __add__(self, value):
-        return self._values.__add__(value)
 
-    def __str__(self):
-        return ",".join(str(value) for value in self._values)
+def _array_pop(scope):
+    return scope.this.pop()
+
+
+# Iteration methods (map, filter, reduce and forEach)
+#
+# The callback is called for each element (holes are skipped),
+# with as arguments the element, its index and the array itself.
+#
+# Numbers arrays are processed in a single vectorized (NumPy) operation instead,
+# in case NumPy is available and the callback was created with a numeric kernel:
+# a pure function taking the elements as a float64 ndarray (map, filter)
+# or a binary `numpy.ufunc` (reduce), e.g.:
+#
+#     JSFunction(double, parameters=["x"], kernel=lambda x: x * 2)
+#     JSFunction(add, parameters=["a", "b"], kernel=numpy.add)
+#
+# The kernel has to produce the same results as the callback itself,
+# which remains used for all other arrays. Note that `numpy.add.reduce` sums
+# pairwise, which can differ in the last bits from the sequential JS sum.
+# forEach is never vectorized, given its callback is only called for its side effects.
+
+# arrays with less elements than this are not worth vectorizing
+_VECTORIZE_MIN_LENGTH = 64
+
+
+def _numpy():
+    """
+    Return the numpy module, None if it is not installed.
+    Only imported once an array operation can make use of it.
+    """
+    global _numpy_module
+    if _numpy_module is _MISSING:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy_module = numpy
+    return _numpy_module
+
+
+_numpy_module = _MISSING
+
+
+def _array_kernel(array, callback):
+    """
+    Return the numpy module and kernel of the callback if the operation
+    can be vectorized, a (None, None) pair otherwise.
+    """
+    kernel = callback._kernel
+    if (kernel is None or array._mode != JSArray._MODE_NUMBERS
+            or len(array._values) < _VECTORIZE_MIN_LENGTH):
+        return None, None
+    np = _numpy()
+    if np is None:
+        return None, None
+    return np, kernel
+
+
+def _array_callback(scope, method):
+    arguments = scope.arguments
+    callback = arguments[0]
+    if not isinstance(callback, JSFunction):
+        raise TypeError(f"{callback} is not a function")
+    array = scope.this
+    if not isinstance(array, JSArray):
+        raise TypeError(f"Array.prototype.{method} called on non-array")
+    return array, callback, arguments
+
+
+def _array_elements(array):
+    """
+    Yield the index and element pairs of the array, skipping holes.
+    Elements added during iteration are not visited.
+    """
+    for index in range(array.length):
+        if array._mode == JSArray._MODE_SPARSE:
+            if index not in array._values:
+                continue
+        elif index >= len(array._values):
+            return
+        yield index, array.get(index)
+
+
+def _array_map(scope):
+    array, callback, _ = _array_callback(scope, "map")
+    np, kernel = _array_kernel(array, callback)
+    if np is not None:
+        values = np.frombuffer(array._values, dtype=np.float64)
+        result = np.broadcast_to(kernel(values), values.shape)
+        if result.dtype == np.bool_:
+            return JSArray([JS_TRUE if value else JS_FALSE for value in result.tolist()])
+        numbers = array_type('d')
+        numbers.frombytes(np.ascontiguousarray(result, dtype=np.float64).tobytes())
+        return JSArray._from_numbers(numbers)
+    length = array.length
+    if array._mode == JSArray._MODE_SPARSE:
+        result = JSArray(())
+        result.set_length(length)
+        for index, value in _array_elements(array):
+            result.set(index, callback(scope, value, JSNumber(index), array))
+        return result
+    result = JSArray([
+        callback(scope, value, JSNumber(index), array)
+        for index, value in _array_elements(array)])
+    # elements removed during iteration leave holes
+    result.set_length(length)
+    return result
+
+
+def _array_filter(scope):
+    array, callback, _ = _array_callback(scope, "filter")
+    np, kernel = _array_kernel(array, callback)
+    if np is not None:
+        values = np.frombuffer(array._values, dtype=np.float64)
+        mask = np.broadcast_to(kernel(values), values.shape)
+        if mask.dtype != np.bool_:
+            # same as the truthiness of a JS number
+            mask = (mask != 0) & ~np.isnan(mask)
+        numbers = array_type('d')
+        numbers.frombytes(values[mask].tobytes())
+        return JSArray._from_numbers(numbers)
+    return JSArray([
+        value for index, value in _array_elements(array)
+        if callback(scope, value, JSNumber(index), array)])
+
+
+def _array_reduce(scope):
+    array, callback, arguments = _array_callback(scope, "reduce")
+    has_initial = len(arguments) > 1
+    np, kernel = _array_kernel(array, callback)
+    if np is not None and isinstance(kernel, np.ufunc) and kernel.nin == 2:
+        values = np.frombuffer(array._values, dtype=np.float64)
+        if has_initial:
+            initial = _number_value(arguments[1])
+            if initial is not None:
+                return _box_number(float(kernel.reduce(values, initial=initial)))
+        else:
+            return _box_number(float(kernel.reduce(values)))
+    elements = _array_elements(array)
+    if has_initial:
+        accumulator = arguments[1]
+    else:
+        for _, accumulator in elements:
+            break
+        else:
+            raise TypeError("Reduce of empty array with no initial value")
+    for index, value in elements:
+        accumulator = callback(scope, accumulator, value, JSNumber(index), array)
+    return accumulator
+
+
+def _array_for_each(scope):
+    array, callback, _ = _array_callback(scope, "forEach")
+    for index, value in _array_elements(array):
+        callback(scope, value, JSNumber(index), array)
+    return JS_UNDEFINED
+
+
+JSArray._methods.update(
+    push=_array_push, pop=_array_pop,
+    map=_array_map, filter=_array_filter,
+    reduce=_array_reduce, forEach=_array_for_each)
+
+
+# the largest valid array index, as defined by ECMAScript
+_ARRAY_INDEX_MAX = 2 ** 32 - 2
+
+
+def _array_index(name):
+    """
+    Return the given property name as an (int) array index,
+    None if it is not a valid array index.
+    """
+    t = type(name)
+    if t is int:
+        index = name
+    elif t is JSNumber:
+        value = name._value
+        if not value.is_integer():
+            return None
+        index = int(value)
+    else:
+        if t is JSString:
+            name = name._value
+        elif t is not str:
+            return None
+        if not name.isdigit() or (name[0] == "0" and name != "0"):
+            return None
+        index = int(name)
+    if 0 <= index <= _ARRAY_INDEX_MAX:
+        return index
+    return None
+
+
+def _number_value(value):
+    """
+    Return the float value of the given JS number, None if it is not a number.
+    """
+    if isinstance(value, JSNumber):
+        return value._value
+    if value is JS_NAN:
+        return _NAN
+    return None
+
+
+def _box_number(value):
+    """
+    Return the given float as a JS number,
+    the interned instance for small integers (and -0).
+    """
+    if value.is_integer():
+        if _JS_SMALL_INT_MIN <= value <= _JS_SMALL_INT_MAX:
+            if value or copysign(1.0, value) > 0:
+                index = int(value)
+                number = _JS_SMALL_INTS.get(index)
+                if number is None:
+                    # setdefault, such that threads creating the same number
+                    # at the same time all return the one interned instance
+                    number = _JS_SMALL_INTS.setdefault(index, JSNumber._new(value))
+                return number
+            return JS_NEGATIVE_ZERO
+    elif value - value:
+        # NaN for both NaN and the infinities, 0 for any other number
+        return JS_NAN if value != value else JSInfinity._new(value)
+    return JSNumber._new(value)
+
+
+_NAN = float('NaN')
+_INFINITIES = (float('+Inf'), float('-Inf'))
 
 
 class JSFunction(JSObject):
@@ -1175,17 +1672,27 @@ class JSFunction(JSObject):
     something like `__lambda_DE09030AEF` :) Ugly but it should work with our current setup.
     """
 
+    __slots__ = ('_fn', '_parameters', '_layout', '_owner', '_repr', '_kernel')
+
     def __init__(self, fn, parameters=None, *args,
-                 owner=None, repr=None, **kwargs):
+                 owner=None, repr=None, kernel=None, **kwargs):
         super().__init__(*args, **kwargs)
         self._fn = fn
-        self._parameters = parameters or []
+        # optional numeric kernel, see `JSArray.map` and co
+        self._kernel = kernel
+        self._parameters = tuple(parameters or ())
+        if len(set(self._parameters)) != len(self._parameters):
+            raise SyntaxError(
+                "Duplicate parameter name not allowed in this context")
+        # the layout of the parameters is the same for each call,
+        # and thus only created once
+        self._layout = ScopeLayout(param_names=self._parameters)
         self._owner = owner
         self._repr = repr
 
     def __call__(self, scope, *args):
         fn_scope = FunctionScope(
-            scope, self._parameters, args, owner=self._owner)
+            scope, self._parameters, args, owner=self._owner, layout=self._layout)
         return self._fn(fn_scope)
 
     def __str__(self):
@@ -1194,6 +1701,84 @@ class JSFunction(JSObject):
         return f"[Function: {self._ref}]"
 
 
+###############################################
+# Interned primitive values
+###############################################
+
+# These are the only instances of their type ever created,
+# compare against them by identity (e.g. `value is JS_UNDEFINED`).
+JS_UNDEFINED = JSUndefined()
+JS_NULL = JSNull()
+JS_NAN = JSNaN()
+JS_TRUE = JSBool(True)
+JS_FALSE = JSBool(False)
+
+# Commonly used numbers, JSNumber(x) returns the same instance for any of these values.
+_JS_SMALL_INT_MIN = -128
+_JS_SMALL_INT_MAX = 1023
+# created once first used, rather than all of them at import time
+_JS_SMALL_INTS = {}
+JS_ZERO = JSNumber(0)
+JS_NEGATIVE_ZERO = JSNumber._new(-0.0)
+
+
+###############################################
+# Operator dispatch tables
+###############################################
+
+# primitive JS types, other JS objects are converted to a string by ToPrimitive
+_PRIMITIVE_TYPES = (JSNumber, JSString, JSBool, JSUndefined, JSNull)
+
+# ToNumber conversions by type, see `_to_number`
+_TO_NUMBER = {
+    JSInfinity: lambda value: value._value,
+    JSNaN: lambda value: _NAN,
+    JSString: lambda value: _string_to_number(value._value),
+    JSBool: lambda value: 1.0 if value._value else 0.0,
+    JSNull: lambda value: 0.0,
+    JSUndefined: lambda value: _NAN,
+    float: float,
+    int: float,
+    bool: float,
+    str: _string_to_number,
+}
+
+_ADD = _DispatchTable(_add_generic, {
+    (JSString, JSString): lambda left, right: JSString(left._value + right._value),
+    (JSString, JSNumber): lambda left, right: JSString(left._value + str(right)),
+    (JSNumber, JSString): lambda left, right: JSString(str(left) + right._value),
+    (JSNumber, float): lambda left, right: _box_number(left._value + right),
+    (float, JSNumber): lambda left, right: _box_number(left + right._value),
+})
+_SUB = _DispatchTable(_arithmetic_operator(lambda left, right: left - right))
+_MUL = _DispatchTable(_arithmetic_operator(lambda left, right: left * right))
+_DIV = _DispatchTable(_arithmetic_operator(_number_div))
+_MOD = _DispatchTable(_arithmetic_operator(_number_mod))
+_POW = _DispatchTable(_arithmetic_operator(_number_pow))
+
+_AND = _DispatchTable(_bitwise_operator(lambda left, right: left & right))
+_OR = _DispatchTable(_bitwise_operator(lambda left, right: left | right))
+_XOR = _DispatchTable(_bitwise_operator(lambda left, right: left ^ right))
+_LSHIFT = _DispatchTable(_bitwise_operator(lambda left, right: left << (right & 31)))
+_RSHIFT = _DispatchTable(_bitwise_operator(lambda left, right: left >> (right & 31)))
+
+_LT = _DispatchTable(_relational_operator(lambda left, right: left < right), {
+    (JSString, JSString): lambda left, right: JS_TRUE if left._value < right._value else JS_FALSE,
+})
+_GT = _DispatchTable(_relational_operator(lambda left, right: left > right), {
+    (JSString, JSString): lambda left, right: JS_TRUE if left._value > right._value else JS_FALSE,
+})
+_LE = _DispatchTable(_relational_operator(lambda left, right: left <= right), {
+    (JSString, JSString): lambda left, right: JS_TRUE if left._value <= right._value else JS_FALSE,
+})
+_GE = _DispatchTable(_relational_operator(lambda left, right: left >= right), {
+    (JSString, JSString): lambda left, right: JS_TRUE if left._value >= right._value else JS_FALSE,
+})
+_EQ = _DispatchTable(_eq_generic, {
+    (JSString, JSString): lambda left, right: JS_TRUE if left._value == right._value else JS_FALSE,
+})
+
+
 ###############################################
 # Utilities part of our version of JS runtime
 ###############################################
@@ -1206,7 +1791,8 @@ def jschain(scope, *raw_expressions):
     complicated using quite detailed unrolling of code..
 
     To be used like:
-    jschain(scope, r'''scope["i"]''', r'''scope["i"] += 1''', r'''scope["u"].pinc()''', r'''scope['i']''')
+    jschain(scope, r'''scope["i"]''', r'''scope["i"] += 1''',
+            r'''scope.pinc("u")''', r'''scope['i']''')
 
     We use a raw string to ensure all characters remain intact as they are
     and for it we use a triple single quotes as all multiline strings generated by
@@ -1216,20 +1802,126 @@ def jschain(scope, *raw_expressions):
     should always genrate assignments using `scope.assign("i", 5)` instead of
     `scope["i"] = 5` as otherwise no return value is received...
     Same goes for in-place operators where you want to use `__iadd__` instead of `+=` for example.
+
+    The raw expressions are only compiled the first time a chain is evaluated,
+    and are evaluated against the namespace of the caller. Alternatively the transpiler
+    can emit chains as a plain tuple expression, not requiring this function at all.
+    """
+    statements, last, is_expression = _jschain_compile(raw_expressions)
+    caller = sys._getframe(1)
+    global_namespace, local_namespace = caller.f_globals, caller.f_locals
+    if 'scope' not in local_namespace and 'scope' not in global_namespace:
+        local_namespace = dict(local_namespace, scope=scope)
+    for code in statements:
+        exec(code, global_namespace, local_namespace)
+    if is_expression:
+        return eval(last, global_namespace, local_namespace)
+    exec(last, global_namespace, local_namespace)
+    return None
+
+
+_JSCHAIN_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=_JSCHAIN_CACHE_SIZE)
+def _jschain_compile(raw_expressions):
     """
-    for rexpr in raw_expressions[:len(raw_expressions)-1]:
-        exec(rexpr)
+    Compile the raw expressions of a chain into code objects,
+    cached by the (tuple of) raw expressions, returning
+    the code of all leading statements, the code of the last one,
+    and whether or not that last one is an expression.
+    """
+    statements = tuple(compile(rexpr, '<jschain>', 'exec')
+                       for rexpr in raw_expressions[:-1])
     try:
-        return eval(raw_expressions[-1])
+        return statements, compile(raw_expressions[-1], '<jschain>', 'eval'), True
     except SyntaxError:
-        exec(raw_expressions[-1])
-        return None
+        return statements, compile(raw_expressions[-1], '<jschain>', 'exec'), False
+
+
+def jsrange(start, stop, step=1, inclusive=False, unboxed=False):
+    """
+    Iterate over the values of a counting loop, generated by the transpiler
+    for loops such as `for (let i = start; i < stop; i += step)`,
+    with `inclusive` for `<=` (or `>=` when counting down using a negative step).
+
+    The values are yielded as JS numbers, using the interned instances
+    for small integers, or as plain floats for an `unboxed` counter.
+    The stop value is only evaluated once, as it is not modified by the loop.
+    """
+    start, stop, step = _to_number(start), _to_number(stop), float(step)
+    if (start.is_integer() and step.is_integer() and step
+            and abs(start) <= _MAX_SAFE_INTEGER and abs(stop) <= _MAX_SAFE_INTEGER):
+        # integer counting: a native range, exact for all safe integers
+        if step > 0:
+            end = floor(stop) + 1 if inclusive else ceil(stop)
+        else:
+            end = ceil(stop) - 1 if inclusive else floor(stop)
+        values = map(float, range(int(start), end, int(step)))
+    else:
+        # NaN, the infinities and fractions, accumulated as JS would
+        if step > 0:
+            compare = float.__le__ if inclusive else float.__lt__
+        else:
+            compare = float.__ge__ if inclusive else float.__gt__
+        values = _jsrange_floats(start, stop, step, compare)
+    return values if unboxed else map(_box_number, values)
+
+
+_MAX_SAFE_INTEGER = 2.0 ** 53 - 1
+
+
+def _jsrange_floats(value, stop, step, compare):
+    while compare(value, stop):
+        yield value
+        value += step
 
 
 ###############################################
 # Scope Types
 ###############################################
 
+class ScopeLayout(object):
+    """
+    The bindings of a scope as known up front (e.g. by the transpiler),
+    each binding getting a fixed slot index. A layout is frozen and shared by
+    all scopes created using it, such that creating a scope only requires
+    allocating the (flat) kinds and values of its slots.
+
+    - params are declared as soon as the scope is created;
+    - vars are hoisted, and thus declared (as undefined) as well;
+    - lexical bindings (let, const) are only declared once the declaration is executed;
+    """
+
+    __slots__ = ('_slots', '_kinds', '_local')
+
+    def __init__(self, param_names=(), var_names=(), lexical_names=()):
+        slots = {}
+        kinds = []
+        for names, kind in (
+                (param_names, Scope._REF_KIND_PARAM),
+                (var_names, Scope._REF_KIND_VAR),
+                (lexical_names, Scope._REF_KIND_UNDECLARED)):
+            for name in names:
+                if name in slots:
+                    continue  # e.g. a var with the same name as a param
+                slots[name] = len(kinds)
+                kinds.append(kind)
+        self._slots = slots
+        self._kinds = tuple(kinds)
+        # set once used for a non-global scope, see `Scope._bind_local_names`
+        self._local = False
+
+    def __len__(self):
+        return len(self._kinds)
+
+    def slot(self, name):
+        """
+        Return the slot index of the given name, None if not part of this layout.
+        """
+        return self._slots.get(name)
+
+
 class Scope(object):
     """
     Scope is meant to help easier deal with how scoping
@@ -1245,34 +1937,194 @@ class Scope(object):
       - raises an exception in case it is re-declared
     - const:
       - same as `let` but cannot be assigned once declared
+
+    Bindings are stored in flat slots: parallel lists of kinds and values,
+    indexed using a name->slot mapping. That mapping is shared with the
+    (frozen) layout of the scope, and is only copied once a binding unknown to
+    that layout is declared (e.g. one introduced by `eval`). Bindings can
+    be addressed by name or using the (depth, slot) address returned by `resolve`.
+
+    A scope can be forked, see `snapshot` and `fork`, the kinds and values of
+    a fork are shared with its snapshot until the fork first writes to them.
     """
 
-    __REF_KIND_VAR = 1
-    __REF_KIND_LET = 2
-    __REF_KIND_CONST = 3
+    _REF_KIND_UNDECLARED = 0
+    _REF_KIND_VAR = 1
+    _REF_KIND_LET = 2
+    _REF_KIND_CONST = 3
+
+    _REF_KIND_PARAM = 10
 
-    __REF_KIND_RESERVED = 40
-    __REF_KIND_MAGIC = 42  # magical builtin behavior, be amazed or scared, choose wisely
+    _REF_KIND_RESERVED = 40
+    _REF_KIND_MAGIC = 42  # magical builtin behavior, be amazed or scared, choose wisely
 
-    def __init__(self, parent_scope=None):
+    # All names ever bound in a non-global scope, and a counter bumped each time
+    # a name is added to it. Global lookups cached by a `GlobalLookupCache` remain
+    # valid for as long as this counter is unchanged, as their name cannot be shadowed.
+    _local_names = set()
+    _local_names_epoch = 0
+
+    def __init__(self, parent_scope=None, layout=None):
         self._parent_scope = parent_scope
-        self._refs = {}
+        self._root = self if parent_scope is None else parent_scope._root
+        self._layout = layout or _EMPTY_SCOPE_LAYOUT
+        self._slots = self._layout._slots  # copied on write, see `_declare`
+        self._kinds = list(self._layout._kinds)
+        self._values = [JS_UNDEFINED] * len(self._kinds)
+        self._shared = False  # kinds and values shared with a snapshot
+        if parent_scope is not None and not self._layout._local:
+            self._layout._local = True
+            Scope._bind_local_names(self._slots)
+
+    @staticmethod
+    def _bind_local_names(names):
+        """
+        Mark the names as bound in a non-global scope (shadowing any global),
+        invalidating all cached global lookups in case any of them is new.
+        """
+        if not Scope._local_names.issuperset(names):
+            Scope._local_names.update(names)
+            Scope._local_names_epoch += 1
+
+    def _declare(self, name, kind, value):
+        """
+        (Re)declare the binding within this scope, without any checks.
+        """
+        if self._shared:
+            self._own()
+        slot = self._slots.get(name)
+        if slot is None:
+            if self._slots is self._layout._slots:
+                self._slots = dict(self._slots)
+            self._slots[name] = len(self._values)
+            self._kinds.append(kind)
+            self._values.append(value)
+            if self._parent_scope is not None and name not in Scope._local_names:
+                Scope._bind_local_names((name,))
+        else:
+            self._kinds[slot] = kind
+            self._values[slot] = value
+
+    def _declared_slot(self, name):
+        """
+        Return the slot of the name if declared in this scope, None otherwise.
+        """
+        slot = self._slots.get(name)
+        if slot is None or not self._kinds[slot]:
+            return None
+        return slot
 
     def _declare_reserved(self, name, value):
         """
         used internally (in child Global class) only
         """
-        if name in self._refs:
+        if self._declared_slot(name) is not None:
             raise RuntimeError(f"{name} is already declared")
-        self._refs[name] = [self.__REF_KIND_RESERVED, value]
+        self._declare(name, self._REF_KIND_RESERVED, value)
 
     def _declare_magic(self, name, value):
         """
         used internally (in child Global class) only
         """
-        if name in self._refs:
+        if self._declared_slot(name) is not None:
             raise RuntimeError(f"{name} is already declared")
-        self._refs[name] = [self.__REF_KIND_MAGIC, value]
+        self._declare(name, self._REF_KIND_MAGIC, value)
+
+    def _declare_lazy_var(self, name, factory):
+        """
+        used internally (for builtin objects) only,
+        declares a var of which the value is only created,
+        using `factory()`, once it is first looked up
+        """
+        self._declare(name, self._REF_KIND_VAR, _LazyValue(factory))
+
+    def _materialize(self, slot):
+        """
+        Replace the lazy value in the given slot by its actual value, returning it.
+        """
+        value = self._values[slot].get()
+        if self._shared:
+            self._own()
+        self._values[slot] = value
+        return value
+
+    def _store(self, slot, value):
+        """
+        Store the value in the given (declared) slot of this scope,
+        respecting the kind of binding it is.
+        """
+        kind = self._kinds[slot]
+        if kind == self._REF_KIND_MAGIC:
+            return value  # do not actually assign here, magic is going on, ssht
+        if kind == self._REF_KIND_CONST:
+            # nope, not going to happen
+            raise TypeError("Assignment to constant variable.")
+        if kind == self._REF_KIND_RESERVED:
+            # should have been caught by Transpiler though, but ok, let's
+            # handle it gracefully anyhow
+            raise SyntaxError("Invalid left-hand side in assignment")
+        if self._shared:
+            self._own()
+        self._values[slot] = value  # actual assignment, e.g.: let, var or param
+        return value
+
+    def _own(self):
+        """
+        Copy the kinds and values shared with the snapshot this scope was forked from.
+        """
+        self._kinds = list(self._kinds)
+        self._values = list(self._values)
+        self._shared = False
+
+    def snapshot(self):
+        """
+        Return a frozen snapshot of the bindings declared in this scope,
+        to create (copy-on-write) forks from, see `ScopeSnapshot.fork`.
+
+        Only the bindings themselves are copied, objects (e.g. `Math`) are
+        shared between this scope and all forks, including their properties.
+        """
+        return ScopeSnapshot(self)
+
+    def fork(self):
+        """
+        Return a (copy-on-write) fork of this scope, with the same parent.
+        """
+        return ScopeSnapshot(self).fork()
+
+    def resolve(self, name):
+        """
+        Return the (depth, slot) address of the binding for the given name,
+        depth being the amount of parent scopes to walk up, None if not declared.
+        """
+        scope, depth = self, 0
+        while scope is not None:
+            slot = scope._slots.get(name)
+            if slot is not None and scope._kinds[slot]:
+                return depth, slot
+            scope, depth = scope._parent_scope, depth + 1
+        return None
+
+    def load(self, depth, slot):
+        """
+        Return the value stored at the (depth, slot) address, see `resolve`.
+        """
+        scope = self
+        for _ in range(depth):
+            scope = scope._parent_scope
+        value = scope._values[slot]
+        if value.__class__ is _LazyValue:
+            return scope._materialize(slot)
+        return value
+
+    def store(self, depth, slot, value):
+        """
+        Assign the value to the binding at the (depth, slot) address, see `resolve`.
+        """
+        scope = self
+        for _ in range(depth):
+            scope = scope._parent_scope
+        return scope._store(slot, value)
 
     def assign(self, name, value):
         """
@@ -1286,42 +2138,68 @@ class Scope(object):
             for name in names:
                 values.append(self.assign(name, obj[name]))
             return values
-        try:
-            p = self._refs[name]
-            if p[0] == self.__REF_KIND_MAGIC:
-                return value  # do not actually assign here, magic is going on, ssht
-            if p[0] == self.__REF_KIND_CONST:
-                # nope, not going to happen
-                raise TypeError("Assignment to constant variable.")
-            if p[0] == self.__REF_KIND_RESERVED:
-                # should have been caught by Transpiler though, but ok, let's
-                # handle it gracefully anyhow
-                raise SyntaxError("Invalid left-hand side in assignment")
-            p[1] = value  # actual assignment, e.g.: let, var or param
-            return value
-        except KeyError:
-            # declare implicitly as a var, within the current scope
-            self.declare_var(name, value)
-            return value
+        scope = self
+        while scope is not None:
+            slot = scope._slots.get(name)
+            if slot is not None and scope._kinds[slot]:
+                return scope._store(slot, value)
+            scope = scope._parent_scope
+        # declare implicitly as a var, within the current scope
+        self.declare_var(name, value)
+        return value
 
     # __setitem__ has no purpose,
     # as it is not an expression, not allowing us to use it as we want,
     # therefore the assign is better to avoid confusion
 
+    # ++ / -- support,
+    # values (e.g. numbers) are immutable, and thus the updated
+    # value is assigned to the reference
+
+    def inc(self, name):
+        """
+        Prefix increment (`++name`), returning the updated value.
+        """
+        return self.assign(name, self[name].inc())
+
+    def pinc(self, name):
+        """
+        Postfix increment (`name++`), returning the original value.
+        """
+        value = self[name]
+        self.assign(name, value.inc())
+        return value
+
+    def dec(self, name):
+        """
+        Prefix decrement (`--name`), returning the updated value.
+        """
+        return self.assign(name, self[name].dec())
+
+    def pdec(self, name):
+        """
+        Postfix decrement (`name--`), returning the original value.
+        """
+        value = self[name]
+        self.assign(name, value.dec())
+        return value
+
     def __getitem__(self, name):
         """
         Return the value using the name as reference,
-        None is returned in case no value could be found for
+        undefined is returned in case no value could be found for
         the given name-as-reference.
         """
-        try:
-            return self._refs[name][1]
-        except KeyError:
-            try:
-                # easier to ask forgiveness than it is to ask for permission
-                return self._parent_scope[name]
-            except TypeError:  # NoneType is not subscriptable...
-                return JSUndefined()
+        scope = self
+        while scope is not None:
+            slot = scope._slots.get(name)
+            if slot is not None and scope._kinds[slot]:
+                value = scope._values[slot]
+                if value.__class__ is _LazyValue:
+                    return scope._materialize(slot)
+                return value
+            scope = scope._parent_scope
+        return JS_UNDEFINED
 
     def _destruct(self, fn, names, value):
         values = []
@@ -1344,31 +2222,33 @@ class Scope(object):
         """
         if type(name) is list:  # supported for destruct purposes
             return self._destruct(self.declare_var, name, value)
-        if not isinstance(value, JSObject):
+        if not isinstance(value, JSValue):
             raise RuntimeError("only objects can be set in scope")
-        stored_kind_value_pair = self[name]
-        if stored_kind_value_pair:
-            # magic vars require magical behavior, plish plash
-            if stored_kind_value_pair[0] == self.__REF_KIND_MAGIC:
-                # do nothing, but make it look like the user did do something,
-                # empowered already?
-                return JSUndefined()
-            # builtins are not to be altered, oh no
-            if stored_kind_value_pair[0] == self.__REF_KIND_RESERVED:
-                # should have been caught by Transpiler though, but ok, let's
-                # handle it gracefully anyhow
-                raise SyntaxError(f"Unexpected token '{name}'")
-            # we cannot check if it isn't a `var`, as we also would like this
-            # to work with `__REF_KIND_PARAM` :)
-            if stored_kind_value_pair[0] in [
-                    self.__REF_KIND_LET, self.__REF_KIND_CONST]:
-                raise SyntaxError(
-                    f"Identifier '{name}' has already been declared")
-            # store value in original value, hoist as such
-            stored_kind_value_pair[1] = value
-        else:
-            self._refs[name] = [self.__REF_KIND_VAR, value]
-        return JSUndefined()
+        slot = self._declared_slot(name)
+        if slot is None:
+            self._declare(name, self._REF_KIND_VAR, value)
+            return JS_UNDEFINED
+        kind = self._kinds[slot]
+        # magic vars require magical behavior, plish plash
+        if kind == self._REF_KIND_MAGIC:
+            # do nothing, but make it look like the user did do something,
+            # empowered already?
+            return JS_UNDEFINED
+        # builtins are not to be altered, oh no
+        if kind == self._REF_KIND_RESERVED:
+            # should have been caught by Transpiler though, but ok, let's
+            # handle it gracefully anyhow
+            raise SyntaxError(f"Unexpected token '{name}'")
+        # we cannot check if it isn't a `var`, as we also would like this
+        # to work with `_REF_KIND_PARAM` :)
+        if kind in (self._REF_KIND_LET, self._REF_KIND_CONST):
+            raise SyntaxError(
+                f"Identifier '{name}' has already been declared")
+        # store value in original value, hoist as such
+        if self._shared:
+            self._own()
+        self._values[slot] = value
+        return JS_UNDEFINED
 
     def declare_let(self, name, value):
         """
@@ -1376,12 +2256,12 @@ class Scope(object):
         """
         if type(name) is list:  # supported for destruct purposes
             return self._destruct(self.declare_let, name, value)
-        if not isinstance(value, JSObject):
+        if not isinstance(value, JSValue):
             raise RuntimeError("only objects can be set in scope")
         if self._exists(name, current_scope_only=True):
             raise SyntaxError(f"Identifier '{name}' has already been declared")
-        self._refs[name] = [self.__REF_KIND_LET, value]
-        return JSUndefined()
+        self._declare(name, self._REF_KIND_LET, value)
+        return JS_UNDEFINED
 
     def declare_const(self, name, value):
         """
@@ -1389,31 +2269,137 @@ class Scope(object):
         """
         if type(name) is list:  # supported for destruct purposes
             return self._destruct(self.declare_const, name, value)
-        if not isinstance(value, JSObject):
+        if not isinstance(value, JSValue):
             raise RuntimeError("only objects can be set in scope")
         if self._exists(name, current_scope_only=True):
             raise SyntaxError(f"Identifier '{name}' has already been declared")
-        self._refs[name] = [self.__REF_KIND_CONST, value]
-        return JSUndefined()
+        self._declare(name, self._REF_KIND_CONST, value)
+        return JS_UNDEFINED
 
     def _exists(self, name, current_scope_only=False):
         """
         Check if a value exists within scope,
         only to be used within the internal API
         """
-        try:
-            p = self._refs[name]
-            # throw an exception if we try to create let or const using a
-            # builtin name
-            if p[0] == self.__REF_KIND_RESERVED:
-                # should have been caught by Transpiler though, but ok, let's
-                # handle it gracefully anyhow
-                raise SyntaxError(f"Unexpected token '{name}'")
-            return True
-        except KeyError:
-            if not self._parent_scope or current_scope_only:
+        scope = self
+        while scope is not None:
+            slot = scope._declared_slot(name)
+            if slot is not None:
+                # throw an exception if we try to create let or const using a
+                # builtin name
+                if scope._kinds[slot] == self._REF_KIND_RESERVED:
+                    # should have been caught by Transpiler though, but ok, let's
+                    # handle it gracefully anyhow
+                    raise SyntaxError(f"Unexpected token '{name}'")
+                return True
+            if current_scope_only:
                 return False
-            return self._parent_scope._exists(name)
+            scope = scope._parent_scope
+        return False
+
+
+_EMPTY_SCOPE_LAYOUT = ScopeLayout()
+
+
+class _LazyValue(object):
+    """
+    Placeholder of a binding which is only created once it is first looked up,
+    see `Scope._declare_lazy_var`. The value is created only once, even when the
+    placeholder is shared by several scopes (e.g. forks of the same snapshot).
+    """
+
+    __slots__ = ('_factory', '_value')
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._value = None
+
+    def get(self):
+        if self._value is None:
+            self._value = self._factory()
+            self._factory = None
+        return self._value
+
+
+class ScopeSnapshot(object):
+    """
+    The frozen bindings of a scope, as returned by `Scope.snapshot`.
+
+    Forks of a snapshot start with exactly these bindings, sharing them until
+    they first declare or assign a binding, at which point the fork copies them.
+    Forks are isolated from one another, as well as from the snapshotted scope,
+    and always are plain scopes, whatever the type of the snapshotted scope.
+    """
+
+    __slots__ = ('_parent_scope', '_layout', '_values')
+
+    def __init__(self, scope):
+        layout = ScopeLayout()
+        layout._slots = dict(scope._slots)
+        layout._kinds = tuple(scope._kinds)
+        # the names were already bound when declared in the snapshotted scope
+        layout._local = True
+        self._parent_scope = scope._parent_scope
+        self._layout = layout
+        # lazy values are created, as forks share their name->slot mapping
+        # (and thus their global lookup caches, see `GlobalLookupCache`)
+        self._values = tuple(
+            value.get() if value.__class__ is _LazyValue else value
+            for value in scope._values)
+
+    def fork(self):
+        """
+        Return a new scope starting with the bindings of this snapshot.
+        """
+        scope = Scope.__new__(Scope)
+        scope._parent_scope = self._parent_scope
+        scope._root = scope if self._parent_scope is None else self._parent_scope._root
+        scope._layout = self._layout
+        scope._slots = self._layout._slots
+        scope._kinds = self._layout._kinds
+        scope._values = self._values
+        scope._shared = True
+        return scope
+
+
+class GlobalLookupCache(object):
+    """
+    Inline cache for the lookup of a global name (e.g. `console` or `Math`)
+    from a single call site, to be created once per call site.
+
+    The first lookup resolves the name the regular way, remembering the
+    name->slot mapping of the global scope and the slot it resolved to.
+    Further lookups from any scope with a global scope using that same mapping
+    (e.g. forks of the same global scope) are a single identity check and
+    integer compare, for as long as no scope binds the name
+    (or any other new name) locally, see `Scope._local_names`.
+    """
+
+    __slots__ = ('_name', '_slots', '_slot', '_epoch')
+
+    def __init__(self, name):
+        self._name = name
+        self._slots = None
+        self._slot = None
+        self._epoch = -1
+
+    def load(self, scope):
+        """
+        Return the value of the name as seen from the given scope.
+        """
+        root = scope._root
+        if root._slots is self._slots and self._epoch == Scope._local_names_epoch:
+            return root._values[self._slot]
+        return self._miss(scope)
+
+    def _miss(self, scope):
+        epoch = Scope._local_names_epoch
+        value = scope[self._name]
+        root = scope._root
+        slot = root._declared_slot(self._name)
+        if slot is not None and self._name not in Scope._local_names:
+            self._slots, self._slot, self._epoch = root._slots, slot, epoch
+        return value
 
 
 class FunctionScope(Scope):
@@ -1423,27 +2409,33 @@ class FunctionScope(Scope):
     and that parameters can be added,
     which are similar to vars except that they
     do not hoisted shadowed vars
+
+    The parameters are the first slots of the layout, which can be given
+    in order to share it between calls of the same function.
     """
-    __REF_KIND_PARAM = 10
 
-    def __init__(self, parent_scope, parameters, arguments, owner=None):
+    def __init__(self, parent_scope, parameters, arguments, owner=None, layout=None):
         if parent_scope is None:
             raise RuntimeError(
                 "BUG: parent scope is required for Function Scope: cannot be undefined")
-        super().__init__(parent_scope=parent_scope)
-        # store all arguments, used using the arguments call
-        self._arguments = JSArray(arguments)
-        # only those arguments given are stored in scope by name, others will
-        # return undefined
-        for name, value in zip(parameters, arguments):
-            self._declare_param(name, value)
-        self._owner = owner or JSUndefined()
+        if layout is None:
+            layout = ScopeLayout(param_names=parameters)
+        super().__init__(parent_scope=parent_scope, layout=layout)
+        # all parameters are declared, those without an argument
+        # are bound to undefined
+        count = min(len(parameters), len(arguments))
+        self._values[:count] = arguments[:count]
+        # all arguments are stored, only to be wrapped
+        # once they are used using the arguments call
+        self._raw_arguments = arguments
+        self._arguments = None
+        self._owner = JS_UNDEFINED if owner is None else owner
 
     def _declare_param(self, name, value):
         # we can safely do this without checking anything,
         # given it will be right at the start,
         # and thus with an empty scope
-        self._refs[name] = [self.__REF_KIND_PARAM, value]
+        self._declare(name, self._REF_KIND_PARAM, value)
 
     @property
     def this(self):
@@ -1451,6 +2443,8 @@ class FunctionScope(Scope):
 
     @property
     def arguments(self):
+        if self._arguments is None:
+            self._arguments = JSArray(self._raw_arguments)
         return self._arguments
 
 
@@ -1461,14 +2455,35 @@ class BlockScope(Scope):
     and as such the parent scope is of course required
     """
 
-    def __init__(self, parent_scope):
+    def __init__(self, parent_scope, layout=None):
         if parent_scope is None:
             raise RuntimeError(
                 "BUG: parent scope is required for Block Scope: cannot be undefined")
-        super().__init__(parent_scope=parent_scope)
+        super().__init__(parent_scope=parent_scope, layout=layout)
+
+    def declare_var(self, name, value):
+        return self._parent_scope.declare_var(name, value)
 
-        def declare_var(self, name, value):
-            self._parent_scope.declare_var(name, value)
+    def reset(self):
+        """
+        Reset this block scope to the state of a newly created one,
+        such that a single block scope can be reused for each iteration of a loop,
+        rather than creating a new one per iteration.
+
+        Only valid in case none of the bindings of the previous iteration
+        can still be referenced, e.g. by a function (closure) created within the block.
+        """
+        layout = self._layout
+        self._slots = layout._slots
+        if self._shared or len(self._kinds) != len(layout):
+            self._kinds = list(layout._kinds)
+            self._values = [JS_UNDEFINED] * len(layout)
+            self._shared = False
+        else:
+            self._kinds[:] = layout._kinds
+            values = self._values
+            for slot in range(len(values)):
+                values[slot] = JS_UNDEFINED
 
 
 #############################
@@ -1476,14 +2491,14 @@ class BlockScope(Scope):
 #############################
 
 
-def jsfunc(owner, name, parameters=None):
+def jsfunc(owner, name, parameters=None, kernel=None):
     """
     Decorator to create a stand-alone JS function
     """
     def decorator(fn):
         if not isinstance(owner, Scope):
             raise RuntimeError("only global methods supported for now")
-        fn = JSFunction(fn, parameters=parameters, ref=name)
+        fn = JSFunction(fn, parameters=parameters, ref=name, kernel=kernel)
         owner.declare_var(name, fn)
         return fn
     return decorator
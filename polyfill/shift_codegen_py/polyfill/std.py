@@ -3,11 +3,26 @@ Polyfills standard Javascript objects used in browsers,
 such as console and window.
 """
 
-import warnings
 import sys
 
 from .runtime import Scope, JSObject, JSFunction, JSNumber
 
+__all__ = ['JSConsole', 'JSMath']
+
+
+def _warnings():
+    """
+    Return the warnings module, only imported once console.warn is first used.
+    """
+    global _warnings_module
+    if _warnings_module is None:
+        import warnings
+        _warnings_module = warnings
+    return _warnings_module
+
+
+_warnings_module = None
+
 
 ###############################################
 # Standard (browser) environment objects
@@ -16,6 +31,8 @@ from .runtime import Scope, JSObject, JSFunction, JSNumber
 class JSConsole(JSObject):
     # TODO: define representation better
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         # print methods
@@ -27,13 +44,16 @@ class JSConsole(JSObject):
         print(*scope.arguments)
 
     def __warn(self, scope):
-        warnings.warn(' '.join(scope.arguments), category=UserWarning)
+        _warnings().warn(' '.join(str(argument) for argument in scope.arguments),
+                      category=UserWarning)
 
     def __error(self, scope):
         print(*scope.arguments, file=sys.stderr)
 
 
 class JSMath(JSObject):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -57,7 +77,7 @@ class JSMath(JSObject):
             "SQRT2": "1.4142135623730951",
         }
         for name, value in constants.items():
-            self._magic_properties[name] = JSNumber(value)
+            self._declare_magic(name, JSNumber(value))
 
     def __str__(self):
         return 'Object [Math] {}'
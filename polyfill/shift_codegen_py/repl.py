@@ -3,13 +3,19 @@ import json
 import socketio
 import io
 import os
+import ast
+import codeop
 import glob
+import importlib
+import threading
+import time
+import asyncio
 import click
 from aiohttp import web
-from pexpect import replwrap
 import socket
-from contextlib import closing
-from itertools import chain
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
 from pathlib import Path
 import traceback
 
@@ -23,11 +29,234 @@ def find_free_port():
         return s.getsockname()[1]
 
 
-class REPL:
+class EvalResult:
+    """
+    The result of evaluating a command in a REPL session.
+
+    - value: repr of the value of the command (if it ends with an expression), or None;
+    - stdout / stderr: all that was written to it while evaluating the command;
+    - exception: the formatted exception raised by the command, or None;
+    - incomplete: True if the command requires more input (e.g. an unclosed block),
+      in which case it was not evaluated;
+    """
+
+    __slots__ = ('value', 'stdout', 'stderr', 'exception', 'incomplete')
+
+    def __init__(self, value=None, stdout='', stderr='', exception=None, incomplete=False):
+        self.value = value
+        self.stdout = stdout
+        self.stderr = stderr
+        self.exception = exception
+        self.incomplete = incomplete
+
+    @property
+    def output(self):
+        """
+        All output of the command, as it would be printed by an interactive Python REPL.
+        """
+        parts = [self.stdout, self.stderr]
+        if self.value is not None:
+            parts.append(self.value + '\n')
+        if self.exception is not None:
+            parts.append(self.exception)
+        return ''.join(parts)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class PolyfillWatcher:
+    """
+    Watches the polyfill source files for changes, using a background thread
+    which stats them periodically, such that evaluating a command only
+    has to check if any changes were found in the meantime.
+    """
+
     _PY_PATH_GOB = os.path.join(os.path.dirname(
         os.path.realpath(__file__)), 'polyfill', '*.py')
 
-    def __init__(self, history_fp=None):
+    def __init__(self, interval=0.5):
+        self._interval = interval
+        self._mtimes = self._stat()
+        self._changed = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+        self._thread.start()
+
+    def pop_changed(self):
+        """
+        Return the names of the polyfill modules changed since the last call.
+        """
+        with self._lock:
+            changed, self._changed = self._changed, set()
+        return changed
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _watch(self):
+        while not self._stopped.wait(self._interval):
+            mtimes = self._stat()
+            changed = {path for path, mtime in mtimes.items()
+                       if self._mtimes.get(path) != mtime}
+            self._mtimes = mtimes
+            if changed:
+                with self._lock:
+                    self._changed.update(_polyfill_module_name(path) for path in changed)
+
+    def _stat(self):
+        mtimes = {}
+        for path in glob.glob(self._PY_PATH_GOB):
+            try:
+                mtimes[path] = os.path.getmtime(path)
+            except FileNotFoundError:
+                pass  # e.g. removed or replaced by an editor in the meantime
+        return mtimes
+
+
+def _polyfill_module_name(path):
+    name = os.path.splitext(os.path.basename(path))[0]
+    if name == '__init__':
+        return 'shift_codegen_py.polyfill'
+    return f'shift_codegen_py.polyfill.{name}'
+
+
+class PolyfillReloader:
+    """
+    Reloads the changed polyfill modules (and those depending on them),
+    as found by a `PolyfillWatcher`. Modules are reloaded process-wide,
+    and thus the reloader is shared by all REPL sessions of a process,
+    each session updating its namespace once it sees a new generation.
+
+    Only reloads of std.py and globals.py update the namespace of a session
+    in place. Reloading errors.py or runtime.py (the module edited most often)
+    redefines the types of all JS values, such that the values created by a
+    session prior to the reload are no longer compatible with the polyfill:
+    such sessions still replay all of their commands in a new namespace.
+    """
+
+    # polyfill modules, in the order they have to be reloaded,
+    # mapped to the polyfill modules they import
+    _POLYFILL_MODULES = {
+        'shift_codegen_py.polyfill.errors': (),
+        'shift_codegen_py.polyfill.runtime': (
+            'shift_codegen_py.polyfill.errors',),
+        'shift_codegen_py.polyfill.std': (
+            'shift_codegen_py.polyfill.runtime',),
+        'shift_codegen_py.polyfill.globals': (
+            'shift_codegen_py.polyfill.runtime',
+            'shift_codegen_py.polyfill.std'),
+        'shift_codegen_py.polyfill': (
+            'shift_codegen_py.polyfill.errors',
+            'shift_codegen_py.polyfill.runtime',
+            'shift_codegen_py.polyfill.std',
+            'shift_codegen_py.polyfill.globals'),
+    }
+
+    # polyfill modules defining the types of the values, values created
+    # before one of these is reloaded are instances of the types prior to the reload
+    _VALUE_MODULES = frozenset((
+        'shift_codegen_py.polyfill.errors',
+        'shift_codegen_py.polyfill.runtime',
+    ))
+
+    def __init__(self, watcher=None):
+        self._watcher = watcher or PolyfillWatcher()
+        self._lock = threading.Lock()
+        self.generation = 0  # incremented for each reload
+        self.values_generation = 0  # generation of the last reload of a value module
+
+    def state(self):
+        """
+        Return the current generation and values generation, see `reload_if_needed`.
+        """
+        with self._lock:
+            return self.generation, self.values_generation
+
+    def reload_if_needed(self):
+        """
+        Reload the changed polyfill modules (and those depending on them),
+        returning the formatted error in case they could not be reloaded.
+        """
+        changed = self._watcher.pop_changed()
+        if not changed:
+            return None  # nothing to do
+        with self._lock:
+            reloaded = set()
+            try:
+                for name, dependencies in self._POLYFILL_MODULES.items():
+                    if name in changed or reloaded.intersection(dependencies):
+                        importlib.reload(sys.modules[name])
+                        reloaded.add(name)
+            except Exception as e:
+                # e.g. a syntax error in a module being edited, keep the session as it is,
+                # the module is reloaded again once it is changed again
+                return ''.join(traceback.format_exception_only(type(e), e))
+            finally:
+                if reloaded:
+                    self.generation += 1
+                    if reloaded & self._VALUE_MODULES:
+                        self.values_generation = self.generation
+        return None
+
+    def stop(self):
+        self._watcher.stop()
+
+
+class _ThreadLocalStream:
+    """
+    Proxy of a standard stream (e.g. sys.stdout), writing to the buffer
+    of the current thread while it is capturing its output, see `_captured_output`,
+    and to the original stream otherwise.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def write(self, data):
+        buffer = getattr(self._local, 'buffer', None)
+        return (self._stream if buffer is None else buffer).write(data)
+
+    def flush(self):
+        if getattr(self._local, 'buffer', None) is None:
+            self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+_streams_lock = threading.Lock()
+
+
+def _thread_local_stream(name):
+    with _streams_lock:
+        stream = getattr(sys, name)
+        if not isinstance(stream, _ThreadLocalStream):
+            stream = _ThreadLocalStream(stream)
+            setattr(sys, name, stream)
+        return stream
+
+
+@contextmanager
+def _captured_output():
+    """
+    Capture all that is written to the stdout and stderr by the current thread,
+    unlike `contextlib.redirect_stdout` other threads are not affected.
+    """
+    stdout, stderr = _thread_local_stream('stdout'), _thread_local_stream('stderr')
+    buffers = io.StringIO(), io.StringIO()
+    stdout._local.buffer, stderr._local.buffer = buffers
+    try:
+        yield buffers
+    finally:
+        stdout._local.buffer = stderr._local.buffer = None
+
+
+class REPL:
+    def __init__(self, history_fp=None, reloader=None):
         self._prelude_cmds = [
             # NOTE: implicitly relies on the fact that shift-codegen_py is installed
             # in a linked modus operandes
@@ -35,9 +264,13 @@ class REPL:
         ]
         self._history_cmds = []
         self._user_cmds = []
-        self._repl = self._repl_new()
-        self._polyfill_src_mtime_latest = 0
-        self._polyfill_src_mtime_latest = self._polyfill_src_mtime()
+        self._replay_cmds = []  # complete commands evaluated successfully
+        self._compile = codeop.CommandCompiler()
+        self._namespace = self._namespace_new()
+        # reloader shared with other sessions, or owned by this session
+        self._own_reloader = reloader is None
+        self._reloader = reloader or PolyfillReloader()
+        self._generation = self._reloader.generation
 
         # support history for the REPL iff a FilePath (fp) is defined
         self._history_fp = history_fp
@@ -50,10 +283,47 @@ class REPL:
         self.close()
 
     def eval(self, cmd):
-        self._reload_if_needed()
-        output = self._repl.run_command(cmd)
-        self._track_user_cmd(cmd)  # track only upon success
-        return output
+        """
+        Evaluate the (Python) command within the namespace of this session,
+        returning an `EvalResult`.
+        """
+        reload_error = self._reload_if_needed()
+        result = self._eval(cmd)
+        if not result.incomplete and result.exception is None:
+            # track only upon success
+            self._track_user_cmd(cmd)
+            self._replay_cmds.append(cmd)
+        if reload_error:
+            result.stderr = reload_error + result.stderr
+        return result
+
+    def _eval(self, cmd):
+        source = cmd.replace('\r\n', '\n')
+        try:
+            if self._compile(source, '<stdin>', 'exec') is None:
+                return EvalResult(incomplete=True)
+            tree = ast.parse(source, '<stdin>', 'exec')
+        except (SyntaxError, OverflowError, ValueError) as e:
+            return EvalResult(exception=''.join(traceback.format_exception_only(type(e), e)))
+        # the value of a trailing expression is the value of the command
+        last = None
+        if tree.body and isinstance(tree.body[-1], ast.Expr):
+            last = ast.Expression(tree.body.pop().value)
+        value, exception = None, None
+        with _captured_output() as (stdout, stderr):
+            try:
+                exec(compile(tree, '<stdin>', 'exec'), self._namespace)
+                if last is not None:
+                    value = eval(compile(last, '<stdin>', 'eval'), self._namespace)
+            except Exception as e:
+                # skip the frame of this method
+                exception = ''.join(traceback.format_exception(
+                    type(e), e, e.__traceback__.tb_next))
+        if value is not None:
+            self._namespace['_'] = value
+            value = repr(value)
+        return EvalResult(value=value, stdout=stdout.getvalue(),
+                          stderr=stderr.getvalue(), exception=exception)
 
     def cmd_at(self, offset):
         cmds = self._history_cmds+self._user_cmds
@@ -73,6 +343,8 @@ class REPL:
         return cmds[index].rstrip(), offset
 
     def close(self):
+        if self._own_reloader:
+            self._reloader.stop()
         self._persist_history_user_cmds()
 
     def _load_history_user_cmds(self):
@@ -114,33 +386,186 @@ class REPL:
             self._user_cmds.append(line)
 
     def _reload_if_needed(self):
-        mtime = self._polyfill_src_mtime()
-        if mtime <= self._polyfill_src_mtime_latest:
-            return  # nothing to do
-        # reload codebase
-        self._repl = self._repl_new()
-        # update src mtime
-        self._polyfill_src_mtime_latest = mtime
-
-    def _polyfill_src_mtime(self):
-        out_mtime = self._polyfill_src_mtime_latest
-        for polyfill_py_path in glob.glob(self._PY_PATH_GOB):
-            mtime = os.path.getmtime(polyfill_py_path)
-            if mtime > out_mtime:
-                out_mtime = mtime
-        # return most late time
-        return out_mtime
-
-    def _repl_new(self):
-        repl = replwrap.python()
+        """
+        Reload the changed polyfill modules and update the namespace of
+        this session accordingly, returning the formatted error
+        in case the modules could not be reloaded.
+        """
+        error = self._reloader.reload_if_needed()
+        generation, values_generation = self._reloader.state()
+        if self._generation == generation:
+            return error
+        # values of this session are only compatible with the reloaded polyfill
+        # in case none of the modules defining their types were reloaded
+        replay = self._generation < values_generation
+        self._generation = generation
+        if not replay:
+            try:
+                self._namespace_update()
+                return error
+            except Exception:
+                pass
+        # a new namespace, replaying all commands
+        self._namespace = self._namespace_new()
+        return error
+
+    def _namespace_update(self):
+        """
+        Update the namespace of this session with the (reloaded) polyfill,
+        preserving all user-defined names, including the scope of this session.
+
+        Only the names exported by the polyfill prior to the reload are rebound,
+        as well as new names not defined by the user.
+        """
+        exports = _polyfill_exports()
+        for name, value in exports.items():
+            if name == 'scope':
+                continue  # the scope of this session
+            if name in self._polyfill_names or name not in self._namespace:
+                self._namespace[name] = value
+        self._polyfill_names = set(exports)
+
+    def _namespace_new(self):
+        """
+        Create the namespace of this session, isolated from other sessions
+        by using its own fork of the global scope.
+        """
+        self._namespace = {'__name__': '__console__', '__doc__': None}
+        for cmd in self._prelude_cmds:
+            self._eval(cmd)
+        self._polyfill_names = set(_polyfill_exports())
+        self._namespace['scope'] = self._namespace['scope'].fork()
         # replay all successfull commands so far
-        for cmd in chain(self._prelude_cmds, self._user_cmds):
-            output = repl.run_command(cmd)
-        # return init REPL
-        return repl
+        for cmd in self._replay_cmds:
+            self._eval(cmd)
+        return self._namespace
+
+
+def _polyfill_exports():
+    """
+    Return the names and values imported by `from shift_codegen_py.polyfill import *`.
+    """
+    polyfill = sys.modules['shift_codegen_py.polyfill']
+    names = getattr(polyfill, '__all__', None)
+    if names is None:
+        names = [name for name in vars(polyfill) if not name.startswith('_')]
+    return {name: getattr(polyfill, name) for name in names}
+
+
+class _Session:
+    __slots__ = ('repl', 'lock', 'last_used')
+
+    def __init__(self, repl):
+        self.repl = repl
+        self.lock = threading.Lock()  # commands of a session are evaluated one at a time
+        self.last_used = time.monotonic()
+
+
+class SessionManager:
+    """
+    Manages the REPL sessions of an eval server, one session per client (sid),
+    each with its own namespace and scope.
+
+    New clients are given a session from a (bounded) pool of pre-warmed sessions,
+    refilled in the background. Commands are evaluated in worker threads,
+    such that the event loop of the server is never blocked, and sessions
+    idle for longer than the idle timeout are evicted.
+    """
+
+    def __init__(self, pool_size=4, max_sessions=64, idle_timeout=15 * 60, max_workers=None):
+        self._pool_size = pool_size
+        self._max_sessions = max_sessions
+        self._idle_timeout = idle_timeout
+        self._reloader = PolyfillReloader()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='repl-session')
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._pool = deque(self._session_new() for _ in range(pool_size))
 
+    def __enter__(self):
+        return self
 
-def serve_repl_main(repl, port):
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    async def eval(self, sid, cmd):
+        """
+        Evaluate the command in the session of the client,
+        returning an `EvalResult`.
+        """
+        loop = asyncio.get_running_loop()
+        session = await loop.run_in_executor(self._executor, self._acquire, sid)
+        return await loop.run_in_executor(self._executor, self._eval, session, cmd)
+
+    def release(self, sid):
+        """
+        Close the session of the client, if it has one.
+        """
+        with self._lock:
+            session = self._sessions.pop(sid, None)
+        if session is not None:
+            session.repl.close()
+
+    def evict_idle(self):
+        """
+        Close all sessions idle for longer than the idle timeout.
+        """
+        deadline = time.monotonic() - self._idle_timeout
+        with self._lock:
+            idle = [sid for sid, session in self._sessions.items()
+                    if session.last_used < deadline and not session.lock.locked()]
+        for sid in idle:
+            self.release(sid)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            sessions = list(self._sessions.values()) + list(self._pool)
+            self._sessions.clear()
+            self._pool.clear()
+        for session in sessions:
+            session.repl.close()
+        self._reloader.stop()
+
+    def _acquire(self, sid):
+        # run in a worker thread, as a session has to be created for the client
+        # once the pool is exhausted, which is done while holding the lock,
+        # such that concurrent first commands cannot exceed the maximum of sessions
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is None:
+                if len(self._sessions) >= self._max_sessions:
+                    raise RuntimeError(
+                        f"too many sessions (max {self._max_sessions})")
+                if self._pool:
+                    session = self._pool.popleft()
+                    self._executor.submit(self._refill)
+                else:
+                    session = self._session_new()
+                self._sessions[sid] = session
+            session.last_used = time.monotonic()
+            return session
+
+    def _refill(self):
+        with self._lock:
+            if len(self._pool) >= self._pool_size:
+                return
+        session = self._session_new()
+        with self._lock:
+            self._pool.append(session)
+
+    def _eval(self, session, cmd):
+        with session.lock:
+            result = session.repl.eval(cmd)
+            session.last_used = time.monotonic()
+        return result
+
+    def _session_new(self):
+        return _Session(REPL(reloader=self._reloader))
+
+
+def serve_repl_main(manager, port, eviction_interval=60):
     sio = socketio.AsyncServer()
     app = web.Application()
     sio.attach(app)
@@ -150,22 +575,25 @@ def serve_repl_main(repl, port):
         print(f'connection established: {sid}')
 
     @ sio.event
-    def eval(sid, data):
+    async def eval(sid, data):
         try:
-            return repl.eval(data['cmd'])
-        except ValueError as e:
-            if 'Continuation prompt found' in str(e):
-                # ignore expected multiline-line related error
-                return ''
-            else:
-                return str(e)
+            result = await manager.eval(sid, data['cmd'])
         except Exception as e:
-            return str(e)
+            result = EvalResult(exception=''.join(
+                traceback.format_exception_only(type(e), e)))
+        return result.as_dict()
 
     @ sio.event
     def disconnect(sid):
+        manager.release(sid)
         print(f'disconnected from server: {sid}')
 
+    async def evict_idle_sessions():
+        while True:
+            await sio.sleep(eviction_interval)
+            manager.evict_idle()
+
+    sio.start_background_task(evict_idle_sessions)
     web.run_app(
         app,
         port=port,
@@ -350,20 +778,14 @@ def run_repl_main(repl):
             write_stdout(f"{prompt} ")
             continue
         try:
-            try:
-                output = repl.eval(line)
-            except ValueError as e:
-                if 'Continuation prompt found' in str(e):
-                    # ignore expected multiline-line related error
-                    output = ''
-                else:
-                    raise e
+            result = repl.eval(line)
+            if result.incomplete:
+                prompt = "..."
+                write_stdout(f"{prompt} ")
+                history_offset = 0  # reset
+                continue
+            output = result.output
             if output:
-                if output.splitlines()[-1].startswith('IndentationError:'):
-                    prompt = "..."
-                    write_stdout(f"{prompt} ")
-                    history_offset = 0  # reset
-                    continue
                 print(output.strip())
             # clear env
             clear_env()
@@ -380,11 +802,18 @@ def cli():
 
 @cli.command()
 @click.option('--port', help='use a predefined port instead of a random available one')
-def serve(port):
+@click.option('--pool-size', default=4, show_default=True,
+              help='amount of pre-warmed sessions, ready to be used by new clients')
+@click.option('--max-sessions', default=64, show_default=True,
+              help='maximum amount of concurrent client sessions')
+@click.option('--idle-timeout', default=15 * 60, show_default=True,
+              help='seconds after which an idle client session is evicted')
+def serve(port, pool_size, max_sessions, idle_timeout):
     if not port:
         port = find_free_port()
-    with REPL() as repl:
-        serve_repl_main(repl, port)
+    with SessionManager(pool_size=pool_size, max_sessions=max_sessions,
+                        idle_timeout=idle_timeout) as manager:
+        serve_repl_main(manager, port)
 
 
 @cli.command()
@@ -0,0 +1,129 @@
+"""
+Evaluates transpiled (Python) scripts, compiling a script once in order
+to run it any amount of times, e.g. once for each input record.
+"""
+
+import ast
+
+from .polyfill import scope as global_scope
+from .polyfill import JSValue, JSObject, JSString, JSArray
+from .polyfill import JS_UNDEFINED, JS_NULL, JS_TRUE, JS_FALSE
+from .polyfill.runtime import _box_number
+
+# name the value of the last expression statement of a script is stored as
+_RESULT_NAME = "__js_result__"
+
+# module star-imported by scripts transpiled with imports included
+_POLYFILL_MODULE = "shift_codegen_py.polyfill"
+
+
+class Script(object):
+    """
+    A transpiled script, compiled once.
+
+    Each run of the script gets its own namespace and its own (copy-on-write)
+    fork of the global scope (or the given scope), as snapshotted when the
+    script is created, in which the input bindings of that run are declared.
+    Runs are isolated from one another, except for changes to the properties
+    of shared objects (e.g. `Math`), see `Scope.snapshot`. The result of a run is the value
+    of the last statement of the script if it is an expression
+    (as is the case for a JS eval), undefined otherwise.
+    """
+
+    def __init__(self, source, filename="<script>", scope=None):
+        self._prepare(compile_script(source, filename=filename), scope)
+
+    @classmethod
+    def from_code(cls, code, scope=None):
+        """
+        Create a script from the code object of another script, see `code`.
+        """
+        script = cls.__new__(cls)
+        script._prepare(code, scope)
+        return script
+
+    def _prepare(self, code, scope):
+        self._code = code
+        self._snapshot = (global_scope if scope is None else scope).snapshot()
+        self._namespace = {}
+        exec(f"from {_POLYFILL_MODULE} import *", self._namespace)
+
+    @property
+    def code(self):
+        """
+        The compiled code object of this script, which can be marshalled.
+        """
+        return self._code
+
+    def run(self, bindings=None):
+        """
+        Run the script once, with the given bindings (a name->value mapping)
+        declared as vars, returning the result of the run.
+        """
+        namespace = self._namespace.copy()
+        run_scope = self._snapshot.fork()
+        if bindings:
+            for name, value in bindings.items():
+                value = to_js(value)
+                run_scope.declare_var(name, value)
+                namespace[name] = value
+        namespace["scope"] = run_scope
+        exec(self._code, namespace)
+        return namespace.get(_RESULT_NAME, JS_UNDEFINED)
+
+    def run_many(self, bindings):
+        """
+        Run the script once for each of the given bindings,
+        yielding the results in the same order.
+        """
+        run = self.run
+        for run_bindings in bindings:
+            yield run(run_bindings)
+
+
+def compile_script(source, filename="<script>"):
+    """
+    Compile the transpiled script into the code object run by a `Script`.
+    """
+    tree = ast.parse(source, filename=filename)
+    body = tree.body
+    # the polyfill is imported once, rather than for each run
+    body[:] = [stmt for stmt in body if not _is_polyfill_import(stmt)]
+    if body and isinstance(body[-1], ast.Expr):
+        body[-1] = ast.copy_location(ast.Assign(
+            targets=[ast.Name(id=_RESULT_NAME, ctx=ast.Store())],
+            value=body[-1].value), body[-1])
+    ast.fix_missing_locations(tree)
+    return compile(tree, filename, "exec")
+
+
+def _is_polyfill_import(stmt):
+    return (isinstance(stmt, ast.ImportFrom) and stmt.module == _POLYFILL_MODULE
+            and any(alias.name == "*" for alias in stmt.names))
+
+
+def to_js(value):
+    """
+    Return the given Python value as a JS value,
+    JS values are returned as they are.
+    """
+    if isinstance(value, JSValue):
+        return value
+    if value is None:
+        return JS_NULL
+    if value is True:
+        return JS_TRUE
+    if value is False:
+        return JS_FALSE
+    if isinstance(value, (int, float)):
+        return _box_number(float(value))
+    if isinstance(value, str):
+        return JSString(value)
+    if isinstance(value, (list, tuple)):
+        return JSArray([to_js(element) for element in value])
+    if isinstance(value, dict):
+        obj = JSObject()
+        for name, element in value.items():
+            obj.assign(str(name), to_js(element))
+        return obj
+    raise TypeError(f"cannot convert {type(value).__name__} to a JS value")
@@ -0,0 +1,139 @@
+"""
+Client of the long-lived js2py transpile server (`js2py --transpile-server`),
+transpiling JS scripts without having to start a node process for each of them.
+"""
+
+import json
+import subprocess
+import threading
+from concurrent.futures import Future
+from itertools import count
+
+# command used to start the transpile server, requires js2py to be installed (e.g. `npm link`)
+DEFAULT_COMMAND = ("js2py", "--transpile-server")
+
+
+class TranspileError(Exception):
+    """
+    Raised in case a JS script could not be transpiled.
+    """
+
+
+class TranspileClient(object):
+    """
+    Transpiles JS scripts using a transpile server, started as a child process.
+
+    Requests are pipelined: any amount of them can be submitted without waiting
+    for the responses, which are read by a background thread as they come in.
+    The client can be used from multiple threads.
+    """
+
+    def __init__(self, command=DEFAULT_COMMAND, ast_cache_size=0):
+        command = list(command)
+        if ast_cache_size:
+            command += ["--ast-cache-size", str(ast_cache_size)]
+        self._process = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            encoding="utf-8", bufsize=1)
+        self._ids = count()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._error = None  # set once no more responses can be read
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def submit(self, sources, options=None):
+        """
+        Submit a batch of JS sources to be transpiled using the given options
+        (e.g. `{"includeImports": True}`), returning a future of the
+        transpiled (Python) sources, in the same order.
+        """
+        future = Future()
+        request = {"sources": list(sources), "options": options or {}}
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("transpile client is closed")
+            if self._error is not None:
+                future.set_exception(TranspileError(self._error))
+                return future
+            request["id"] = next(self._ids)
+            self._pending[request["id"]] = future
+            self._process.stdin.write(json.dumps(request) + "\n")
+            self._process.stdin.flush()
+        return future
+
+    def transpile(self, source, options=None):
+        """
+        Transpile a single JS source using the given options.
+        """
+        return self.submit([source], options).result()[0]
+
+    def transpile_many(self, sources, options=None, batch_size=64):
+        """
+        Transpile the JS sources using the given options,
+        submitting all batches before waiting for any of them.
+        """
+        sources = list(sources)
+        futures = [
+            self.submit(sources[start:start + batch_size], options)
+            for start in range(0, len(sources), batch_size)]
+        return [output for future in futures for output in future.result()]
+
+    def close(self):
+        """
+        Stop the transpile server, once all submitted requests are answered.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._process.stdin.close()
+        self._reader.join()
+        self._process.wait()
+
+    def _read(self):
+        error = "transpile server stopped"
+        try:
+            for line in self._process.stdout:
+                try:
+                    response = json.loads(line)
+                except ValueError as e:
+                    # e.g. a partial line, the responses can no longer be trusted
+                    error = f"invalid response from transpile server: {e}"
+                    self._process.kill()
+                    break
+                self._resolve(response)
+        except Exception as e:
+            error = f"transpile client failed: {e!r}"
+        finally:
+            # the server stopped (or cannot be read), fail all requests it did not answer,
+            # as well as the ones submitted from now on
+            with self._lock:
+                self._error = error
+                pending, self._pending = self._pending, {}
+            for future in pending.values():
+                future.set_exception(TranspileError(error))
+
+    def _resolve(self, response):
+        with self._lock:
+            future = self._pending.pop(response.get("id"), None)
+        if future is None:
+            return  # e.g. an invalid request, cannot happen using this client
+        if "error" in response:
+            future.set_exception(TranspileError(response["error"]))
+            return
+        outputs = []
+        for index, result in enumerate(response["results"]):
+            if "error" in result:
+                future.set_exception(TranspileError(
+                    f"source #{index}: {result['error']}"))
+                return
+            outputs.append(result["output"])
+        future.set_result(outputs)
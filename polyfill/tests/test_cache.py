@@ -0,0 +1,108 @@
+"""
+Tests of the persistent cache of transpiled scripts.
+"""
+
+import multiprocessing
+import os
+
+from shift_codegen_py.cache import ScriptCache
+
+
+class _Transpiler(object):
+    """
+    Fake transpiler, counting the sources it transpiled.
+    """
+
+    def __init__(self):
+        self.sources = []
+
+    def __call__(self, js_source, options):
+        self.sources.append(js_source)
+        return f"x = {len(self.sources)}\n"
+
+
+def _entry_sizes(cache):
+    return {path: size for path, _, size in cache._entries()}
+
+
+def test_load_hit_and_miss(tmp_path):
+    cache = ScriptCache(str(tmp_path), transpiler_version="1")
+    transpile = _Transpiler()
+    python_source, code = cache.load("x", transpile)
+    assert python_source == "x = 1\n"
+    assert cache.load("x", transpile)[0] == python_source
+    assert transpile.sources == ["x"]
+    assert cache.get("y") is None
+    cache.load("y", transpile)
+    assert transpile.sources == ["x", "y"]
+    namespace = {}
+    exec(cache.get("x")[1], namespace)
+    assert namespace["x"] == 1
+
+
+def test_key_invalidation(tmp_path):
+    cache = ScriptCache(str(tmp_path), transpiler_version="1")
+    key = cache.key("x", {"includeImports": True})
+    assert cache.key("x", {"includeImports": True}) == key
+    assert cache.key("y", {"includeImports": True}) != key
+    assert cache.key("x", {"includeImports": False}) != key
+    assert cache.key("x") != key
+
+    transpile = _Transpiler()
+    cache.load("x", transpile)
+    other = ScriptCache(str(tmp_path), transpiler_version="2")
+    assert other.key("x") != cache.key("x")
+    assert other.get("x") is None
+    other.load("x", transpile)
+    assert transpile.sources == ["x", "x"]
+
+
+def test_lru_eviction(tmp_path):
+    cache = ScriptCache(str(tmp_path), transpiler_version="1")
+    transpile = _Transpiler()
+    for index in range(10):
+        cache.load(f"script{index}", transpile)
+    sizes = _entry_sizes(cache)
+    entry_size = max(sizes.values())
+    # order the entries by their use, the first one least recently used
+    for index in range(10):
+        path = cache._path(cache.key(f"script{index}"))
+        os.utime(path, (index, index))
+
+    max_size = entry_size * 10 - 1
+    cache = ScriptCache(str(tmp_path), max_size=max_size, transpiler_version="1")
+    cache.load("script10", transpile)
+    size = sum(_entry_sizes(cache).values())
+    assert size <= max_size * 0.9
+    assert cache._read_size() == size
+    # the least recently used entries are evicted first
+    assert cache.get("script0") is None
+    assert cache.get("script9") is not None
+    assert cache.get("script10") is not None
+
+
+def _write_entries(directory, writer, count):
+    cache = ScriptCache(directory, transpiler_version="1")
+    for index in range(count):
+        cache.put(f"script{writer}_{index}", f"x = {index}\n")
+
+
+def test_concurrent_writers(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    writers = [
+        context.Process(target=_write_entries, args=(str(tmp_path), writer, 50))
+        for writer in range(2)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+        assert writer.exitcode == 0
+
+    cache = ScriptCache(str(tmp_path), transpiler_version="1")
+    sizes = _entry_sizes(cache)
+    assert len(sizes) == 100
+    # the size is only updated under the lock, so no update can be lost
+    assert cache._read_size() == sum(sizes.values())
+    for writer in range(2):
+        for index in range(50):
+            assert cache.get(f"script{writer}_{index}")[0] == f"x = {index}\n"
@@ -0,0 +1,40 @@
+"""
+Tests of running a transpiled script over many inputs using worker processes.
+"""
+
+import pytest
+
+from shift_codegen_py.executor import ScriptExecutor
+from shift_codegen_py.polyfill import JSNumber
+
+SCRIPT = "x * JSNumber(2)\n"
+
+# calling a number raises a (JS) TypeError for the inputs with `fail` set
+FAILING_SCRIPT = 'scope["x"]() if scope["fail"] else scope["x"]\n'
+
+
+def test_map_keeps_order():
+    bindings = [{"x": i} for i in range(100)]
+    with ScriptExecutor(SCRIPT, max_workers=2, batch_size=7) as executor:
+        results = list(executor.map(bindings))
+    assert results == [JSNumber(2 * i) for i in range(100)]
+
+
+def test_map_unordered_indices():
+    bindings = [{"x": i} for i in range(100)]
+    with ScriptExecutor(SCRIPT, max_workers=2, batch_size=7) as executor:
+        results = dict(executor.map_unordered(bindings))
+    assert results == {i: JSNumber(2 * i) for i in range(100)}
+
+
+def test_worker_exceptions_propagate():
+    bindings = [{"x": i, "fail": i == 42} for i in range(100)]
+    executor = ScriptExecutor(FAILING_SCRIPT, max_workers=2, batch_size=10)
+    try:
+        results = executor.map(bindings)
+        with pytest.raises(TypeError, match="is not a function"):
+            list(results)
+        with pytest.raises(TypeError, match="is not a function"):
+            list(executor.map_unordered(bindings))
+    finally:
+        executor.terminate()
@@ -0,0 +1,59 @@
+"""
+Tests of hot-reloading the polyfill within REPL sessions.
+
+Each test runs in its own interpreter, as reloading the polyfill redefines
+the types of the JS values used by all other tests.
+"""
+
+import subprocess
+import sys
+import textwrap
+
+# evaluates a few commands in a session, reloads the given module,
+# and prints the amount of times the first command was evaluated,
+# as well as the results of the given commands evaluated after the reload
+SESSION = '''
+import builtins
+from shift_codegen_py.repl import REPL, PolyfillReloader
+
+class Watcher:
+    changed = set()
+
+    def pop_changed(self):
+        changed, Watcher.changed = Watcher.changed, set()
+        return changed
+
+    def stop(self):
+        pass
+
+builtins.evaluated = []
+with REPL(reloader=PolyfillReloader(Watcher())) as repl:
+    for cmd in ["evaluated.append(1)", "x = JSNumber(1)", "ceil = 5"]:
+        assert repl.eval(cmd).exception is None
+    Watcher.changed = {{"shift_codegen_py.polyfill.{module}"}}
+    results = [repl.eval(cmd).value for cmd in {commands!r}]
+    print(len(builtins.evaluated), results)
+'''
+
+
+def _reload_session(module, commands):
+    script = textwrap.dedent(SESSION).format(module=module, commands=commands)
+    output = subprocess.run(
+        [sys.executable, "-c", script], check=True, capture_output=True, text=True).stdout
+    evaluated, results = output.strip().split(" ", 1)
+    return int(evaluated), results
+
+
+def test_std_reload_without_replay():
+    evaluated, results = _reload_session(
+        "std", ["x + JSNumber(1)", "ceil", "type(x) is JSNumber"])
+    assert evaluated == 1
+    assert results == "['2', '5', 'True']"
+
+
+def test_runtime_reload_with_replay():
+    evaluated, results = _reload_session(
+        "runtime", ["x + JSNumber(1)", "ceil", "type(x) is JSNumber"])
+    # the values of the session are recreated using the reloaded types
+    assert evaluated == 2
+    assert results == "['2', '5', 'True']"
@@ -0,0 +1,117 @@
+"""
+Tests of the JS runtime polyfill.
+
+Usage (with shift_codegen_py installed, e.g. using `pip install -e .`):
+    python -m pytest tests
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from shift_codegen_py.polyfill import (
+    JSArray, JSNumber, JSObject, JSString, JS_NAN, JS_UNDEFINED, PropertyCache, Scope)
+from shift_codegen_py.polyfill import runtime
+
+
+@pytest.mark.parametrize("declare", ["declare_var", "declare_let", "declare_const"])
+@pytest.mark.parametrize("value", [
+    lambda: JSNumber(0) / JSNumber(0),
+    lambda: JSString("a") - JSNumber(1),
+    lambda: JSNumber(float("nan")),
+])
+def test_declare_nan(declare, value):
+    scope = Scope()
+    getattr(scope, declare)("x", value())
+    assert scope["x"] is JS_NAN
+
+
+@pytest.mark.parametrize("value, expected", [
+    (0.0, "0"),
+    (-0.0, "0"),
+    (-1.0, "-1"),
+    (0.1, "0.1"),
+    (123.45, "123.45"),
+    (1e20, "100000000000000000000"),
+    (1.5e20, "150000000000000000000"),
+    (1e21, "1e+21"),
+    (1.5e21, "1.5e+21"),
+    (1e-6, "0.000001"),
+    (1.5e-7, "1.5e-7"),
+    (5e-324, "5e-324"),
+])
+def test_number_to_string(value, expected):
+    assert str(JSNumber(value)) == expected
+
+
+def _shape_tree_size(shape):
+    return 1 + sum(_shape_tree_size(next_shape)
+                   for next_shape in shape._transitions.values())
+
+
+def test_distinct_keys_do_not_grow_shapes():
+    prefix = JSObject()
+    prefix.assign('test_distinct_keys', JSNumber(0))
+    size = _shape_tree_size(runtime._ROOT_SHAPE)
+    objects = []
+    for i in range(10 * runtime._SHAPE_MAX_TRANSITIONS):
+        obj = JSObject()
+        obj.assign('test_distinct_keys', JSNumber(0))
+        obj.assign('key%d' % i, JSNumber(i))
+        objects.append(obj)
+    assert _shape_tree_size(runtime._ROOT_SHAPE) <= size + runtime._SHAPE_MAX_TRANSITIONS
+    for i, obj in enumerate(objects):
+        assert obj['key%d' % i] == JSNumber(i)
+    assert objects[-1]._shape._dictionary
+
+
+def test_property_cache_nan_receiver():
+    cache = PropertyCache('foo')
+    obj = JSObject()
+    obj.assign('foo', JSNumber(1))
+    assert cache.load(obj) == JSNumber(1)
+    assert cache.load(JS_NAN) is JS_UNDEFINED
+    assert cache.load(JSNumber(0) / JSNumber(0)) is JS_UNDEFINED
+    assert cache.load(obj) == JSNumber(1)
+
+
+def test_array_methods_bound_once():
+    first = JSArray([JSNumber(1)])
+    second = JSArray([JSNumber(2)])
+    push = first['push']
+    assert first['push'] is push
+    assert second['push'] is not push
+    push(Scope(), JSNumber(3))
+    assert list(first) == [JSNumber(1), JSNumber(3)]
+    assert list(second) == [JSNumber(2)]
+
+
+def test_update_properties():
+    obj = JSObject()
+    obj.assign('x', JSNumber(1))
+    assert obj.pinc_item('x') == JSNumber(1)
+    assert obj['x'] == JSNumber(2)
+    assert obj.dec_item('x') == JSNumber(1)
+    assert obj['x'] == JSNumber(1)
+    array = JSArray([JSNumber(1), JSNumber(2)])
+    assert array.inc_item(JSNumber(1)) == JSNumber(3)
+    assert array.pdec_item(JSNumber(0)) == JSNumber(1)
+    assert list(array) == [JSNumber(0), JSNumber(3)]
+
+
+def test_small_ints_interned_once_used():
+    assert 977 not in runtime._JS_SMALL_INTS
+    with ThreadPoolExecutor(8) as executor:
+        numbers = list(executor.map(lambda _: JSNumber(977), range(64)))
+    assert all(number is numbers[0] for number in numbers)
+    assert JSNumber(976) + JSNumber(1) is numbers[0]
+
+
+def test_update_nan():
+    scope = Scope()
+    scope.declare_let("x", JSNumber(0) / JSNumber(0))
+    assert scope.pinc("x") is JS_NAN
+    assert scope.inc("x") is JS_NAN
+    assert scope.dec("x") is JS_NAN
+    assert scope.pdec("x") is JS_NAN
+    assert scope["x"] is JS_NAN
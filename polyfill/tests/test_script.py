@@ -0,0 +1,81 @@
+"""
+Tests of running transpiled scripts using the Script API.
+"""
+
+import marshal
+
+import pytest
+
+from shift_codegen_py.polyfill import (
+    JSArray, JSNumber, JSObject, JSString, JS_FALSE, JS_NULL, JS_TRUE, JS_UNDEFINED)
+from shift_codegen_py.script import Script, compile_script, to_js
+
+
+def test_last_expression_is_result():
+    assert Script("x = JSNumber(1)\nx + JSNumber(2)\n").run() == JSNumber(3)
+
+
+def test_no_last_expression():
+    assert Script("x = JSNumber(1)\n").run() is JS_UNDEFINED
+    assert Script("").run() is JS_UNDEFINED
+
+
+def test_polyfill_import_is_dropped():
+    code = compile_script(
+        "from shift_codegen_py.polyfill import *\nJSNumber(1)\n")
+    assert "shift_codegen_py.polyfill" not in code.co_names
+    # the code can be marshalled, e.g. to be cached or sent to another process
+    script = Script.from_code(marshal.loads(marshal.dumps(code)))
+    assert script.run() == JSNumber(1)
+
+
+def test_bindings():
+    script = Script('scope["x"] + y')
+    assert script.run({"x": 1, "y": 2}) == JSNumber(3)
+    assert script.run({"x": "a", "y": JSString("b")}) == JSString("ab")
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, JS_NULL),
+    (True, JS_TRUE),
+    (False, JS_FALSE),
+    (3, JSNumber(3)),
+    (1.5, JSNumber(1.5)),
+    ("abc", JSString("abc")),
+])
+def test_to_js_primitives(value, expected):
+    result = to_js(value)
+    assert type(result) is type(expected)
+    assert str(result) == str(expected)
+
+
+def test_to_js_containers():
+    array = to_js([1, "a", [None]])
+    assert isinstance(array, JSArray)
+    assert list(array)[:2] == [JSNumber(1), JSString("a")]
+    assert list(list(array)[2]) == [JS_NULL]
+    obj = to_js({"x": 1, 2: (True,)})
+    assert isinstance(obj, JSObject)
+    assert obj["x"] == JSNumber(1)
+    assert list(obj["2"]) == [JS_TRUE]
+    number = JSNumber(7)
+    assert to_js(number) is number
+    with pytest.raises(TypeError):
+        to_js(object())
+
+
+def test_runs_are_isolated():
+    script = Script(
+        'scope.declare_var("count", JSNumber(1) if scope["count"] is JSUndefined() '
+        'else scope["count"] + JSNumber(1))\n'
+        'seen = JSNumber(1) if "seen" not in globals() else seen + JSNumber(1)\n'
+        'scope["count"] + seen\n')
+    assert script.run() == JSNumber(2)
+    assert script.run() == JSNumber(2)
+    assert script.run({"count": 5}) == JSNumber(7)
+
+
+def test_run_many():
+    script = Script("x * JSNumber(2)")
+    assert list(script.run_many([{"x": 1}, {"x": 2}, {"x": 3}])) == [
+        JSNumber(2), JSNumber(4), JSNumber(6)]
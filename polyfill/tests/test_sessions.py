@@ -0,0 +1,104 @@
+"""
+Tests of the REPL sessions of the eval server, as managed by a `SessionManager`.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from shift_codegen_py.repl import SessionManager
+
+
+def _eval_all(manager, *commands):
+    """
+    Evaluate the (sid, cmd) pairs concurrently, returning their results,
+    or the exception raised for them.
+    """
+    async def main():
+        return await asyncio.gather(
+            *(manager.eval(sid, cmd) for sid, cmd in commands), return_exceptions=True)
+    return asyncio.run(main())
+
+
+def _wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_sessions_are_isolated():
+    with SessionManager(pool_size=1) as manager:
+        _eval_all(manager, ("a", "x = 1"), ("b", "x = 2"))
+        a, b = _eval_all(manager, ("a", "x"), ("b", "x"))
+        assert (a.value, b.value) == ("1", "2")
+        manager.release("a")
+        result, = _eval_all(manager, ("a", "x"))
+        assert "NameError" in result.exception
+
+
+def test_pool_is_refilled():
+    with SessionManager(pool_size=2) as manager:
+        pooled = list(manager._pool)
+        _eval_all(manager, ("a", "1"), ("b", "1"))
+        assert {id(manager._sessions[sid]) for sid in "ab"} == {id(s) for s in pooled}
+        _wait_for(lambda: len(manager._pool) == 2)
+
+
+def test_exhausted_pool_creates_sessions_in_workers():
+    with SessionManager(pool_size=0) as manager:
+        threads = []
+        session_new = manager._session_new
+
+        def recording_session_new():
+            threads.append(threading.current_thread())
+            return session_new()
+
+        manager._session_new = recording_session_new
+        result, = _eval_all(manager, ("a", "1 + 1"))
+        assert result.value == "2"
+        assert threads and threading.main_thread() not in threads
+
+
+def test_commands_of_a_session_are_serialized():
+    with SessionManager(pool_size=1, max_workers=4) as manager:
+        _eval_all(manager, ("a", "import time; active = overlap = 0"))
+        command = ("global active, overlap\n"
+                   "active += 1; overlap = max(overlap, active)\n"
+                   "time.sleep(0.02)\n"
+                   "active -= 1\n")
+        command = f"exec({command!r})"
+        results = _eval_all(manager, *[("a", command)] * 8)
+        assert all(result.exception is None for result in results)
+        result, = _eval_all(manager, ("a", "overlap"))
+        assert result.value == "1"
+
+
+def test_idle_sessions_are_evicted():
+    with SessionManager(pool_size=1, idle_timeout=60) as manager:
+        _eval_all(manager, ("a", "x = 1"))
+        manager.evict_idle()
+        assert "a" in manager._sessions
+        manager._idle_timeout = 0
+        time.sleep(0.01)
+        manager.evict_idle()
+        assert "a" not in manager._sessions
+        result, = _eval_all(manager, ("a", "x"))
+        assert "NameError" in result.exception
+
+
+def test_max_sessions():
+    with SessionManager(pool_size=0, max_sessions=2, max_workers=8) as manager:
+        results = _eval_all(manager, *[(f"sid{i}", "1") for i in range(6)])
+        errors = [result for result in results if isinstance(result, Exception)]
+        assert len(errors) == 4
+        assert all(isinstance(error, RuntimeError) for error in errors)
+        assert len(manager._sessions) == 2
+        # existing sessions remain usable
+        for sid in manager._sessions:
+            result, = _eval_all(manager, (sid, "2"))
+            assert result.value == "2"
+        with pytest.raises(RuntimeError, match="too many sessions"):
+            asyncio.run(manager.eval("other", "1"))
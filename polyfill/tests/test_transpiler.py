@@ -0,0 +1,95 @@
+"""
+Tests of the transpile client, using a fake transpile server
+(speaking the same protocol), as well as the actual one if it can be run.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from shift_codegen_py.transpiler import TranspileClient, TranspileError
+
+# echoes each source in upper case, failing sources containing "error",
+# and answering any request containing "garbage" with a partial line
+FAKE_SERVER = r'''
+import json, sys
+for line in sys.stdin:
+    request = json.loads(line)
+    if any("garbage" in source for source in request["sources"]):
+        sys.stdout.write('{"id": ' + str(request["id"]) + ', "res\n')
+        sys.stdout.flush()
+        continue
+    results = [
+        {"error": "unexpected token"} if "error" in source else {"output": source.upper()}
+        for source in request["sources"]]
+    sys.stdout.write(json.dumps({"id": request["id"], "results": results}) + "\n")
+    sys.stdout.flush()
+'''
+
+FAKE_COMMAND = (sys.executable, "-c", FAKE_SERVER)
+
+SERVER_JS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "js2py", "src", "server.js")
+
+
+def _server_command():
+    """
+    Return the command starting the actual transpile server, None if it cannot run here.
+    """
+    node = shutil.which("node")
+    if node is None or not os.path.exists(SERVER_JS):
+        return None
+    script = f"require({SERVER_JS!r}).startTranspileServer()"
+    probe = subprocess.run(
+        [node, "-e", f"require({SERVER_JS!r})"], capture_output=True)
+    if probe.returncode != 0:
+        return None  # e.g. its dependencies are not installed
+    return (node, "-e", script)
+
+
+def test_round_trip():
+    with TranspileClient(FAKE_COMMAND) as client:
+        assert client.transpile("let x") == "LET X"
+        futures = [client.submit([f"x{i}", f"y{i}"]) for i in range(20)]
+        assert [future.result(timeout=10) for future in futures] == [
+            [f"X{i}", f"Y{i}"] for i in range(20)]
+        assert client.transpile_many(
+            [f"z{i}" for i in range(10)], batch_size=3) == [f"Z{i}" for i in range(10)]
+
+
+def test_transpile_error():
+    with TranspileClient(FAKE_COMMAND) as client:
+        with pytest.raises(TranspileError, match="source #1: unexpected token"):
+            client.submit(["x", "error"]).result(timeout=10)
+        # the client remains usable
+        assert client.transpile("x") == "X"
+
+
+def test_invalid_response_fails_pending_requests():
+    with TranspileClient(FAKE_COMMAND) as client:
+        future = client.submit(["garbage"])
+        with pytest.raises(TranspileError, match="invalid response"):
+            future.result(timeout=10)
+        # requests submitted from now on fail as well, rather than hang
+        with pytest.raises(TranspileError):
+            client.submit(["x"]).result(timeout=10)
+
+
+def test_closed_client():
+    client = TranspileClient(FAKE_COMMAND)
+    client.close()
+    with pytest.raises(RuntimeError):
+        client.submit(["x"])
+
+
+@pytest.mark.skipif(_server_command() is None, reason="transpile server cannot run here")
+def test_server_round_trip():
+    with TranspileClient(_server_command()) as client:
+        assert client.transpile_many(["x = 1", "foo(x)"]) == [
+            "x = JSNumber(1)\n", "foo(x)\n"]
+        with pytest.raises(TranspileError):
+            client.transpile("let = = 1")
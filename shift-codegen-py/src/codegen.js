@@ -9,6 +9,7 @@ const {
   // Primitive Types
   LiteralBoolean,
   LiteralNumeric,
+  LiteralFloat,
   LiteralString,
   LiteralRegexp,
   // Branch Types
@@ -16,17 +17,24 @@ const {
   // Loop Types
   WhileExpression, // Used for For Do-While loops as well
   ForExpression,
+  ForRangeExpression,
   // Expression Types
   PrefixOperation, // AKA Unary Operations
   InfixOperation, // AKA binary operations
   InPlaceOperation, // also binary ops, but in-place variant
   ByOneOperation, // ++ / --
+  UnboxedByOneOperation,
+  ChainExpression, // comma operator as a plain tuple
   Assignment,
   CallExpression,
   PropertyGetterExpression,
+  MemberTarget,
   TemplateExpression,
   // Reference Related Types
   Identifier,
+  // Unboxed Types
+  UnboxedNumber,
+  UnboxedBool,
   // Scope Types
   Block,
   // Special Types
@@ -45,12 +53,22 @@ const {
 
   // Python Types for Special Purposes
   PythonFunctionDef,
+  PythonNumber,
+  ReturnExpression,
 
   // Token Utilities
   GetPrecedence,
 } = require("./token");
 
+const {
+  NumberInference,
+  countingLoop,
+  isNumberLiteral,
+} = require("./infer");
+const { ScopeAnalysis } = require("./scope");
+
 const { default: codeGen, FormattedCodeGen } = require("shift-codegen");
+const { reduce } = require("shift-reducer");
 
 const {
   version: projectVersion,
@@ -58,7 +76,13 @@ const {
 } = require("../package.json");
 
 class PyCodeGen {
-  constructor({ topLevelComment, includeImports, scopedScript } = {}) {
+  constructor({
+    topLevelComment,
+    includeImports,
+    scopedScript,
+    inlineChains,
+    unboxedNumbers,
+  } = {}) {
     // a top level comment to indicate we generated it,
     // and including the original javascript code (or at least the one generated
     // from the AST that we used)
@@ -74,6 +98,46 @@ class PyCodeGen {
 
     // used to generate the import statements
     this.includeImports = !!includeImports;
+
+    // used to generate chained (comma) expressions as a plain tuple,
+    // rather than as raw strings evaluated by the `jschain` polyfill function
+    this.inlineChains = !!inlineChains;
+
+    // used to generate number expressions and variables, which are inferred
+    // to only ever be numbers, as plain Python floats, see `analyze`
+    this.unboxedNumbers = !!unboxedNumbers;
+    this.numberInference = new NumberInference();
+
+    // used to generate functions as Python functions, see `analyze`
+    this.scopeAnalysis = new ScopeAnalysis();
+  }
+
+  // analyze the scopes and infer the types of the script (tree) to be reduced,
+  // required for functions, and for variables to be unboxed,
+  // when generating unboxed numbers
+  analyze(tree) {
+    this.scopeAnalysis = new ScopeAnalysis(tree);
+    if (this.unboxedNumbers) {
+      this.numberInference = new NumberInference(tree);
+    }
+  }
+
+  // function declarations are hoisted, and thus defined
+  // before any other statement of their script or function body
+  hoistFunctions(nodes, statements) {
+    const isFunction = (index) => nodes[index].type === "FunctionDeclaration";
+    return [
+      ...statements.filter((_, index) => isFunction(index)),
+      ...statements.filter((_, index) => !isFunction(index)),
+    ];
+  }
+
+  isUnboxedNumber(node) {
+    return this.unboxedNumbers && this.numberInference.isUnboxedNumber(node);
+  }
+
+  isUnboxedTarget(node) {
+    return this.unboxedNumbers && this.numberInference.isUnboxedTarget(node);
   }
 
   // parenToAvoidBeingDirective(element, original) {
@@ -104,11 +168,14 @@ class PyCodeGen {
   }
 
   reduceAssignmentExpression(node, { binding, expression }) {
+    if (this.isUnboxedTarget(node.binding)) {
+      return new Assignment(binding, expression.unboxed());
+    }
     return new Assignment(binding, expression);
   }
 
   reduceAssignmentTargetIdentifier(node) {
-    return new Identifier(node.name);
+    return new Identifier(this.scopeAnalysis.pythonName(node));
   }
 
   reduceAssignmentTargetPropertyIdentifier(node, elements) {
@@ -128,8 +195,15 @@ class PyCodeGen {
   }
 
   reduceBinaryExpression(node, { left, right }) {
+    const isUnboxedNumber = this.isUnboxedNumber(node);
+    const isUnboxedComparison =
+      this.unboxedNumbers && this.numberInference.isUnboxedComparison(node);
     let leftCode = left;
     let rightCode = right;
+    if (isUnboxedNumber || isUnboxedComparison) {
+      leftCode = left.unboxed();
+      rightCode = right.unboxed();
+    }
 
     let isRightAssociative = node.operator === "**";
     if (
@@ -147,11 +221,26 @@ class PyCodeGen {
       rightCode = new RawTuple(rightCode);
     }
 
+    if (node.operator === "," && this.inlineChains) {
+      return new ChainExpression(leftCode, rightCode);
+    }
+    if (isUnboxedNumber) {
+      return new UnboxedNumber(
+        new InfixOperation(node.operator, leftCode, rightCode)
+      );
+    }
+    if (isUnboxedComparison) {
+      // numbers are compared by value, strict or not
+      const operator = { "===": "==", "!==": "!=" }[node.operator];
+      return new UnboxedBool(
+        new InfixOperation(operator || node.operator, leftCode, rightCode)
+      );
+    }
     return new InfixOperation(node.operator, leftCode, rightCode);
   }
 
   reduceBindingIdentifier(node) {
-    return new Identifier(node.name);
+    return new Identifier(this.scopeAnalysis.pythonName(node));
   }
 
   reduceBindingPropertyIdentifier(node, elements) {
@@ -179,6 +268,10 @@ class PyCodeGen {
   }
 
   reduceCallExpression(node, { callee, arguments: args }) {
+    if (this.scopeAnalysis.isWrappedFunction(node.callee)) {
+      // JS functions are called with the scope of the caller
+      return new CallExpression(callee, new Identifier("scope"), args);
+    }
     return new CallExpression(callee, args);
   }
 
@@ -199,6 +292,15 @@ class PyCodeGen {
   }
 
   reduceCompoundAssignmentExpression(node, { binding, expression }) {
+    if (this.isUnboxedNumber(node)) {
+      return new UnboxedNumber(
+        new InPlaceOperation(
+          node.operator.slice(0, -1),
+          binding,
+          expression.unboxed()
+        )
+      );
+    }
     // to keep things simple, use a regular assignment + infix operation
     return new InPlaceOperation(
       node.operator.slice(0, -1),
@@ -207,8 +309,12 @@ class PyCodeGen {
     );
   }
 
-  reduceComputedMemberAssignmentTarget(node, elements) {
-    return new TODO(node, "reduceComputedMemberAssignmentTarget");
+  reduceComputedMemberAssignmentTarget(node, { object, expression }) {
+    return new MemberTarget(
+      rawTupleIfNeeded(node.object, GetPrecedence(node), object),
+      expression,
+      true
+    );
   }
 
   reduceComputedMemberExpression(node, elements) {
@@ -293,19 +399,156 @@ class PyCodeGen {
   }
 
   reduceForStatement(node, { init, test, update, body }) {
+    const loop = countingLoop(
+      node,
+      this.numberInference,
+      this.scopeAnalysis.outerWrites
+    );
+    if (loop) {
+      return this.reduceCountingLoop(
+        loop,
+        this.scopeAnalysis.pythonName(node.init.declarators[0].binding),
+        body
+      );
+    }
     return new ForExpression(init, test, update, body);
   }
 
+  // a counting loop as a Python for loop over the values of its counter,
+  // only evaluating its stop value once, as neither it nor the counter
+  // are modified by the body of the loop
+  reduceCountingLoop({ counter, start, stop, step, inclusive }, name, body) {
+    const args = [
+      this.reduceRangeArgument(start),
+      this.reduceRangeArgument(stop),
+    ];
+    if (step !== 1) {
+      args.push(new PythonNumber(step));
+    }
+    if (inclusive) {
+      args.push(new RawToken("inclusive=True"));
+    }
+    if (
+      this.unboxedNumbers &&
+      this.numberInference.unboxedBindings.has(counter)
+    ) {
+      args.push(new RawToken("unboxed=True"));
+    }
+    return new ForRangeExpression(
+      new Identifier(name),
+      new CallExpression(new Identifier("jsrange"), args),
+      body
+    );
+  }
+
+  // a start or stop value of a counting loop,
+  // with numbers passed as plain Python numbers where possible
+  reduceRangeArgument(node) {
+    if (isNumberLiteral(node)) {
+      return new PythonNumber(
+        node.type === "UnaryExpression" ? -node.operand.value : node.value
+      );
+    }
+    const value = reduce(this, node);
+    return value instanceof UnboxedNumber ? value.unboxed() : value;
+  }
+
   reduceFormalParameters(node, elements) {
     return new TODO(node, "reduceFormalParameters");
   }
 
-  reduceFunctionBody(node, elements) {
-    return new TODO(node, "reduceFunctionBody");
+  reduceFunctionBody(node, { directives, statements }) {
+    return new Block(
+      ...directives,
+      ...this.hoistFunctions(node.statements, statements)
+    );
   }
 
-  reduceFunctionDeclaration(node, elements) {
-    return new TODO(node, "reduceFunctionDeclaration");
+  // a function as a Python function, with its bindings as Python locals,
+  // only for functions with simple parameters and without dynamic scoping
+  reduceFunctionDeclaration(node, { body }) {
+    const scope = this.scopeAnalysis.functionScope(node);
+    if (
+      !scope ||
+      node.isAsync ||
+      node.isGenerator ||
+      node.params.rest ||
+      node.params.items.some((item) => item.type !== "BindingIdentifier")
+    ) {
+      return new TODO(node, "reduceFunctionDeclaration");
+    }
+
+    // bindings written but not declared by the function,
+    // where those of a scoped script are locals of its main function
+    const nonlocals = [...scope.nonlocals];
+    const globals = [];
+    scope.globals.forEach((name) => {
+      if (this.scopedScript && this.scopeAnalysis.scriptBindings.has(name)) {
+        nonlocals.push(name);
+      } else {
+        globals.push(name);
+      }
+    });
+    const declarations = [];
+    if (globals.length) {
+      declarations.push(new Line(new RawToken(`global ${globals.join(", ")}`)));
+    }
+    if (nonlocals.length) {
+      declarations.push(
+        new Line(new RawToken(`nonlocal ${nonlocals.join(", ")}`))
+      );
+    }
+
+    // a function without a (final) return statement returns undefined
+    const statements = node.body.statements;
+    const lines = [...body.lines];
+    if (
+      !statements.length ||
+      statements[statements.length - 1].type !== "ReturnStatement"
+    ) {
+      lines.push(new Line(new ReturnExpression(PyNone)));
+    }
+
+    const name = this.scopeAnalysis.pythonName(node.name);
+    const params = node.params.items;
+    if (scope.wrapped) {
+      // a JS function (e.g. passed as callback), called with a function scope,
+      // declaring its parameters, `this` and `arguments`
+      const prologue = params.map(
+        (item) =>
+          new Line(
+            new RawToken(
+              `${this.scopeAnalysis.pythonName(item)} = scope["${item.name}"]`
+            )
+          )
+      );
+      if (scope.usesThis) {
+        prologue.push(new Line(new RawToken("this = scope.this")));
+      }
+      if (scope.usesArguments) {
+        prologue.push(new Line(new RawToken("arguments = scope.arguments")));
+      }
+      const parameters = params.length
+        ? `, parameters=[${params.map((item) => `"${item.name}"`).join(", ")}]`
+        : "";
+      return new PythonFunctionDef(
+        name,
+        new Block(...declarations, ...prologue, ...lines),
+        {
+          args: ["scope"],
+          decorators: [`jsfunc(scope, "${node.name.name}"${parameters})`],
+        }
+      );
+    }
+
+    // all parameters are optional (undefined by default),
+    // and any additional arguments are ignored
+    return new PythonFunctionDef(name, new Block(...declarations, ...lines), {
+      args: params.map(
+        (item) => `${this.scopeAnalysis.pythonName(item)}=JSUndefined()`
+      ),
+      varg: "__extra",
+    });
   }
 
   reduceFunctionExpression(node, elements) {
@@ -327,7 +570,11 @@ class PyCodeGen {
     if (node.name === "NaN") {
       return PyNaN;
     }
-    return new Identifier(node.name);
+    const name = this.scopeAnalysis.pythonName(node);
+    if (this.isUnboxedNumber(node)) {
+      return new UnboxedNumber(new Identifier(name));
+    }
+    return new Identifier(name);
   }
 
   reduceIfStatement(node, { test, consequent, alternate }) {
@@ -363,6 +610,12 @@ class PyCodeGen {
   }
 
   reduceLiteralNumericExpression(node) {
+    if (this.unboxedNumbers) {
+      return new UnboxedNumber(
+        new LiteralFloat(node.value),
+        new LiteralNumeric(node.value)
+      );
+    }
     return new LiteralNumeric(node.value);
   }
 
@@ -407,8 +660,8 @@ class PyCodeGen {
     return new TODO(node, "reduceObjectExpression");
   }
 
-  reduceReturnStatement(node, elements) {
-    return new TODO(node, "reduceReturnStatement");
+  reduceReturnStatement(node, { expression }) {
+    return new ReturnExpression(expression || PyNone);
   }
 
   reduceScript(node, { directives, statements }) {
@@ -465,7 +718,10 @@ class PyCodeGen {
         new Block(
           new PythonFunctionDef(
             "main",
-            new Block(...directives, ...statements),
+            new Block(
+              ...directives,
+              ...this.hoistFunctions(node.statements, statements)
+            ),
             {
               args: ["scope"],
             }
@@ -480,7 +736,7 @@ class PyCodeGen {
       ...commentStatements,
       ...importStatements,
       ...directives,
-      ...statements
+      ...this.hoistFunctions(node.statements, statements)
     );
     block.isTopLevel = true;
     return block;
@@ -503,8 +759,11 @@ class PyCodeGen {
     return new TODO(node, "reduceSpreadProperty");
   }
 
-  reduceStaticMemberAssignmentTarget(node, elements) {
-    return new TODO(node, "reduceStaticMemberAssignmentTarget");
+  reduceStaticMemberAssignmentTarget(node, { object }) {
+    return new MemberTarget(
+      rawTupleIfNeeded(node.object, GetPrecedence(node), object),
+      new Identifier(node.property)
+    );
   }
 
   reduceStaticMemberExpression(node, { object }) {
@@ -547,6 +806,11 @@ class PyCodeGen {
   }
 
   reduceThisExpression(node, elements) {
+    const scope = this.scopeAnalysis.thisScope(node);
+    if (scope && scope.wrapped) {
+      // declared by the function itself
+      return new Identifier("this");
+    }
     return new TODO(node, "reduceThisExpression");
   }
 
@@ -563,18 +827,32 @@ class PyCodeGen {
   }
 
   reduceUnaryExpression(node, { operand }) {
+    if (this.isUnboxedNumber(node)) {
+      return new UnboxedNumber(
+        new PrefixOperation(node.operator, operand.unboxed())
+      );
+    }
     return new PrefixOperation(node.operator, operand);
   }
 
   reduceUpdateExpression(node, { operand }) {
+    let operator;
     switch (node.operator) {
       case "++":
-        return new ByOneOperation("+", operand, node.isPrefix);
+        operator = "+";
+        break;
       case "--":
-        return new ByOneOperation("-", operand, node.isPrefix);
+        operator = "-";
+        break;
       default:
         throw `invalid update expression operator '${node.operator}'`;
     }
+    if (this.isUnboxedNumber(node)) {
+      return new UnboxedNumber(
+        new UnboxedByOneOperation(operator, operand, node.isPrefix)
+      );
+    }
+    return new ByOneOperation(operator, operand, node.isPrefix);
   }
 
   reduceVariableDeclaration(node, { declarators }) {
@@ -592,6 +870,12 @@ class PyCodeGen {
   reduceVariableDeclarator(node, { binding, init }) {
     if (init === null) {
       init = PyNone;
+    } else if (
+      this.unboxedNumbers &&
+      node.binding.type === "BindingIdentifier" &&
+      this.numberInference.unboxedBindings.has(node.binding.name)
+    ) {
+      init = init.unboxed();
     }
     // TODO: replace with actual var/let/const thing
     return new Assignment(binding, init);
@@ -16,6 +16,7 @@ function transpile(script, opts) {
   }
 
   const generator = new PyCodeGen(opts);
+  generator.analyze(t);
   const rep = reduce(generator, t);
   const ts = new TokenStream();
   rep.emit(ts);
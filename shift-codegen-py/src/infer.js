@@ -0,0 +1,340 @@
+// Static type inference over a Shift (script) AST,
+// used by the code generator to emit number arithmetic unboxed:
+// as plain Python float arithmetic rather than operations on JSNumber objects.
+//
+// A binding (variable) is inferred to be an unboxed number when it is declared
+// by the script and all of its writes are unboxed number expressions:
+// number literals, other unboxed bindings, `++` / `--`, and `+`, `-` and `*`
+// (also as compound assignment) of these. Other arithmetic operators (e.g. `/`)
+// are left to the runtime, as Python raises errors where JS does not (e.g. on `1 / 0`).
+// Nothing but literals is unboxed for scripts using `eval` or `with`.
+
+// operators which result in the same value for Python floats as they do in JS
+const UNBOXED_ARITHMETIC_OPERATORS = new Set(["+", "-", "*"]);
+const UNBOXED_COMPARISON_OPERATORS = new Set([
+  "<",
+  ">",
+  "<=",
+  ">=",
+  "==",
+  "!=",
+  "===",
+  "!==",
+]);
+
+class NumberInference {
+  constructor(tree) {
+    this.unboxedBindings = new Set();
+    if (tree) {
+      this._infer(tree);
+    }
+  }
+
+  // true if the expression (node) is a number that can be evaluated unboxed
+  isUnboxedNumber(node) {
+    switch (node.type) {
+      case "LiteralNumericExpression":
+        return true;
+      case "IdentifierExpression":
+        return this.unboxedBindings.has(node.name);
+      case "UnaryExpression":
+        return (
+          (node.operator === "-" || node.operator === "+") &&
+          this.isUnboxedNumber(node.operand)
+        );
+      case "BinaryExpression":
+        return (
+          UNBOXED_ARITHMETIC_OPERATORS.has(node.operator) &&
+          this.isUnboxedNumber(node.left) &&
+          this.isUnboxedNumber(node.right)
+        );
+      case "UpdateExpression":
+        return this.isUnboxedTarget(node.operand);
+      case "CompoundAssignmentExpression":
+        return (
+          this.isUnboxedTarget(node.binding) &&
+          UNBOXED_ARITHMETIC_OPERATORS.has(node.operator.slice(0, -1)) &&
+          this.isUnboxedNumber(node.expression)
+        );
+      default:
+        return false;
+    }
+  }
+
+  // true if the expression (node) compares two unboxed numbers,
+  // resulting in a Python bool
+  isUnboxedComparison(node) {
+    return (
+      node.type === "BinaryExpression" &&
+      UNBOXED_COMPARISON_OPERATORS.has(node.operator) &&
+      this.isUnboxedNumber(node.left) &&
+      this.isUnboxedNumber(node.right)
+    );
+  }
+
+  // true if the assignment target (node) is an unboxed binding
+  isUnboxedTarget(node) {
+    return (
+      node.type === "AssignmentTargetIdentifier" &&
+      this.unboxedBindings.has(node.name)
+    );
+  }
+
+  _infer(tree) {
+    const { declared, writes, dynamic } = collectWrites(tree);
+    if (dynamic) {
+      return; // bindings can be changed in ways we cannot know about
+    }
+    // start from all declared bindings without unknown writes,
+    // and drop the bindings with a write that is not unboxed,
+    // until none are dropped, as bindings can be written using other bindings
+    declared.forEach((name) => {
+      if (writes.get(name).every((write) => !write.unknown)) {
+        this.unboxedBindings.add(name);
+      }
+    });
+    let changed = true;
+    while (changed) {
+      changed = false;
+      this.unboxedBindings.forEach((name) => {
+        if (!writes.get(name).every((write) => this._isUnboxedWrite(write))) {
+          this.unboxedBindings.delete(name);
+          changed = true;
+        }
+      });
+    }
+  }
+
+  _isUnboxedWrite({ update, operator, expression }) {
+    if (update) {
+      return true;
+    }
+    if (operator && !UNBOXED_ARITHMETIC_OPERATORS.has(operator)) {
+      return false;
+    }
+    return this.isUnboxedNumber(expression);
+  }
+}
+
+// recognize a canonical counting loop (ForStatement node), such as
+// `for (let i = start; i < stop; i++)`, counting up using `<` or `<=`,
+// or down using `>` or `>=`, by `++`, `--` or a constant step (e.g. `i += 2`),
+// with a number start value and a number literal or variable as stop value,
+// where neither the counter nor the stop variable are written by the body,
+// nor the stop variable by any function declared elsewhere (`outerWrites`),
+// returning `{ counter, start, stop, step, inclusive }`, null if it is not
+function countingLoop(node, numberInference, outerWrites = new Set()) {
+  const { init, test, update, body } = node;
+  if (
+    !init ||
+    init.type !== "VariableDeclaration" ||
+    init.kind !== "let" ||
+    init.declarators.length !== 1 ||
+    init.declarators[0].binding.type !== "BindingIdentifier" ||
+    !init.declarators[0].init
+  ) {
+    return null;
+  }
+  const counter = init.declarators[0].binding.name;
+  const start = init.declarators[0].init;
+  if (!numberInference.isUnboxedNumber(start)) {
+    return null;
+  }
+
+  const step = update && countingStep(update, counter);
+  if (!step) {
+    return null;
+  }
+
+  if (
+    !test ||
+    test.type !== "BinaryExpression" ||
+    test.left.type !== "IdentifierExpression" ||
+    test.left.name !== counter ||
+    !(step > 0 ? ["<", "<="] : [">", ">="]).includes(test.operator)
+  ) {
+    return null;
+  }
+  const stop = test.right;
+  if (
+    !isNumberLiteral(stop) &&
+    (stop.type !== "IdentifierExpression" || stop.name === counter)
+  ) {
+    return null;
+  }
+
+  const { writes, dynamic } = collectWrites(body);
+  if (
+    dynamic ||
+    writes.has(counter) ||
+    writes.has(stop.name) ||
+    outerWrites.has(stop.name)
+  ) {
+    return null;
+  }
+
+  return {
+    counter,
+    start,
+    stop,
+    step,
+    inclusive: test.operator.length === 2,
+  };
+}
+
+// true if the expression (node) is a, possibly negated, number literal
+function isNumberLiteral(node) {
+  if (node.type === "UnaryExpression" && node.operator === "-") {
+    node = node.operand;
+  }
+  return node.type === "LiteralNumericExpression";
+}
+
+// the constant step by which the update expression (node)
+// changes the counter, null if it is not such an update
+function countingStep(node, counter) {
+  const isCounter = (target) =>
+    target.type === "AssignmentTargetIdentifier" && target.name === counter;
+  let operator, expression;
+  switch (node.type) {
+    case "UpdateExpression":
+      if (!isCounter(node.operand)) {
+        return null;
+      }
+      return node.operator === "++" ? 1 : -1;
+    case "CompoundAssignmentExpression":
+      if (!isCounter(node.binding)) {
+        return null;
+      }
+      operator = node.operator.slice(0, -1);
+      expression = node.expression;
+      break;
+    case "AssignmentExpression":
+      // e.g. `i = i + 2`
+      if (
+        !isCounter(node.binding) ||
+        node.expression.type !== "BinaryExpression" ||
+        node.expression.left.type !== "IdentifierExpression" ||
+        node.expression.left.name !== counter
+      ) {
+        return null;
+      }
+      operator = node.expression.operator;
+      expression = node.expression.right;
+      break;
+    default:
+      return null;
+  }
+  if (
+    (operator !== "+" && operator !== "-") ||
+    expression.type !== "LiteralNumericExpression" ||
+    !expression.value ||
+    !isFinite(expression.value)
+  ) {
+    return null;
+  }
+  return operator === "+" ? expression.value : -expression.value;
+}
+
+// collect all writes to all bindings (by name) in the tree,
+// as well as the names of the bindings declared by the tree itself
+function collectWrites(tree) {
+  const declared = new Set();
+  const writes = new Map();
+  const handled = new Set(); // binding nodes of writes collected by their parent
+  let dynamic = false;
+
+  const addWrite = (node, write) => {
+    handled.add(node);
+    if (!writes.has(node.name)) {
+      writes.set(node.name, []);
+    }
+    writes.get(node.name).push(write);
+  };
+
+  walk(tree, (node) => {
+    switch (node.type) {
+      case "VariableDeclarator":
+        if (node.binding.type === "BindingIdentifier") {
+          declared.add(node.binding.name);
+          // declared without a value, undefined until assigned
+          addWrite(
+            node.binding,
+            node.init ? { expression: node.init } : { unknown: true }
+          );
+        }
+        break;
+      case "AssignmentExpression":
+        if (node.binding.type === "AssignmentTargetIdentifier") {
+          addWrite(node.binding, { expression: node.expression });
+        }
+        break;
+      case "CompoundAssignmentExpression":
+        if (node.binding.type === "AssignmentTargetIdentifier") {
+          addWrite(node.binding, {
+            operator: node.operator.slice(0, -1),
+            expression: node.expression,
+          });
+        }
+        break;
+      case "UpdateExpression":
+        if (node.operand.type === "AssignmentTargetIdentifier") {
+          addWrite(node.operand, { update: true });
+        }
+        break;
+      case "CallExpression":
+        if (
+          node.callee.type === "IdentifierExpression" &&
+          node.callee.name === "eval"
+        ) {
+          dynamic = true;
+        }
+        break;
+      case "WithStatement":
+        dynamic = true;
+        break;
+      case "BindingIdentifier":
+      case "AssignmentTargetIdentifier":
+        // e.g. parameters, function names, destructuring and for-in/of targets
+        if (!handled.has(node)) {
+          addWrite(node, { unknown: true });
+        }
+        break;
+    }
+  });
+
+  return { declared, writes, dynamic };
+}
+
+// visit all nodes of the tree, parents before their children,
+// skipping the children of a node for which the visit returns false
+function walk(node, visit) {
+  if (visit(node) === false) {
+    return;
+  }
+  forEachChild(node, (child) => walk(child, visit));
+}
+
+// call the callback for each child node of the node
+function forEachChild(node, callback) {
+  Object.keys(node).forEach((key) => {
+    const value = node[key];
+    if (value instanceof Array) {
+      value.forEach((child) => {
+        if (child && typeof child.type === "string") {
+          callback(child);
+        }
+      });
+    } else if (value && typeof value.type === "string") {
+      callback(value);
+    }
+  });
+}
+
+module.exports = {
+  NumberInference,
+  countingLoop,
+  isNumberLiteral,
+  walk,
+  forEachChild,
+};
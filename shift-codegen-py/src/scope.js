@@ -0,0 +1,346 @@
+// Static scope analysis over a Shift (script) AST,
+// used by the code generator to emit functions as native Python functions,
+// with their bindings as Python local variables.
+//
+// Bindings declared by a function (parameters, variables and nested function
+// declarations) are locals of its Python function. Python closures already
+// capture the bindings read by nested functions (as cells), but the bindings
+// written by a function that it does not declare itself have to be declared
+// `nonlocal` (declared by an enclosing function) or `global` (declared by the
+// script, or an implicit global).
+// Functions using `eval`, `with` or `arguments` are dynamic: their bindings
+// can be accessed in ways unknown to this analysis, requiring a Scope instead.
+// Such functions, as well as those using `this` and those of which the binding
+// escapes (is used other than to be called, e.g. passed as a callback),
+// are wrapped as JS functions, called with a (function) scope.
+//
+// Python has no block scopes: all bindings of a function share its namespace.
+// Only blocks declaring lexical bindings (`let`, `const` and `class`) need
+// to be scoped, which is done statically: a lexical binding of a block is
+// renamed (e.g. `x__1`) in case its name is used by any other binding which is
+// visible within that block, or outside of it. Blocks without lexical bindings,
+// as well as those without any conflicting names, are emitted as they are.
+
+const { walk, forEachChild } = require("./infer");
+
+const FUNCTION_TYPES = new Set([
+  "FunctionDeclaration",
+  "FunctionExpression",
+  "ArrowExpression",
+  "Method",
+  "Getter",
+  "Setter",
+]);
+
+const LOOP_TYPES = new Set([
+  "ForStatement",
+  "ForInStatement",
+  "ForOfStatement",
+]);
+
+class ScopeAnalysis {
+  constructor(tree) {
+    // scopes of all functions, by their node
+    this.functionScopes = new Map();
+    // (Python names of) bindings declared or written by the script itself
+    this.scriptBindings = new Set();
+    // bindings written by functions which do not declare them
+    this.outerWrites = new Set();
+    // Python names of renamed lexical bindings, by their identifier nodes
+    this.pythonNames = new Map();
+    // identifier expressions referring to a wrapped function declaration
+    this.wrappedFunctionReferences = new Set();
+    // scopes of the functions of `this` expressions, by their node
+    this.thisScopes = new Map();
+    if (tree) {
+      this._analyze(tree);
+    }
+  }
+
+  // the scope of the function (node), undefined if it was not analyzed:
+  // `{ nonlocals, globals, dynamic, usesThis, usesArguments, wrapped }`
+  functionScope(node) {
+    return this.functionScopes.get(node);
+  }
+
+  // true if the identifier expression (node) refers to a function declaration
+  // which is wrapped as a JS function, and thus has to be called with a scope
+  isWrappedFunction(node) {
+    return this.wrappedFunctionReferences.has(node);
+  }
+
+  // the scope of the function (node) of the `this` expression (node),
+  // undefined if it is not used within a function
+  thisScope(node) {
+    return this.thisScopes.get(node);
+  }
+
+  // the name of the binding of the identifier (node) within Python
+  pythonName(node) {
+    return this.pythonNames.get(node) || node.name;
+  }
+
+  _analyze(tree) {
+    this._bindings = []; // all declared bindings
+    this._references = []; // all identifier expressions and assignment targets
+    this._names = new Set(); // all names used by the script
+    this._callees = new Set(); // identifier expressions which are called
+    this._declaredFunctions = new Map(); // function scopes, by their name nodes
+    const script = this._createScope(null, tree);
+    this._visit(tree, script);
+
+    const globals = new Map(); // implicit globals, by name
+    this._references.forEach((reference) => {
+      const { node, scope } = reference;
+      for (let outer = scope; outer; outer = outer.parent) {
+        if (outer.bindings.has(node.name)) {
+          reference.binding = outer.bindings.get(node.name);
+          break;
+        }
+      }
+      if (!reference.binding) {
+        if (!globals.has(node.name)) {
+          globals.set(node.name, { name: node.name, scope: null, nodes: [] });
+        }
+        reference.binding = globals.get(node.name);
+      }
+      reference.binding.nodes.push(node);
+    });
+
+    this._renameLexicalBindings([...this._bindings, ...globals.values()]);
+    this._wrapFunctions();
+
+    this._bindings.forEach((binding) => {
+      if (binding.scope.namespace === script) {
+        this.scriptBindings.add(binding.pythonName);
+      }
+    });
+    this._references.forEach(({ node, scope, binding, write }) => {
+      const namespace = scope.namespace;
+      if (!write || (binding.scope && binding.scope.namespace === namespace)) {
+        return;
+      }
+      if (namespace === script) {
+        this.scriptBindings.add(binding.pythonName);
+        return;
+      }
+      this.outerWrites.add(node.name);
+      if (binding.scope && binding.scope.namespace !== script) {
+        namespace.nonlocals.add(binding.pythonName);
+      } else {
+        namespace.globals.add(binding.pythonName);
+      }
+    });
+  }
+
+  _createScope(parent, node) {
+    const scope = { parent, node, bindings: new Map() };
+    if (!parent || FUNCTION_TYPES.has(node.type)) {
+      // the scope of a function (or the script), a Python namespace
+      scope.namespace = scope;
+      scope.nonlocals = new Set();
+      scope.globals = new Set();
+      scope.dynamic = false;
+      scope.usesThis = false;
+      scope.usesArguments = false;
+      scope.wrapped = false;
+    } else {
+      scope.namespace = parent.namespace;
+    }
+    return scope;
+  }
+
+  _declare(scope, node) {
+    this._names.add(node.name);
+    let binding = scope.bindings.get(node.name);
+    if (!binding) {
+      binding = { name: node.name, scope, nodes: [] };
+      scope.bindings.set(node.name, binding);
+      this._bindings.push(binding);
+    }
+    binding.nodes.push(node);
+  }
+
+  // declare all identifiers bound by the (binding pattern) node
+  _declarePattern(scope, node, declared) {
+    walk(node, (child) => {
+      if (child.type === "BindingIdentifier") {
+        this._declare(scope, child);
+        declared.add(child);
+      }
+    });
+  }
+
+  _visit(node, scope, declared = new Set()) {
+    if (FUNCTION_TYPES.has(node.type)) {
+      const functionScope = this._createScope(scope, node);
+      this.functionScopes.set(node, functionScope);
+      if (node.type === "FunctionDeclaration") {
+        this._declare(scope.namespace, node.name);
+        this._declaredFunctions.set(node.name, functionScope);
+      }
+      if (node.type === "FunctionExpression" && node.name) {
+        this._declare(functionScope, node.name);
+      }
+      [node.params, node.body]
+        .filter((child) => child && child.type)
+        .forEach((child) => this._visit(child, functionScope, declared));
+      return;
+    }
+    switch (node.type) {
+      case "Block":
+      case "CatchClause":
+        scope = this._createScope(scope, node);
+        break;
+      case "VariableDeclaration":
+        node.declarators.forEach((declarator) =>
+          this._declarePattern(
+            node.kind === "var" ? scope.namespace : scope,
+            declarator.binding,
+            declared
+          )
+        );
+        break;
+      case "ClassDeclaration":
+        this._declare(scope, node.name);
+        declared.add(node.name);
+        break;
+      case "BindingIdentifier":
+        // e.g. parameters and catch parameters
+        if (!declared.has(node)) {
+          this._declare(scope, node);
+        }
+        break;
+      case "IdentifierExpression":
+      case "AssignmentTargetIdentifier":
+        this._names.add(node.name);
+        this._references.push({
+          node,
+          scope,
+          write: node.type === "AssignmentTargetIdentifier",
+        });
+        if (node.name === "arguments" && scope.namespace.parent) {
+          scope.namespace.dynamic = true;
+          scope.namespace.usesArguments = true;
+        }
+        break;
+      case "CallExpression":
+        if (node.callee.type === "IdentifierExpression") {
+          this._callees.add(node.callee);
+          if (node.callee.name === "eval") {
+            scope.namespace.dynamic = true;
+          }
+        }
+        break;
+      case "ThisExpression":
+        if (scope.namespace.parent) {
+          scope.namespace.usesThis = true;
+          this.thisScopes.set(node, scope.namespace);
+        }
+        break;
+      case "WithStatement":
+        scope.namespace.dynamic = true;
+        break;
+    }
+    if (LOOP_TYPES.has(node.type)) {
+      // the bindings declared by the head of the loop are scoped to the loop
+      scope = this._createScope(scope, node);
+    }
+    forEachChild(node, (child) => this._visit(child, scope, declared));
+  }
+
+  // wrap the function declarations which cannot be plain Python functions,
+  // as well as all other declarations of the same binding
+  _wrapFunctions() {
+    const escaping = new Set(); // bindings used other than to be called
+    this._references.forEach(({ node, binding }) => {
+      if (!this._callees.has(node)) {
+        escaping.add(binding);
+      }
+    });
+    const wrappedBindings = new Set();
+    this._bindings.forEach((binding) => {
+      const scopes = binding.nodes
+        .filter((node) => this._declaredFunctions.has(node))
+        .map((node) => this._declaredFunctions.get(node));
+      if (
+        scopes.length &&
+        (escaping.has(binding) ||
+          scopes.some((scope) => scope.dynamic || scope.usesThis))
+      ) {
+        scopes.forEach((scope) => (scope.wrapped = true));
+        wrappedBindings.add(binding);
+      }
+    });
+    this._references.forEach(({ node, binding }) => {
+      if (wrappedBindings.has(binding)) {
+        this.wrappedFunctionReferences.add(node);
+      }
+    });
+  }
+
+  // give a unique Python name to each lexical binding of a block,
+  // of which the name is also used by another binding which is not declared
+  // by a block unrelated to it (neither enclosing nor enclosed by it),
+  // or, when the binding is captured by a nested function, by any other binding
+  // of the same namespace (as the Python closure would see its latest value)
+  _renameLexicalBindings(bindings) {
+    const captured = new Set();
+    this._references.forEach(({ scope, binding }) => {
+      if (binding.scope && binding.scope.namespace !== scope.namespace) {
+        captured.add(binding);
+      }
+    });
+    const byName = new Map();
+    bindings.forEach((binding) => {
+      binding.pythonName = binding.name;
+      if (!byName.has(binding.name)) {
+        byName.set(binding.name, []);
+      }
+      byName.get(binding.name).push(binding);
+    });
+    bindings.forEach((binding) => {
+      if (!binding.scope || binding.scope.namespace === binding.scope) {
+        return; // not a binding of a block
+      }
+      const conflicts = byName
+        .get(binding.name)
+        .some(
+          (other) =>
+            other !== binding &&
+            (!other.scope ||
+              other.scope.namespace === other.scope ||
+              isEnclosing(binding.scope, other.scope) ||
+              isEnclosing(other.scope, binding.scope) ||
+              (captured.has(binding) &&
+                other.scope.namespace === binding.scope.namespace))
+        );
+      if (!conflicts) {
+        return;
+      }
+      let suffix = 1;
+      while (this._names.has(`${binding.name}__${suffix}`)) {
+        suffix++;
+      }
+      binding.pythonName = `${binding.name}__${suffix}`;
+      this._names.add(binding.pythonName);
+      binding.nodes.forEach((node) =>
+        this.pythonNames.set(node, binding.pythonName)
+      );
+    });
+  }
+}
+
+// true if the scope is (or encloses) the other scope
+function isEnclosing(scope, other) {
+  for (; other; other = other.parent) {
+    if (other === scope) {
+      return true;
+    }
+  }
+  return false;
+}
+
+module.exports = {
+  ScopeAnalysis,
+};
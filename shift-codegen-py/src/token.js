@@ -225,6 +225,28 @@ class LiteralNumeric extends Token {
   }
 }
 
+// a number literal as a Python float literal, used for unboxed numbers
+class LiteralFloat extends LiteralNumeric {
+  emit(ts, parent, opts) {
+    ts.put(renderFloat(this.x), opts);
+  }
+}
+
+// a number literal as a plain Python number, e.g. for polyfill arguments
+class PythonNumber extends LiteralNumeric {
+  emit(ts, parent, opts) {
+    ts.put(renderNumber(this.x), opts);
+  }
+}
+
+function renderFloat(n) {
+  let s = renderNumber(n);
+  if (s.startsWith("0x")) {
+    s = n.toString(10);
+  }
+  return /[.eE]/.test(s) ? s : `${s}.0`;
+}
+
 function renderNumber(n) {
   let s;
   if (n >= 1e3 && n % 10 === 0) {
@@ -348,6 +370,14 @@ class RawTuple extends Token {
     }
     ts.put(")", opts);
   }
+
+  // emit all expressions without separator,
+  // used to compose a parenthesized expression out of several tokens
+  emitJoined(ts, parent, opts) {
+    ts.put("(", opts);
+    this.expressions.forEach((expr) => expr.emit(ts, this, opts));
+    ts.put(")", opts);
+  }
 }
 
 class Line extends Token {
@@ -379,7 +409,11 @@ class Block extends Token {
   emit(ts, parent, opts = {}) {
     if (this.lines.length > 0) {
       this.lines.forEach((line) => {
-        if (!(line instanceof Line) && !(line instanceof Block)) {
+        if (
+          !(line instanceof Line) &&
+          !(line instanceof Block) &&
+          !(line instanceof PythonFunctionDef) // emits its own lines
+        ) {
           line = new Line(line);
         }
         line.emit(ts, this, opts);
@@ -464,6 +498,36 @@ class PropertyGetterExpression extends Token {
   }
 }
 
+// a property used as assignment target (e.g. `obj.x` or `a[i]`),
+// read as the equivalent member expression
+class MemberTarget extends Token {
+  constructor(obj, property, computed = false) {
+    super();
+    this.obj = obj;
+    this.property = property;
+    this.computed = computed;
+  }
+
+  // the expression resulting in the name of the property
+  key() {
+    if (this.computed) {
+      return this.property;
+    }
+    return new PythonString(this.property.str, { delim: '"' });
+  }
+
+  emit(ts, parent, opts) {
+    if (!this.computed) {
+      new PropertyGetterExpression(this.obj, this.property).emit(ts, this, opts);
+      return;
+    }
+    this.obj.emit(ts, this, opts);
+    ts.put("[", opts);
+    this.property.emit(ts, this, opts);
+    ts.put("]", opts);
+  }
+}
+
 class PrefixOperation extends Token {
   constructor(operator, expression) {
     super();
@@ -522,6 +586,27 @@ class InfixOperation extends Token {
   }
 }
 
+// a comma (chained) expression emitted as a plain tuple,
+// evaluating all expressions in order and resulting in the last one,
+// e.g. `(a, b)[-1]`, as an alternative to the `jschain` polyfill function
+class ChainExpression extends Token {
+  constructor(...expressions) {
+    super();
+    this.expressions = (expressions || []).flat();
+  }
+
+  emit(ts, parent, opts) {
+    ts.put("(", opts);
+    this.expressions.forEach((expr, index) => {
+      if (index > 0) {
+        ts.put(", ", opts);
+      }
+      expr.emit(ts, this, opts);
+    });
+    ts.put(")[-1]", opts);
+  }
+}
+
 class InPlaceOperation extends Token {
   constructor(operator, left, right) {
     super();
@@ -536,6 +621,16 @@ class InPlaceOperation extends Token {
       this.left.emit(ts, this, opts);
       ts.put(` ${this.operator}= `, opts);
       this.right.emit(ts, this, opts);
+    } else if (this.left instanceof Identifier) {
+      // values are immutable, so rebind the reference
+      // using an assignment expression, e.g. `(x := x + (y))`
+      new RawTuple(
+        this.left,
+        new RawToken(" := "),
+        this.left,
+        new RawToken(` ${this.operator} `),
+        new RawTuple(this.right)
+      ).emitJoined(ts, this, opts);
     } else {
       // use the magic function instead,
       // as to be able to use it as an expression as we desire here
@@ -557,7 +652,21 @@ class Assignment extends InfixOperation {
   }
 
   emit(ts, parent, opts) {
-    if (this.right instanceof ByOneOperation) {
+    if (parent instanceof ChainExpression && this.left instanceof Identifier) {
+      // part of an expression, so use an assignment expression instead
+      new RawTuple(
+        this.left,
+        new RawToken(" := "),
+        new RawTuple(this.right)
+      ).emitJoined(ts, this, opts);
+    } else if (this.left instanceof MemberTarget) {
+      // assigned by the object itself, e.g. `obj.assign("x", value)`
+      new CallExpression(
+        new PropertyGetterExpression(this.left.obj, new Identifier("assign")),
+        this.left.key(),
+        this.right
+      ).emit(ts, this, opts);
+    } else if (this.right instanceof ByOneOperation) {
       const statements = [
         this.right,
         new Assignment(this.left, this.right.operand),
@@ -597,13 +706,128 @@ class ByOneOperation extends Token {
     this.isPrefix = isPrefix;
   }
 
+  // the expression resulting in the updated value of the operand
+  updateExpression() {
+    // values are immutable, `inc` and `dec` return the updated value
+    return new CallExpression(
+      new PropertyGetterExpression(
+        this.operand,
+        new Identifier(this.operator === "+" ? "inc" : "dec")
+      )
+    );
+  }
+
+  emit(ts, parent, opts) {
+    const isStatement =
+      parent instanceof Line ||
+      parent instanceof Assignment ||
+      parent instanceof ForExpression;
+    if (this.operand instanceof MemberTarget) {
+      // assigned to the property by the object itself,
+      // e.g. `obj.inc_item("x")` (prefix) or `obj.pinc_item("x")` (postfix)
+      const method = `${this.isPrefix || isStatement ? "" : "p"}${
+        this.operator === "+" ? "inc" : "dec"
+      }_item`;
+      new CallExpression(
+        new PropertyGetterExpression(this.operand.obj, new Identifier(method)),
+        this.operand.key()
+      ).emit(ts, this, opts);
+      return;
+    }
+    const update = this.updateExpression();
+    if (!(this.operand instanceof Identifier)) {
+      // nothing to rebind
+      update.emit(ts, this, opts);
+      return;
+    }
+    if (isStatement) {
+      // used as a statement, prefix or postfix makes no difference
+      new Assignment(this.operand, update).emit(ts, this, opts);
+      return;
+    }
+    // used as an expression: rebind using an assignment expression,
+    // e.g. `(x := x.inc())` (prefix) or `(x, (x := x.inc()))[0]` (postfix)
+    const rebind = new RawTuple(
+      this.operand,
+      new RawToken(" := "),
+      update
+    );
+    if (this.isPrefix) {
+      rebind.emitJoined(ts, this, opts);
+      return;
+    }
+    ts.put("(", opts);
+    this.operand.emit(ts, this, opts);
+    ts.put(", ", opts);
+    rebind.emitJoined(ts, this, opts);
+    ts.put(")[0]", opts);
+  }
+}
+
+// ++ / -- of an unboxed number (a Python float)
+class UnboxedByOneOperation extends ByOneOperation {
+  updateExpression() {
+    return new InfixOperation(this.operator, this.operand, new LiteralFloat(1));
+  }
+}
+
+// A number expression evaluated unboxed, as a plain Python float,
+// boxed as a JSNumber only where it escapes into code dealing with JS values
+// (e.g. as call argument, property or template value).
+// Tokens which deal with unboxed numbers themselves use the `unboxed` expression.
+class UnboxedNumber extends Token {
+  constructor(expression, boxed) {
+    super();
+    this.expression = expression;
+    // optional token used for the boxed value instead of `JSNumber(<expression>)`,
+    // e.g. a regular number literal
+    this.boxed = boxed;
+  }
+
+  unboxed() {
+    return this.expression;
+  }
+
   emit(ts, parent, opts) {
-    const fname = `${this.isPrefix ? "" : "p"}${
-      this.operator === "+" ? "inc" : "dec"
-    }`;
-    new CallExpression(
-      new PropertyGetterExpression(this.operand, new Identifier(fname))
-    ).emit(ts, this, opts);
+    if (
+      (parent instanceof Line || parent instanceof ForExpression) &&
+      (this.expression instanceof ByOneOperation ||
+        this.expression instanceof InPlaceOperation)
+    ) {
+      // used as a statement, the value itself is not used
+      this.expression.emit(ts, parent, opts);
+      return;
+    }
+    if (this.boxed) {
+      this.boxed.emit(ts, parent, opts);
+      return;
+    }
+    ts.put("JSNumber(", opts);
+    this.expression.emit(ts, this, opts);
+    ts.put(")", opts);
+  }
+}
+
+// A comparison of unboxed numbers, resulting in a Python bool,
+// boxed as a JSBool unless used as the test of a branch or loop.
+class UnboxedBool extends Token {
+  constructor(expression) {
+    super();
+    this.expression = expression;
+  }
+
+  emit(ts, parent, opts) {
+    if (
+      parent instanceof IfExpression ||
+      parent instanceof WhileExpression ||
+      parent instanceof ForExpression
+    ) {
+      this.expression.emit(ts, this, opts);
+      return;
+    }
+    ts.put("JSBool(", opts);
+    this.expression.emit(ts, this, opts);
+    ts.put(")", opts);
   }
 }
 
@@ -722,6 +946,33 @@ class ForExpression extends Token {
   }
 }
 
+// a counting loop, iterating over the (precomputed) values of its counter,
+// e.g. `for i in jsrange(0, n):`
+class ForRangeExpression extends Token {
+  constructor(counter, range, body) {
+    super();
+    this.counter = counter;
+    this.range = range;
+    this.body = body instanceof Block ? body : new Block([body]);
+  }
+
+  emit(ts, parent, opts) {
+    ts.put("for ", opts);
+    this.counter.emit(ts, this, opts);
+    ts.put(" in ", opts);
+    this.range.emit(ts, this, opts);
+    ts.put(":", opts);
+    ts.putEOL();
+    this.body.emit(
+      ts,
+      this,
+      Object.assign(Object.assign({}, opts), {
+        lineIndention: (opts.lineIndention || 0) + (this.isTopLevel ? 0 : 1),
+      })
+    );
+  }
+}
+
 class IfExpression extends Token {
   constructor(test, consequent, alternate) {
     super();
@@ -798,7 +1049,7 @@ class IfExpression extends Token {
 }
 
 class PythonFunctionDef extends Token {
-  constructor(name, body, { args, varg, kwargs } = {}) {
+  constructor(name, body, { args, varg, kwargs, decorators } = {}) {
     super();
 
     this.name = name;
@@ -807,9 +1058,13 @@ class PythonFunctionDef extends Token {
     this.args = args || [];
     this.varg = varg; // allowed to be empty for a *
     this.kwargs = kwargs || {};
+    this.decorators = decorators || [];
   }
 
   emit(ts, parent, opts) {
+    this.decorators.forEach((decorator) =>
+      new Line(new RawToken(`@${decorator}`)).emit(ts, this, opts)
+    );
     // emit the signature...
     let args = this.args.slice();
     if (this.varg !== undefined) {
@@ -831,6 +1086,22 @@ class PythonFunctionDef extends Token {
         lineIndention: (opts.lineIndention || 0) + 1,
       })
     );
+    ts.putEOL(opts);
+  }
+}
+
+class ReturnExpression extends Token {
+  constructor(expression) {
+    super();
+    this.expression = expression;
+  }
+
+  emit(ts, parent, opts) {
+    ts.put("return", opts);
+    if (this.expression) {
+      ts.put(" ", opts);
+      this.expression.emit(ts, this, opts);
+    }
   }
 }
 
@@ -871,10 +1142,12 @@ module.exports = {
 
   // Python Runtime types
   PythonString, // like a LiteralString, but without being a JSString
+  PythonNumber, // like a LiteralNumeric, but without being a JSNumber
 
   // Primitive Types
   LiteralBoolean,
   LiteralNumeric,
+  LiteralFloat, // number literal as a Python float, for unboxed numbers
   LiteralString,
   LiteralRegexp,
 
@@ -884,20 +1157,28 @@ module.exports = {
   // Loop Types
   WhileExpression,
   ForExpression,
+  ForRangeExpression, // counting loop, as a Python for loop
 
   // Expression Types
   PrefixOperation, // AKA Unary Operations
   InfixOperation, // AKA binary operations
   InPlaceOperation, // also binary operations, but modifying the object in place
   ByOneOperation, // ++ / --
+  UnboxedByOneOperation, // ++ / -- of an unboxed number
+  ChainExpression, // comma operator as a plain tuple
   Assignment,
   CallExpression,
   PropertyGetterExpression,
+  MemberTarget, // property as assignment target
   TemplateExpression,
 
   // Reference Related Types
   Identifier,
 
+  // Unboxed Types
+  UnboxedNumber, // number expression evaluated as a Python float
+  UnboxedBool, // comparison of unboxed numbers
+
   // Scope Types
   Block,
 
@@ -920,6 +1201,7 @@ module.exports = {
 
   // Python Types for special purposes
   PythonFunctionDef,
+  ReturnExpression,
 
   // Token Utilities
   GetPrecedence,
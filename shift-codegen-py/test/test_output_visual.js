@@ -197,6 +197,99 @@ describe("OutputVisual", () => {
         });
       });
     });
+
+    describe("Comma Operator (inline chains)", () => {
+      const tests = [
+        [`foo((bar(x), x))`, `foo((bar(x), x)[-1])\n`],
+        [`y = (x = 1, x)`, `y = ((x := (JSNumber(1))), x)[-1]\n`],
+        [`y = (x++, x)`, `y = ((x, (x := x.inc()))[0], x)[-1]\n`],
+      ];
+      tests.forEach(([testInput, testOutput]) => {
+        it(`should interpret comma operator as a tuple using input: '${testInput}'`, () => {
+          assert.equal(
+            transpile(testInput, { inlineChains: true }),
+            testOutput
+          );
+        });
+      });
+    });
+
+    describe("Update Expressions of Properties", () => {
+      const tests = [
+        [`o.x++`, `o.inc_item("x")\n`],
+        [`a[i]++`, `a.inc_item(i)\n`],
+        [`--a[i]`, `a.dec_item(i)\n`],
+        [`foo(o.x++)`, `foo(o.pinc_item("x"))\n`],
+        [`foo(++o.x)`, `foo(o.inc_item("x"))\n`],
+        [`y = a[i]--`, `y = a[i]\na.dec_item(i)\n`],
+      ];
+      tests.forEach(([testInput, testOutput]) => {
+        it(`should assign the updated property using input: '${testInput}'`, () => {
+          assert.equal(transpile(testInput), testOutput);
+        });
+      });
+    });
+  });
+
+  describe("Unboxed Numbers", () => {
+    const tests = [
+      [`let x = 1; x = x * 2 + 3`, `x = 1.0\nx = x * 2.0 + 3.0\n`],
+      [`let x = 1; foo(x)`, `x = 1.0\nfoo(JSNumber(x))\n`],
+      [`let x = 1; x += 2; x++`, `x = 1.0\nx += 2.0\nx = x + 1.0\n`],
+      [
+        `let i = 0; while (i < 10) { i++ }`,
+        `i = 0.0\nwhile i < 10.0:\n    i = i + 1.0\n\n`,
+      ],
+      [`let a = 1; let b = a === 2`, `a = 1.0\nb = JSBool(a == 2.0)\n`],
+      [`let x = 1; y = x / 2`, `x = 1.0\ny = JSNumber(x) / JSNumber(2)\n`],
+      [`let x = 1; x = "a"`, `x = JSNumber(1)\nx = JSString("a")\n`],
+      [`let x; x = 1`, `x = JSUndefined()\nx = JSNumber(1)\n`],
+      [`let x = 1; eval(s)`, `x = JSNumber(1)\neval(s)\n`],
+    ];
+    tests.forEach(([testInput, testOutput]) => {
+      it(`should evaluate numbers unboxed using input: '${testInput}'`, () => {
+        assert.equal(
+          transpile(testInput, { unboxedNumbers: true }),
+          testOutput
+        );
+      });
+    });
+  });
+
+  describe("Block Scopes", () => {
+    const tests = [
+      // blocks without (conflicting) lexical bindings are not scoped
+      [`{ let x = 1; foo(x) }`, `x = JSNumber(1)\nfoo(x)\n`],
+      [`while (a) { let t = a; a = t }`, `while a:\n    t = a\n    a = t\n\n`],
+      [
+        `for (let i = 0; i < 2; i++) {} for (let i = 0; i < 2; i++) {}`,
+        `for i in jsrange(0, 2):\n    pass\n\nfor i in jsrange(0, 2):\n    pass\n\n`,
+      ],
+      // lexical bindings shadowing (or shadowed by) other bindings
+      [
+        `let x = 1; { let x = 2; foo(x) } foo(x)`,
+        `x = JSNumber(1)\nx__1 = JSNumber(2)\nfoo(x__1)\nfoo(x)\n`,
+      ],
+      [
+        `for (let i = 0; i < 2; i++) { foo(i) } foo(i)`,
+        `for i__1 in jsrange(0, 2):\n    foo(i__1)\n\nfoo(i)\n`,
+      ],
+      [
+        `let x__1; let x = 1; { let x = 2 }`,
+        `x__1 = JSUndefined()\nx = JSNumber(1)\nx__2 = JSNumber(2)\n`,
+      ],
+      // lexical bindings captured by a function, sharing their name
+      // with another binding of the same function (or script)
+      [
+        `{ let x = 1; function g() { return x } } { let x = 2 } g()`,
+        `x__1 = JSNumber(1)\ndef g(*__extra):\n    return x__1\n\nx = JSNumber(2)\ng()\n`,
+      ],
+    ];
+    tests.forEach(([testInput, testOutput]) => {
+      it(`should correctly scope block using input: '${testInput}'`, () => {
+        assert.equal(transpile(testInput), testOutput);
+      });
+    });
   });
 
   describe("Loops", () => {
@@ -247,7 +340,50 @@ describe("OutputVisual", () => {
     });
 
     describe("For Loops", () => {
-      // TODO: test
+      const tests = [
+        [
+          `for (let i = 0; i < 10; i++) { foo(i) }`,
+          `for i in jsrange(0, 10):\n    foo(i)\n\n`,
+        ],
+        [
+          `for (let i = 10; i >= -3; i -= 3) foo(i)`,
+          `for i in jsrange(10, -3, -3, inclusive=True):\n    foo(i)\n\n`,
+        ],
+        [
+          `for (let i = 1; i <= n; i = i + 2) {}`,
+          `for i in jsrange(1, n, 2, inclusive=True):\n    pass\n\n`,
+        ],
+        [
+          `for (let i = 0; i < n; i++) { n-- }`,
+          `i = JSNumber(0)\nwhile i < n:\n    n = n.dec()\n    i = i.inc()\n\n`,
+        ],
+        [
+          `for (let i = 0; i < n; i++) { i++ }`,
+          `i = JSNumber(0)\nwhile i < n:\n    i = i.inc()\n    i = i.inc()\n\n`,
+        ],
+        [
+          `for (var i = 0; i < n; i++) {}`,
+          `i = JSNumber(0)\nwhile i < n:\n    i = i.inc()\n\n`,
+        ],
+        [
+          `for (let i = 0; i > n; i++) {}`,
+          `i = JSNumber(0)\nwhile i > n:\n    i = i.inc()\n\n`,
+        ],
+      ];
+      tests.forEach(([testInput, testOutput]) => {
+        it(`should correctly interpret for loop: '${testInput}'`, () => {
+          assert.equal(transpile(testInput), testOutput);
+        });
+      });
+
+      it("should count using unboxed numbers", () => {
+        assert.equal(
+          transpile(`for (let i = 0; i < n; i++) { foo(i) }`, {
+            unboxedNumbers: true,
+          }),
+          `for i in jsrange(0, n, unboxed=True):\n    foo(JSNumber(i))\n\n`
+        );
+      });
     });
   });
 
@@ -288,7 +424,53 @@ describe("OutputVisual", () => {
   });
 
   describe("Function Declarations", () => {
-    // TODO: code+test
+    const tests = [
+      [`function f() {}`, `def f(*__extra):\n    return JSUndefined()\n\n`],
+      [
+        `function f(a, b) { return a }`,
+        `def f(a=JSUndefined(), b=JSUndefined(), *__extra):\n    return a\n\n`,
+      ],
+      // hoisted
+      [
+        `f(); function f() { return }`,
+        `def f(*__extra):\n    return JSUndefined()\n\nf()\n`,
+      ],
+      // written bindings which are not locals
+      [
+        `let x; function f() { x = 1; y = 2 }`,
+        `def f(*__extra):\n    global x, y\n    x = JSNumber(1)\n    y = JSNumber(2)\n    return JSUndefined()\n\nx = JSUndefined()\n`,
+      ],
+      [
+        `function f() { let n = 0; function g() { n++ } }`,
+        `def f(*__extra):\n    def g(*__extra):\n        nonlocal n\n        n = n.inc()\n        return JSUndefined()\n\n    n = JSNumber(0)\n    return JSUndefined()\n\n`,
+      ],
+      // wrapped as JS functions, called with a scope
+      [
+        `function f() { return arguments }`,
+        `@jsfunc(scope, "f")\ndef f(scope):\n    arguments = scope.arguments\n    return arguments\n\n`,
+      ],
+      [
+        `function f(a) { return this } f(1)`,
+        `@jsfunc(scope, "f", parameters=["a"])\ndef f(scope):\n    a = scope["a"]\n    this = scope.this\n    return this\n\nf(scope, JSNumber(1))\n`,
+      ],
+      // escaping, e.g. passed as callback
+      [
+        `function double(x) { return x * 2 } a.map(double)`,
+        `@jsfunc(scope, "double", parameters=["x"])\ndef double(scope):\n    x = scope["x"]\n    return x * JSNumber(2)\n\na.map(double)\n`,
+      ],
+    ];
+    tests.forEach(([testInput, testOutput]) => {
+      it(`should correctly interpret function declaration: '${testInput}'`, () => {
+        assert.equal(transpile(testInput), testOutput);
+      });
+    });
+
+    it("should declare script bindings as nonlocal in a scoped script", () => {
+      assert.equal(
+        transpile(`let x = 1; function f() { x = 2 }`, { scopedScript: true }),
+        `def main(scope):\n    def f(*__extra):\n        nonlocal x\n        x = JSNumber(2)\n        return JSUndefined()\n\n    x = JSNumber(1)\n\n`
+      );
+    });
   });
 
   describe("Arrow Function Declarations", () => {